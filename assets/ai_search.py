@@ -2,23 +2,31 @@ import os
 import csv
 import time
 import re
+import sys
 import json
+import asyncio
 import difflib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 from colorama import init, Fore, Back, Style
 from tabulate import tabulate
 
-# Import OpenAI client
-try:
-    from openai import OpenAI
-except ImportError:
-    # For type checkers and editors: openai must be installed in your environment
-    pass
-
 # Import from existing search module to reuse functionality
-from .search import clear_screen, search_by_name, search_by_multiple_fields, highlight_match
+from .search import (
+    clear_screen, highlight_match,
+    find_by_name, find_by_fields, find_by_nik, find_by_phone, normalize_phone, NIK_PATTERN
+)
+from .spinner import Spinner
+from .ttl_cache import TTLCache, make_key
+from .context_budget import fit_to_budget, fit_tool_results, drop_stale_context, compact_json, count_tokens, count_message_tokens
+from .call_policy import call_with_policy, CALL_DEADLINE, DeadlineExceeded
+from .settings import env_number
+from . import telemetry
+from . import ngram_search
 
 # Initialize colorama for cross-platform colored terminal
 init(autoreset=True)
@@ -29,15 +37,77 @@ load_dotenv()
 # Configuration
 DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "data.csv")
 API_KEY = os.getenv('AIMLAPI_KEY')
-API_BASE_URL = "https://api.aimlapi.com/v1"
+# Override to point AI Search at another OpenAI-compatible server (e.g. misc/mock_llm.py)
+API_BASE_URL = os.getenv('AIMLAPI_BASE_URL', "https://api.aimlapi.com/v1")
 
 VERSION = "3.0.0"
 
-# Initialize OpenAI client
-client = OpenAI(
-    base_url=API_BASE_URL,
-    api_key=API_KEY,
-)
+# Cache for the one-shot search prompts (intent analysis and evaluation). The
+# same prompt with the same model settings is answered from disk until the TTL
+# runs out; set SEADAT_LLM_CACHE_TTL=0 to turn it off
+LLM_CACHE = {
+    "path": os.getenv('SEADAT_LLM_CACHE', os.path.join(os.path.dirname(DATA_FILE), "llm_cache.sqlite3")),
+    "ttl": env_number('SEADAT_LLM_CACHE_TTL', 24 * 3600.0),
+    "max_entries": 5000
+}
+llm_cache = TTLCache(LLM_CACHE["path"], ttl=LLM_CACHE["ttl"], max_entries=LLM_CACHE["max_entries"])
+
+# Print conversational replies token by token as the model produces them;
+# set SEADAT_STREAM=0 to wait for the whole reply instead
+STREAM_REPLIES = os.getenv('SEADAT_STREAM', '1') != '0'
+
+# Judge result relevance with the local n-gram engine instead of a model call,
+# and offer near matches for misspelled names (needs scikit-learn)
+USE_LOCAL_RELEVANCE = os.getenv('SEADAT_LOCAL_RELEVANCE', '1') != '0' and ngram_search.is_available()
+# Similarity at which an approximate match counts as the person asked for
+RELEVANT_SCORE = 0.5
+NEAR_MATCH_LIMIT = 5
+
+# Evaluations remembered for this session, by normalized query and the
+# records evaluated; the least recently used are dropped past this many
+EVALUATION_MEMO_SIZE = 256
+
+# Let the model call the local search itself (one exchange per turn) instead of
+# the separate intent and evaluation prompts; set SEADAT_TOOLS=0 to turn it off
+USE_TOOL_CALLING = os.getenv('SEADAT_TOOLS', '1') != '0'
+TOOL_RESULT_LIMIT = 20
+MAX_TOOL_ROUNDS = 3
+
+SEARCH_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "search_employees",
+            "description": (
+                "Search the local employee database. Use 'nik' for a 16-digit NIK, "
+                "'phone' for a phone number, 'name' for a person's name and 'all' to "
+                "match the term in any field (name, NIK, phone number or address)."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "fields": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["name", "nik", "phone", "all"]},
+                        "description": "Fields to search"
+                    },
+                    "term": {"type": "string", "description": "Text to look for"},
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Most records to return (1-{TOOL_RESULT_LIMIT}, default 5)"
+                    }
+                },
+                "required": ["fields", "term"]
+            }
+        }
+    }
+]
+
+# OpenAI client, created on first use by get_client() so importing this module
+# neither imports the openai package nor needs an API key yet. One client (and
+# its HTTP connection pool) is shared by every thread and session
+client = None
+_client_lock = threading.Lock()
 
 # Ocean-themed ASCII art with AI emphasis
 AI_SEARCH_LOGO = r"""
@@ -71,9 +141,97 @@ def display_ai_search_header():
     print()
 
 def ai_search_animation(message="AI analyzing your query"):
-    """Display a minimal AI-themed scanning animation (reduced for speed)."""
-    print(f"\n{Fore.CYAN}{message}...", flush=True)
-    time.sleep(0.3)  # Much shorter, just a hint of activity
+    """Return an AI-themed spinner that runs while the model call inside it runs."""
+    return Spinner(f"{message}...")
+
+def get_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+
+    The openai package (and everything it pulls in) is imported here rather
+    than at module load. The client's own retries are off; call_with_policy
+    retries within a deadline instead.
+    """
+    global client
+    with _client_lock:
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(
+                base_url=API_BASE_URL,
+                api_key=API_KEY,
+                max_retries=0,
+            )
+        return client
+
+def request_completion(prompt, max_tokens=150):
+    """
+    Send a single search prompt to the model, printing nothing.
+
+    Args:
+        prompt (str): The prompt to send to the API
+        max_tokens (int): Maximum number of tokens in the response
+
+    Returns:
+        dict: The API response in the chat completions shape
+
+    Raises:
+        RuntimeError: If no API key is configured
+        DeadlineExceeded: If no response came within the call deadline
+        Exception: Whatever the OpenAI client raises on failure, after
+            transient errors have been retried
+    """
+    params = {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": "You are an AI assistant helping with employee data search."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.3
+    }
+    use_cache = LLM_CACHE["ttl"] > 0
+    if use_cache:
+        # Keyed by endpoint too, so answers from a mock server never reach the real one
+        cache_key = make_key(API_BASE_URL, params)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            telemetry.add("cache_hits")
+            return cached
+
+    if not API_KEY:
+        raise RuntimeError("API key not found in environment variables.")
+
+    started = time.perf_counter()
+    response = call_with_policy(
+        lambda timeout: get_client().chat.completions.create(timeout=timeout, **params),
+        kind="completion"
+    )
+    # Convert OpenAI object to dict-like for compatibility
+    result = {
+        "choices": [
+            {
+                "message": {
+                    "content": response.choices[0].message.content
+                }
+            }
+        ]
+    }
+    record_usage(getattr(response, "usage", None), params["messages"], result["choices"][0]["message"]["content"])
+    if use_cache:
+        llm_cache.set(cache_key, result, cost_ms=(time.perf_counter() - started) * 1000)
+    return result
+
+def record_usage(usage, messages, completion_text):
+    """
+    Count a model call and its tokens in the turn's telemetry.
+
+    Uses the usage the API reported, and estimates both counts when there is
+    none (streamed replies usually have none).
+    """
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        telemetry.add_tokens(usage.prompt_tokens, usage.completion_tokens)
+    else:
+        telemetry.add_tokens(count_message_tokens(messages), count_tokens(completion_text), estimated=True)
 
 def call_openai_api(prompt, max_tokens=150):
     """
@@ -86,44 +244,220 @@ def call_openai_api(prompt, max_tokens=150):
     Returns:
         dict: The API response or None if there was an error
     """
-    if not API_KEY:
-        print(f"{Fore.RED}ERROR: API key not found in environment variables.")
-        return None
-
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an AI assistant helping with employee data search."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.3
-        )
-        # Convert OpenAI object to dict-like for compatibility
-        return {
-            "choices": [
-                {
-                    "message": {
-                        "content": response.choices[0].message.content
-                    }
-                }
-            ]
-        }
+        return request_completion(prompt, max_tokens)
+    except RuntimeError as e:
+        print(f"{Fore.RED}ERROR: {str(e)}")
+        return None
     except Exception as e:
         print(f"{Fore.RED}API Error: {str(e)}")
         return None
 
-def analyze_search_intent(query):
+def ask_model(prompt, max_tokens=150, message="AI analyzing your query", show_progress=True):
+    """
+    Send a prompt, with a spinner and printed errors when show_progress is set.
+
+    Returns:
+        dict: The API response or None if there was an error
+    """
+    if not show_progress:
+        try:
+            return request_completion(prompt, max_tokens)
+        except Exception:
+            return None
+    with ai_search_animation(message):
+        return call_openai_api(prompt, max_tokens)
+
+# Queries the local intent classifier answers without asking the model
+PHONE_PATTERN = re.compile(r"\+?[\d\s\-().]{8,20}")
+NAME_TOKEN_PATTERN = re.compile(r"[^\W\d_][^\W\d_'.-]*(?:['.-][^\W\d_]+)*")
+# Single words that are conversation rather than a name
+CONVERSATIONAL_WORDS = {
+    "hi", "hello", "hey", "hai", "yo", "hallo", "thanks", "thank", "thx", "terima", "makasih",
+    "yes", "no", "ok", "okay", "ya", "tidak", "bye", "help", "more", "all", "table", "detail", "details"
+}
+
+def classify_intent_locally(query, data_file=DATA_FILE):
+    """
+    Recognize obvious lookups without a model call.
+
+    Handles a 16-digit NIK, a phone number, a single word found in the Name
+    column and the '*:' all-fields prefix. Anything else, including single
+    words that are not part of any name (a city, say), is left to the model.
+
+    Args:
+        query (str): The user's search query
+        data_file (str): Data file whose names a single word is checked against
+
+    Returns:
+        dict: The same structure analyze_search_intent returns, with
+            "source": "local", or None if the query needs the model
+    """
+    query = query.strip()
+    intent = {"filters": [], "is_specific_person": False, "source": "local"}
+    if query.startswith("*:") and len(query) > 2 and "*:" not in query[2:]:
+        return dict(intent, search_fields=["all"], search_term=query[2:].strip())
+    compact = re.sub(r"[\s\-.]", "", query)
+    if NIK_PATTERN.fullmatch(compact):
+        return dict(intent, search_fields=["NIK"], search_term=compact, is_specific_person=True)
+    digits = re.sub(r"\D", "", query)
+    if PHONE_PATTERN.fullmatch(query) and 9 <= len(digits) <= 15:
+        return dict(intent, search_fields=["Phone Number"], search_term=query, is_specific_person=True)
+    if (NAME_TOKEN_PATTERN.fullmatch(query) and query.lower() not in CONVERSATIONAL_WORDS
+            and matches_a_name(query, data_file)):
+        return dict(intent, search_fields=["Name"], search_term=query)
+    return None
+
+def matches_a_name(word, data_file=DATA_FILE):
+    """Check whether word is part of at least one name in the data file."""
+    try:
+        return bool(find_by_name(word, data_file))
+    except Exception:
+        return False  # The model's search reports the problem
+
+def stream_chat_completion(messages, on_token=None, **params):
+    """
+    Request a chat completion and hand each piece of text to on_token as it arrives.
+
+    Args:
+        messages (list): Conversation messages
+        on_token (callable): Called with each text fragment, in order
+        **params: Other chat.completions.create arguments (model, max_tokens, ...)
+
+    Returns:
+        str: The full reply, stripped
+    """
+    text, _ = stream_chat_message(messages, on_token, **params)
+    return text
+
+@telemetry.timed("reply")
+def stream_chat_message(messages, on_token=None, **params):
+    """
+    Like stream_chat_completion, but also return the tool calls the model made.
+
+    Transient errors are retried within the call deadline (see
+    call_with_policy). A streamed reply is only retried while none of it has
+    been passed to on_token, and is never hedged. The deadline also holds
+    while a reply streams: the per-attempt timeout only bounds the gap
+    between chunks, so a reply that keeps trickling in is cut off once the
+    deadline passes.
+
+    Returns:
+        tuple: (text, tool_calls) where tool_calls is a list of
+            {"id", "type", "function": {"name", "arguments"}} dicts
+
+    Raises:
+        DeadlineExceeded: If the reply did not finish within CALL_DEADLINE
+    """
+    if not STREAM_REPLIES:
+        response = call_with_policy(
+            lambda timeout: get_client().chat.completions.create(messages=messages, timeout=timeout, **params),
+            kind="chat"
+        )
+        message = response.choices[0].message
+        text = message.content or ""
+        if on_token and text:
+            on_token(text)
+        tool_calls = [
+            {"id": call.id, "type": "function",
+             "function": {"name": call.function.name, "arguments": call.function.arguments or ""}}
+            for call in (getattr(message, "tool_calls", None) or [])
+        ]
+        record_usage(getattr(response, "usage", None), messages,
+                     text + "".join(call["function"]["arguments"] for call in tool_calls))
+        return text.strip(), tool_calls
+
+    emitted = []
+    ends_at = time.perf_counter() + CALL_DEADLINE
+
+    def attempt(timeout):
+        parts = []
+        calls = {}
+        usage = None
+        stream = get_client().chat.completions.create(messages=messages, stream=True, timeout=timeout, **params)
+        for chunk in stream:
+            if time.perf_counter() > ends_at:
+                getattr(stream, "close", lambda: None)()  # Drop the connection
+                raise DeadlineExceeded(f"Reply not finished within the {CALL_DEADLINE:g}s deadline")
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                parts.append(delta.content)
+                if on_token:
+                    emitted.append(True)
+                    on_token(delta.content)
+            # Tool calls arrive in fragments keyed by index; the arguments are
+            # streamed as pieces of a JSON string
+            for call in getattr(delta, "tool_calls", None) or []:
+                entry = calls.setdefault(call.index, {"id": None, "type": "function",
+                                                      "function": {"name": "", "arguments": ""}})
+                if call.id:
+                    entry["id"] = call.id
+                if call.function is not None:
+                    entry["function"]["name"] += call.function.name or ""
+                    entry["function"]["arguments"] += call.function.arguments or ""
+        tool_calls = [calls[index] for index in sorted(calls)]
+        record_usage(usage, messages, "".join(parts) + "".join(c["function"]["arguments"] for c in tool_calls))
+        return "".join(parts).strip(), tool_calls
+
+    return call_with_policy(attempt, kind="chat", hedge=False, can_retry=lambda: not emitted)
+
+class ReplyPrinter:
+    """
+    on_token callback that prints a streamed reply.
+
+    The first fragment stops the spinner and prints the "AI:" prefix; leading
+    whitespace is dropped so the output matches the stripped reply.
+    """
+
+    def __init__(self, spinner=None, prefix=f"{Fore.CYAN}AI: {Fore.WHITE}", stream=None):
+        self.spinner = spinner
+        self.prefix = prefix
+        self.stream = stream or sys.stdout
+        self.started = False
+
+    def __call__(self, token):
+        if not self.started:
+            token = token.lstrip()
+            if not token:
+                return
+            if self.spinner is not None:
+                self.spinner.stop()
+            self.stream.write(self.prefix)
+            self.started = True
+        self.stream.write(token)
+        self.stream.flush()
+
+    def finish(self):
+        """End the reply line; returns True if anything was printed."""
+        if self.started:
+            self.stream.write("\n")
+            self.stream.flush()
+        return self.started
+
+@telemetry.timed("intent")
+def analyze_search_intent(query, show_progress=True, data_file=DATA_FILE):
     """
     Use OpenAI to analyze the user's search intent and extract search parameters.
     
     Args:
         query (str): The user's search query
+        show_progress (bool): Show a spinner and print API or parsing problems
+        data_file (str): Data file the query will be searched in
         
     Returns:
-        dict: A dictionary containing the analyzed search parameters
+        dict: A dictionary containing the analyzed search parameters, with
+            "degraded": True when the model could not be used and the query
+            falls back to a name search
     """
+    local_intent = classify_intent_locally(query, data_file)
+    if local_intent is not None:
+        telemetry.set_value("intent_source", "local")
+        return local_intent
+    telemetry.set_value("intent_source", "model")
+
     prompt = f"""
     Analyze this employee search query: "{query}"
     
@@ -137,16 +471,15 @@ def analyze_search_intent(query):
     search_fields, search_term, filters, is_specific_person
     """
     
-    ai_search_animation("AI analyzing your search intent")
-    
-    response = call_openai_api(prompt)
+    response = ask_model(prompt, message="AI analyzing your search intent", show_progress=show_progress)
     if not response or "choices" not in response:
-        # Fallback to basic search if API fails
+        # Fallback to basic search if API fails (marked degraded)
         return {
             "search_fields": ["Name"],
             "search_term": query,
             "filters": [],
-            "is_specific_person": False
+            "is_specific_person": False,
+            "degraded": True
         }
     
     try:
@@ -163,28 +496,40 @@ def analyze_search_intent(query):
                 "search_fields": ["Name"],
                 "search_term": query,
                 "filters": [],
-                "is_specific_person": False
+                "is_specific_person": False,
+                "degraded": True
             }
     except (json.JSONDecodeError, KeyError) as e:
-        print(f"{Fore.YELLOW}Warning: Could not parse AI response. Using basic search instead.")
+        if show_progress:
+            print(f"{Fore.YELLOW}Warning: Could not parse AI response. Using basic search instead.")
         return {
             "search_fields": ["Name"],
             "search_term": query,
             "filters": [],
-            "is_specific_person": False
+            "is_specific_person": False,
+            "degraded": True
         }
 
-def evaluate_search_results(query, results, top_n=5):
+@telemetry.timed("evaluation")
+def evaluate_search_results(query, results, top_n=5, show_progress=True, data_file=DATA_FILE):
     """
     Use OpenAI to evaluate if the search results match what the user was looking for.
+
+    No evaluation is needed when exactly one result matches the query exactly,
+    and an evaluation is reused while the same query returns the same top
+    results (see evaluation_fingerprint), so follow-up turns in a conversation
+    do not repeat it.
     
     Args:
         query (str): The user's search query
         results (list): The search results
         top_n (int): Number of top results to evaluate
+        show_progress (bool): Show a spinner and print API or parsing problems
+        data_file (str): Path to the data file the results came from
         
     Returns:
-        dict: Evaluation results including relevance scores and suggestions
+        dict: Evaluation results including relevance scores and suggestions,
+            with "degraded": True when relevance could not be determined
     """
     if not results:
         return {
@@ -192,10 +537,45 @@ def evaluate_search_results(query, results, top_n=5):
             "message": "No results found.",
             "suggestions": ["Try a broader search term", "Check for typos", "Search in all fields"]
         }
-    
+    exact = evaluate_exact_match(query, results)
+    if exact is not None:
+        return exact
+
     # Limit to top N results for API efficiency
     top_results = results[:top_n]
-    
+    key = evaluation_fingerprint(query, top_results, len(results))
+    remembered = evaluation_memo.get(key)
+    if remembered is not None:
+        telemetry.add("evaluation_reuses")
+        return remembered
+
+    evaluation = None
+    if USE_LOCAL_RELEVANCE:
+        try:
+            evaluation = evaluate_results_locally(query, results, top_n, data_file)
+        except Exception:
+            pass  # Fall back to asking the model
+    if evaluation is None:
+        evaluation = request_evaluation(query, top_results, show_progress)
+    if evaluation is None:
+        # Not remembered, so the next turn asks again
+        return {
+            "relevant": True,
+            "message": "Results found, but relevance could not be determined.",
+            "suggestions": ["Try refining your search if these aren't what you're looking for"],
+            "degraded": True
+        }
+    evaluation_memo.put(key, evaluation)
+    return evaluation
+
+def request_evaluation(query, top_results, show_progress=True):
+    """
+    Ask the model whether top_results match query.
+
+    Returns:
+        dict: The model's evaluation, or None if the API failed or the
+            answer could not be parsed
+    """
     # Format results for the API
     results_text = "\n".join([
         f"Name: {r.get('Name', 'N/A')}, NIK: {r.get('NIK', 'N/A')}, "
@@ -219,16 +599,9 @@ def evaluate_search_results(query, results, top_n=5):
     relevant (boolean), message (string), best_match_index (integer or null), suggestions (array of strings)
     """
     
-    ai_search_animation("AI evaluating search results")
-    
-    response = call_openai_api(prompt, max_tokens=250)
+    response = ask_model(prompt, max_tokens=250, message="AI evaluating search results", show_progress=show_progress)
     if not response or "choices" not in response:
-        # Fallback if API fails
-        return {
-            "relevant": True,
-            "message": "Results found, but relevance could not be determined.",
-            "suggestions": ["Try refining your search if these aren't what you're looking for"]
-        }
+        return None
     
     try:
         # Extract the JSON from the response text
@@ -236,22 +609,235 @@ def evaluate_search_results(query, results, top_n=5):
         # Find JSON in the response
         json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
         if json_match:
-            json_str = json_match.group(0)
-            return json.loads(json_str)
-        else:
-            # If no JSON found, create a basic structure
-            return {
-                "relevant": True,
-                "message": "Results found, but relevance could not be determined.",
-                "suggestions": ["Try refining your search if these aren't what you're looking for"]
-            }
+            evaluation = json.loads(json_match.group(0))
+            if isinstance(evaluation, dict):
+                return evaluation
+        return None
     except (json.JSONDecodeError, KeyError) as e:
-        print(f"{Fore.YELLOW}Warning: Could not parse AI evaluation. Assuming results are relevant.")
-        return {
-            "relevant": True,
-            "message": "Results found, but relevance could not be determined.",
-            "suggestions": ["Try refining your search if these aren't what you're looking for"]
-        }
+        if show_progress:
+            print(f"{Fore.YELLOW}Warning: Could not parse AI evaluation. Assuming results are relevant.")
+        return None
+
+def normalize_query(query):
+    """Lowercase query and collapse its whitespace."""
+    return " ".join(str(query or "").lower().split())
+
+def record_id(record):
+    """Identify a record by its NIK, or by name and phone number without one."""
+    nik = str(record.get("NIK") or "").strip()
+    if nik:
+        return nik
+    return f"{normalize_query(record.get('Name'))}|{normalize_phone(record.get('Phone Number'))}"
+
+def evaluation_fingerprint(query, top_results, total):
+    """
+    Key under which an evaluation of top_results for query is remembered.
+
+    Made of the normalized query, the ids of the evaluated records in order,
+    and the total number of results (the evaluation message mentions it).
+    """
+    return make_key(normalize_query(query), [record_id(r) for r in top_results], total)
+
+def is_exact_match(query, record):
+    """True if query is exactly the record's name, NIK or phone number."""
+    wanted = normalize_query(query)
+    if not wanted:
+        return False
+    if wanted == normalize_query(record.get("Name")):
+        return True
+    if NIK_PATTERN.fullmatch(wanted):
+        return wanted == str(record.get("NIK") or "").strip()
+    if PHONE_PATTERN.fullmatch(wanted):
+        digits = normalize_phone(wanted)
+        return bool(digits) and digits == normalize_phone(record.get("Phone Number"))
+    return False
+
+def evaluate_exact_match(query, results):
+    """
+    Evaluation for results with exactly one exact match, made without any
+    scoring or model call; None otherwise.
+    """
+    exact = [index for index, record in enumerate(results) if is_exact_match(query, record)]
+    if len(exact) != 1:
+        return None
+    best = results[exact[0]]
+    return {
+        "relevant": True,
+        "message": f"Exact match: {best.get('Name', 'N/A')}.",
+        "best_match_index": exact[0],
+        "suggestions": []
+    }
+
+class EvaluationMemo:
+    """Thread-safe LRU map of evaluation fingerprints to evaluations."""
+
+    def __init__(self, max_entries=EVALUATION_MEMO_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a copy of the remembered evaluation, or None."""
+        with self._lock:
+            evaluation = self._entries.get(key)
+            if evaluation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(json.dumps(evaluation))
+
+    def put(self, key, evaluation):
+        with self._lock:
+            self._entries[key] = json.loads(json.dumps(evaluation))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+evaluation_memo = EvaluationMemo()
+
+def evaluate_results_locally(query, results, top_n=5, data_file=DATA_FILE):
+    """
+    Evaluate search results with the n-gram engine, without a model call.
+
+    The best match is the top-N result closest to the query. Results are
+    relevant when the best match is at least RELEVANT_SCORE similar to the
+    query, or, for substring and exact matches, when it contains one of the
+    query's words: a short term like "budi" is a weak n-gram match for a
+    whole name or address even when it is the one asked for.
+
+    Returns:
+        dict: The same keys evaluate_search_results returns
+    """
+    top_results = results[:top_n]
+    engine = ngram_search.get_engine(data_file)
+    scores = engine.score(query, top_results)
+    best_match_index = max(range(len(scores)), key=scores.__getitem__)
+    best = top_results[best_match_index]
+    approximate = all("_score" in record for record in top_results)
+    if approximate:
+        relevant = max(r["_score"] for r in top_results) >= RELEVANT_SCORE
+    else:
+        relevant = scores[best_match_index] >= RELEVANT_SCORE or contains_query_word(query, best)
+
+    suggestions = []
+    if approximate:
+        names = ", ".join(r.get("Name", "N/A") for r in top_results[:3])
+        message = f"No exact match; the closest records are near matches ({names})."
+        suggestions.append(f"Did you mean {best.get('Name', 'N/A')}?")
+    elif len(results) > top_n:
+        message = f"{len(results)} matching records; {best.get('Name', 'N/A')} is closest to the query."
+        suggestions.append("Add more of the name or part of the address to narrow the results")
+    else:
+        message = f"{len(results)} matching record(s); {best.get('Name', 'N/A')} is closest to the query."
+    return {
+        "relevant": relevant,
+        "message": message,
+        "best_match_index": best_match_index,
+        "suggestions": suggestions
+    }
+
+def contains_query_word(query, record):
+    """True when a word of query (three or more characters) starts a word in one of record's values."""
+    words = [word for word in re.findall(r"\w+", query.lower()) if len(word) >= 3]
+    text = " ".join(str(value).lower() for key, value in record.items() if not key.startswith("_"))
+    return any(re.search(rf"\b{re.escape(word)}", text) for word in words)
+
+def find_near_matches(search_term, data_file=DATA_FILE, limit=NEAR_MATCH_LIMIT):
+    """
+    Return records whose name or address is similar to search_term.
+
+    Used when a search finds nothing, e.g. because of a typo. Each record has
+    '_score' (cosine similarity, 0-1) and '_matched_field'. Empty when
+    scikit-learn is not installed.
+    """
+    if not USE_LOCAL_RELEVANCE:
+        return []
+    return ngram_search.get_engine(data_file).search(search_term, k=limit)
+
+@telemetry.timed("search")
+def search_for_intent(intent, query, data_file=DATA_FILE):
+    """
+    Run the search that an analyze_search_intent result asks for.
+
+    When a name or all-fields search finds nothing, near matches from the
+    n-gram engine are returned instead (marked with '_score').
+
+    Prints nothing and lets search errors propagate.
+
+    Args:
+        intent (dict): Result of analyze_search_intent
+        query (str): The original query, used when the intent has no search term
+        data_file (str): Path to the data file
+
+    Returns:
+        tuple: (search_term, results)
+    """
+    search_fields = intent.get("search_fields") or ["Name"]
+    if isinstance(search_fields, str):
+        search_fields = [search_fields]
+    fields = [str(field).lower() for field in search_fields]
+    search_term = str(intent.get("search_term") or query)
+    if "all" in fields or len(fields) > 1:
+        results = find_by_fields(search_term, data_file)
+    elif fields[0] == "nik" and NIK_PATTERN.fullmatch(search_term.strip()):
+        return search_term, find_by_nik(search_term, data_file)
+    elif fields[0] in ("phone", "phone number"):
+        # Exact match ignoring formatting first, then a partial number
+        results = find_by_phone(search_term, data_file)
+        return search_term, results or find_by_fields(search_term, data_file)
+    else:
+        results = find_by_name(search_term, data_file)
+    return search_term, results or find_near_matches(search_term, data_file)
+
+def run_intent_search(intent, query, data_file=DATA_FILE):
+    """
+    search_for_intent for the conversation loops: errors are printed and
+    give no results.
+    """
+    try:
+        return search_for_intent(intent, query, data_file)
+    except Exception as e:
+        print(f"{Fore.RED}ERROR: {str(e)}")
+        return intent.get("search_term") or query, []
+
+def degraded_turn(search_term, data_file=DATA_FILE):
+    """
+    Answer a conversation turn without the model, after its call failed.
+
+    The query is searched with the local intent classifier (in names and
+    addresses when it does not recognize it) and the reply lists what was
+    found, so the conversation can go on.
+
+    Returns:
+        tuple: (results, reply)
+    """
+    intent = (classify_intent_locally(search_term, data_file)
+              or {"search_fields": ["Name", "Address"], "search_term": search_term})
+    try:
+        _, results = search_for_intent(intent, search_term, data_file)
+    except Exception:
+        results = []
+    return results, degraded_reply(search_term, results)
+
+def degraded_reply(search_term, results):
+    """Describe search results plainly, in place of a model reply."""
+    if not results:
+        return (f"I couldn't reach the AI model just now, and a plain search for '{search_term}' "
+                "found nothing. Please try again in a moment.")
+    names = ", ".join(r.get("Name", "N/A") for r in results[:5])
+    if len(results) > 5:
+        names += f" and {len(results) - 5} more"
+    found = "near match(es)" if all("_score" in r for r in results) else "matching record(s)"
+    return (f"I couldn't reach the AI model just now, so here is a plain search instead: "
+            f"{len(results)} {found} for '{search_term}': {names}.")
 
 def sort_by_name_similarity(results, search_term):
     """
@@ -311,16 +897,8 @@ def ensure_api_key():
         # Reload env and update API_KEY
         load_dotenv(dotenv_path=env_path, override=True)
         API_KEY = os.getenv('AIMLAPI_KEY')
-        # Re-initialize OpenAI client
-        try:
-            from openai import OpenAI
-            global client
-            client = OpenAI(
-                base_url=API_BASE_URL,
-                api_key=API_KEY,
-            )
-        except Exception:
-            pass
+        # Drop the old client; get_client() re-creates it with the new key
+        client = None
 
 def ai_conversation_loop(initial_query, data_file=DATA_FILE):
     """
@@ -344,6 +922,8 @@ def ai_conversation_loop(initial_query, data_file=DATA_FILE):
     first_turn = True
     last_results = []
     show_all = False
+    session_id = telemetry.new_session_id()
+    turn_number = 0
 
     while True:
         # Greet the user on the first interaction, but only if the input is a greeting or not a search
@@ -358,67 +938,90 @@ def ai_conversation_loop(initial_query, data_file=DATA_FILE):
             else:
                 greeted = True
 
+        # With tool calling the model runs the search itself, except when the
+        # previous results are being shown again
+        use_tools = USE_TOOL_CALLING and not (show_all and last_results)
+        turn_number += 1
+        metrics = telemetry.start_turn("basic", search_term, session_id, turn_number)
+        degraded = False
+
         # If user previously asked for "more" or "all", show more results
         if show_all and last_results:
             results = last_results
             show_all = False
-        else:
+        elif not use_tools:
             # Use intent analysis to get search fields, but always use the user's text for generative AI
-            intent = analyze_search_intent(search_term)
-            search_fields = intent.get("search_fields", ["Name"])
-            new_search_term = intent.get("search_term")
-            if not new_search_term:
-                new_search_term = search_term
-            search_term = new_search_term
-            if "all" in [field.lower() for field in search_fields] or len(search_fields) > 1:
-                results = search_by_multiple_fields(search_term, data_file)
-            else:
-                results = search_by_name(search_term, data_file)
+            intent = analyze_search_intent(search_term, data_file=data_file)
+            search_term, results = run_intent_search(intent, search_term, data_file)
             last_results = results
 
-        # Prepare a summary of results for the AI
-        max_to_show = len(results) if show_all else min(5, len(results))
-        summary_rows = []
-        for r in results[:max_to_show]:
-            summary_rows.append(
-                f"Name: {r.get('Name', 'N/A')}, NIK: {r.get('NIK', 'N/A')}, "
-                f"Phone Number: {r.get('Phone Number', 'N/A')}, Address: {r.get('Address', 'N/A')}"
-            )
-        summary_text = "\n".join(summary_rows)
-        if not results:
-            summary_text = "No results found."
+        if not use_tools:
+            # Prepare a summary of results for the AI
+            max_to_show = len(results) if show_all else min(5, len(results))
+            summary_rows = []
+            for r in results[:max_to_show]:
+                summary_rows.append(
+                    f"Name: {r.get('Name', 'N/A')}, NIK: {r.get('NIK', 'N/A')}, "
+                    f"Phone Number: {r.get('Phone Number', 'N/A')}, Address: {r.get('Address', 'N/A')}"
+                )
+            summary_text = "\n".join(summary_rows)
+            if not results:
+                summary_text = "No results found."
 
-        # Add user message to conversation
-        conversation_history.append({"role": "user", "content": search_term})
+            # Add user message to conversation
+            conversation_history.append({"role": "user", "content": search_term})
 
-        # Add search result context for the AI
-        if results:
-            ai_context = (
-                f"Search results for '{search_term}':\n"
-                f"{summary_text}\n"
-                f"Total matches: {len(results)}"
-            )
-        else:
-            ai_context = f"No results found for '{search_term}'."
+            # Add search result context for the AI
+            if results:
+                ai_context = (
+                    f"Search results for '{search_term}':\n"
+                    f"{summary_text}\n"
+                    f"Total matches: {len(results)}"
+                )
+            else:
+                ai_context = f"No results found for '{search_term}'."
 
-        conversation_history.append({"role": "system", "content": ai_context})
+            conversation_history.append({"role": "system", "content": ai_context})
 
         # Call GPT-4o with the conversation history
-        ai_search_animation("AI thinking")
+        spinner = ai_search_animation("AI thinking")
+        printer = ReplyPrinter(spinner)
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=conversation_history,
-                max_tokens=300,
-                temperature=0.7
-            )
-            ai_reply = response.choices[0].message.content.strip()
+            with spinner:
+                if use_tools:
+                    results, ai_reply = run_tool_turn(
+                        search_term, data_file, conversation_history, on_token=printer,
+                        max_tokens=300, temperature=0.7, presence_penalty=0, frequency_penalty=0
+                    )
+                    last_results = results
+                    max_to_show = min(5, len(results))
+                else:
+                    ai_reply = stream_chat_completion(
+                        fit_to_budget(conversation_history),
+                        on_token=printer,
+                        model="gpt-4o",
+                        max_tokens=300,
+                        temperature=0.7
+                    )
         except Exception as e:
-            print(f"{Fore.RED}AI Error: {e}")
-            print(f"{Fore.CYAN}AI: Sorry, I couldn't process your request right now.")
-            return
+            # Keep the conversation going on a local search (degraded)
+            printer.finish()
+            print(f"{Fore.YELLOW}AI unavailable ({e}); answering from a local search.")
+            printer = ReplyPrinter()
+            degraded = True
+            if use_tools:
+                results, ai_reply = degraded_turn(search_term, data_file)
+                last_results = results
+                max_to_show = min(5, len(results))
+            else:
+                ai_reply = degraded_reply(search_term, results)
 
-        print(f"{Fore.CYAN}AI: {Fore.WHITE}{ai_reply}")
+        if not printer.finish():
+            print(f"{Fore.CYAN}AI: {Fore.WHITE}{ai_reply}")
+        conversation_history.append({"role": "assistant", "content": ai_reply})
+        # Earlier search results are superseded by this turn's
+        conversation_history = drop_stale_context(conversation_history)
+        telemetry.finish_turn(metrics, result_count=len(results), degraded=degraded)
 
         # If no results, ask for more details
         if not results:
@@ -468,42 +1071,334 @@ def ai_conversation_loop(initial_query, data_file=DATA_FILE):
         # Otherwise, treat as next conversational turn
         search_term = user_input
 
-def ai_conversation_loop_personal(initial_query, data_file=DATA_FILE):
+# Worker threads for the blocking model calls and searches in a conversation
+# turn. A private pool rather than asyncio's default one, so that asyncio.run()
+# does not wait for a cancelled speculative search to finish. The AI service
+# (assets/ai_service.py) runs every session's turns on it, hence the size;
+# threads are only started as they are needed
+TURN_WORKERS = env_number('SEADAT_TURN_WORKERS', 16, int, minimum=1)
+_turn_executor = None
+
+def get_turn_executor():
+    """Return the shared worker pool for conversation turns."""
+    global _turn_executor
+    if _turn_executor is None:
+        _turn_executor = ThreadPoolExecutor(max_workers=TURN_WORKERS, thread_name_prefix="seadat-turn")
+    return _turn_executor
+
+def is_plain_name_search(intent, query):
+    """True if intent asks for a name search on the query exactly as typed."""
+    search_fields = intent.get("search_fields") or ["Name"]
+    if isinstance(search_fields, str):
+        search_fields = [search_fields]
+    search_term = str(intent.get("search_term") or query)
+    return ([str(field).lower() for field in search_fields] == ["name"]
+            and search_term.strip().lower() == query.strip().lower())
+
+def remember_results(search_memory, search_term, results):
+    """Record a successful search in the personal loop's memory."""
+    if not results:
+        return
+    search_memory["successful_searches"].append({
+        "term": search_term,
+        "result_count": len(results),
+        "top_result": results[0]["Name"] if results else None
+    })
+    
+    # Try to identify user preferences based on searches
+    if len(search_memory["successful_searches"]) > 2:
+        # Check if user frequently searches by department
+        dept_pattern = r"(hr|it|finance|marketing|sales|engineering)"
+        dept_matches = [re.search(dept_pattern, s["term"], re.IGNORECASE) for s in search_memory["past_searches"]]
+        if any(dept_matches):
+            search_memory["user_preferences"]["searches_by_department"] = True
+
+def build_search_context(search_term, results, search_memory):
     """
-    Run a conversational AI search loop that gives the AI more autonomy and personality.
+    Build the JSON search context the personal loop gives the model each turn.
+
+    The current turn's relevance analysis runs alongside the reply, so the
+    model only sees an earlier one, and only when it was made for the same
+    query and the same top results (e.g. a repeated search); a verdict on
+    other results would be stale.
     """
-    # More sophisticated system prompt to encourage independent thinking
-    conversation_history = [
-        {"role": "system", "content": (
-            "You are SeaDat Assistant, a helpful and intelligent AI assistant with your own personality, powered by GPT-4o. "
-            "You can answer any user question, not just about employee data. "
-            "If the user asks about employee data, you can search fields: Name, NIK, Phone Number, and Address. "
-            "If the user asks about something else, answer as best you can. "
-            "You can reason through complex requests and interpret user intent. "
-            "You have memory of the conversation and can refer back to previous searches. "
-            "You have opinions and can make recommendations based on the context.\n\n"
-            "Important guidelines:\n"
-            "- Be conversational and natural like ChatGPT or Claude\n"
-            "- You can ask clarifying questions when needed\n"
-            "- Make your own decisions about what information is most relevant\n"
-            "- Feel free to suggest alternatives if initial search doesn't yield good results\n"
-            "- Maintain a friendly, slightly ocean-themed personality\n"
-            "- If search results seem irrelevant, acknowledge this and suggest why\n"
-            "- You can make inferences about the data beyond what's explicitly provided"
-        )}
-    ]
+    if not results:
+        return compact_json({
+            "search_term": search_term,
+            "results": "No results found",
+            "search_memory": {
+                "past_searches": [s["term"] for s in search_memory["past_searches"][-3:]]
+            }
+        })
     
-    # Create memory for the AI
-    search_memory = {
+    # Prepare a summary of results for the AI (list order gives the index)
+    results_formatted = []
+    for r in results[:5]:
+        results_formatted.append({
+            "name": r.get("Name", "N/A"),
+            "nik": r.get("NIK", "N/A"),
+            "phone_number": r.get("Phone Number", "N/A"),
+            "address": r.get("Address", "N/A")
+        })
+    ai_context = {
+        "search_term": search_term,
+        "results": results_formatted,
+        "total_matches": len(results),
+        "near_matches_only": all("_score" in r for r in results),
+        "search_memory": {
+            "recent_searches": [s["term"] for s in search_memory["past_searches"][-3:] if s["term"] != search_term],
+            "preferences": search_memory["user_preferences"]
+        }
+    }
+    previous = search_memory.get("last_relevance_analysis")
+    if previous and previous["fingerprint"] == evaluation_fingerprint(search_term, results[:5], len(results)):
+        ai_context["relevance_analysis"] = previous["analysis"]
+    return compact_json(ai_context)
+
+async def run_personal_turn(search_term, data_file, conversation_history, search_memory, on_token=None):
+    """
+    Run one turn of the personal conversation loop as a concurrent pipeline.
+
+    While the model analyzes the intent, the raw query is already searched as
+    a name; that speculative result is used when the intent turns out to be
+    that same name search and dropped otherwise. Once the results are known,
+    the reply and the relevance evaluation are requested at the same time; the
+    evaluation is kept in search_memory for the next turn's context. Queries
+    the local classifier understands skip the intent call altogether.
+
+    Appends the user message and search context to conversation_history (the
+    caller appends the reply). Reply fragments are passed to on_token as they
+    arrive.
+
+    Returns:
+        tuple: (results, ai_reply)
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_turn_executor()
+
+    intent = await loop.run_in_executor(executor, classify_intent_locally, search_term, data_file)
+    speculative = None
+    if intent is None:
+        speculative = loop.run_in_executor(
+            executor, telemetry.bind(telemetry.timed("search")(find_by_name)), search_term, data_file
+        )
+        intent = await loop.run_in_executor(
+            executor, telemetry.bind(analyze_search_intent), search_term, False, data_file
+        )
+
+    results = None
+    if speculative is not None:
+        if is_plain_name_search(intent, search_term):
+            try:
+                # Nothing found means near matches are wanted, which the search below adds
+                results = await speculative or None
+            except Exception:
+                results = None  # Searched again below, which reports the error
+        else:
+            speculative.cancel()
+    if results is None:
+        _, results = await loop.run_in_executor(
+            executor, telemetry.bind(run_intent_search), intent, search_term, data_file
+        )
+
+    remember_results(search_memory, search_term, results)
+    conversation_history.append({"role": "user", "content": search_term})
+    conversation_history.append({
+        "role": "system", 
+        "content": f"Current search context (AI use only):\n{build_search_context(search_term, results, search_memory)}"
+    })
+    messages = fit_to_budget(conversation_history)
+
+    def draft_reply():
+        return stream_chat_completion(
+            messages,
+            on_token=on_token,
+            model="gpt-4o",
+            max_tokens=400,  # Allow longer responses for more natural conversation
+            temperature=0.8,  # Higher temperature for more creative responses
+            presence_penalty=0.6,  # Encourage varied responses
+            frequency_penalty=0.3  # Discourage repetition
+        )
+
+    reply = loop.run_in_executor(executor, telemetry.bind(draft_reply))
+    evaluation = None
+    if results:
+        evaluation = loop.run_in_executor(
+            executor, telemetry.bind(evaluate_search_results), search_term, results, 5, False, data_file
+        )
+    try:
+        ai_reply = await reply
+    except BaseException:
+        if evaluation is not None:
+            evaluation.cancel()
+        raise
+    analysis = await evaluation if evaluation is not None else None
+    search_memory["last_relevance_analysis"] = analysis and {
+        # Tagged with what it judged, see build_search_context
+        "fingerprint": evaluation_fingerprint(search_term, results[:5], len(results)),
+        "analysis": analysis
+    }
+    return results, ai_reply
+
+def run_search_tool(arguments, data_file=DATA_FILE):
+    """
+    Run a search_employees tool call.
+
+    Args:
+        arguments (str): The JSON arguments the model sent
+        data_file (str): Path to the data file
+
+    Returns:
+        tuple: (content for the tool message, matching records)
+    """
+    try:
+        args = json.loads(arguments or "{}")
+        term = str(args.get("term", "")).strip()
+        fields = args.get("fields") or ["name"]
+        limit = min(max(int(args.get("limit") or 5), 1), TOOL_RESULT_LIMIT)
+    except (ValueError, TypeError, AttributeError) as e:
+        return compact_json({"error": f"Invalid arguments: {e}"}), []
+    if not term:
+        return compact_json({"error": "term is required"}), []
+    if isinstance(fields, str):
+        fields = [fields]
+    fields = ["Phone Number" if str(field).lower() == "phone" else field for field in fields]
+    try:
+        _, results = search_for_intent({"search_fields": fields, "search_term": term}, term, data_file)
+    except Exception as e:
+        return compact_json({"error": str(e)}), []
+    return compact_json({
+        "term": term,
+        "total_matches": len(results),
+        "near_matches_only": bool(results) and all("_score" in r for r in results),
+        "results": [
+            {"name": r.get("Name"), "nik": r.get("NIK"), "phone_number": r.get("Phone Number"),
+             "address": r.get("Address")}
+            for r in results[:limit]
+        ]
+    }), results
+
+def run_tool_turn(search_term, data_file, conversation_history, search_memory=None, on_token=None, **params):
+    """
+    Run one conversation turn with the search exposed as a tool.
+
+    The model gets the conversation and calls search_employees as often as it
+    needs (several lookups in one response are all run), then answers, so a
+    turn takes one exchange with no intent or evaluation prompts. Queries the
+    local classifier understands are searched up front and their results sent
+    with the first request, which usually makes a tool call unnecessary.
+
+    The messages are fitted to the token budget again before every round,
+    tool results included (see fit_tool_results). Appends the user message
+    and the search context to conversation_history: the up-front one, or
+    after a tool search a compact context of its results, so later turns
+    know what the reply was based on. search_memory is the personal loop's
+    memory, and params override the reply settings (max_tokens,
+    temperature, ...).
+
+    Returns:
+        tuple: (results of the last search, ai_reply)
+    """
+    if search_memory is None:
+        search_memory = new_search_memory()
+    results = []
+    intent = classify_intent_locally(search_term, data_file)
+    conversation_history.append({"role": "user", "content": search_term})
+    if intent is not None:
+        _, results = run_intent_search(intent, search_term, data_file)
+        remember_results(search_memory, search_term, results)
+        conversation_history.append({
+            "role": "system",
+            "content": f"Current search context (AI use only):\n{build_search_context(search_term, results, search_memory)}"
+        })
+
+    params = dict({
+        "model": "gpt-4o",
+        "max_tokens": 400,
+        "temperature": 0.8,
+        "presence_penalty": 0.6,
+        "frequency_penalty": 0.3
+    }, **params)
+    exchange = []  # This turn's tool calls and results
+    searched_term = None
+    for round_number in range(MAX_TOOL_ROUNDS + 1):
+        # After MAX_TOOL_ROUNDS lookups the model has to answer with what it has
+        tool_choice = "auto" if round_number < MAX_TOOL_ROUNDS else "none"
+        messages = fit_tool_results(fit_to_budget(conversation_history) + exchange)
+        ai_reply, tool_calls = stream_chat_message(
+            messages, on_token=on_token, tools=SEARCH_TOOLS, tool_choice=tool_choice, **params
+        )
+        if not tool_calls:
+            break
+        exchange.append({"role": "assistant", "content": ai_reply or None, "tool_calls": tool_calls})
+        for call in tool_calls:
+            if call["function"]["name"] == "search_employees":
+                content, found = run_search_tool(call["function"]["arguments"], data_file)
+                if found:
+                    results = found
+                    searched_term = json.loads(content).get("term")
+                    remember_results(search_memory, search_term, found)
+            else:
+                content = compact_json({"error": f"Unknown tool {call['function']['name']}"})
+            exchange.append({"role": "tool", "tool_call_id": call["id"], "content": content})
+
+    if searched_term is not None:
+        # Replaces the up-front context in later turns (see drop_stale_context)
+        conversation_history.append({
+            "role": "system",
+            "content": f"Current search context (AI use only):\n{build_search_context(searched_term, results, search_memory)}"
+        })
+    return results, ai_reply
+
+# More sophisticated system prompt to encourage independent thinking
+PERSONAL_SYSTEM_PROMPT = (
+    "You are SeaDat Assistant, a helpful and intelligent AI assistant with your own personality, powered by GPT-4o. "
+    "You can answer any user question, not just about employee data. "
+    "If the user asks about employee data, you can search fields: Name, NIK, Phone Number, and Address. "
+    "If the user asks about something else, answer as best you can. "
+    "You can reason through complex requests and interpret user intent. "
+    "You have memory of the conversation and can refer back to previous searches. "
+    "You have opinions and can make recommendations based on the context.\n\n"
+    "Important guidelines:\n"
+    "- Be conversational and natural like ChatGPT or Claude\n"
+    "- You can ask clarifying questions when needed\n"
+    "- Make your own decisions about what information is most relevant\n"
+    "- Feel free to suggest alternatives if initial search doesn't yield good results\n"
+    "- Maintain a friendly, slightly ocean-themed personality\n"
+    "- If search results seem irrelevant, acknowledge this and suggest why\n"
+    "- You can make inferences about the data beyond what's explicitly provided"
+)
+
+def new_search_memory():
+    """Return empty search memory for a personal conversation."""
+    return {
         "past_searches": [],
         "successful_searches": [],
         "current_context": {},
         "user_preferences": {}
     }
+
+def track_search(search_memory, search_term):
+    """Record a search term in the memory the first time it is used."""
+    if search_term not in [s["term"] for s in search_memory["past_searches"]]:
+        search_memory["past_searches"].append({
+            "term": search_term,
+            "timestamp": datetime.now().strftime("%H:%M:%S"),
+            "context": search_memory["current_context"].copy()
+        })
+
+def ai_conversation_loop_personal(initial_query, data_file=DATA_FILE):
+    """
+    Run a conversational AI search loop that gives the AI more autonomy and personality.
+    """
+    conversation_history = [{"role": "system", "content": PERSONAL_SYSTEM_PROMPT}]
+    search_memory = new_search_memory()
     
     search_term = initial_query
     first_turn = True
     last_results = []
+    session_id = telemetry.new_session_id()
+    turn_number = 0
 
     while True:
         # Handle first turn greeting more naturally
@@ -518,119 +1413,50 @@ def ai_conversation_loop_personal(initial_query, data_file=DATA_FILE):
             first_turn = False
         
         # Track the search in memory
-        if search_term not in [s["term"] for s in search_memory["past_searches"]]:
-            search_memory["past_searches"].append({
-                "term": search_term,
-                "timestamp": datetime.now().strftime("%H:%M:%S"),
-                "context": search_memory["current_context"].copy()
-            })
-        
-        # Use intent analysis but give AI more decision-making power
-        intent = analyze_search_intent(search_term)
-        search_fields = intent.get("search_fields", ["Name"])
-        new_search_term = intent.get("search_term", search_term)
-        
-        # Let the AI decide how to search based on intent
-        if "all" in [field.lower() for field in search_fields] or len(search_fields) > 1:
-            results = search_by_multiple_fields(new_search_term, data_file)
-        else:
-            results = search_by_name(new_search_term, data_file)
-        
-        last_results = results
-        
-        # Update memory with search results
-        if results:
-            search_memory["successful_searches"].append({
-                "term": search_term,
-                "result_count": len(results),
-                "top_result": results[0]["Name"] if results else None
-            })
-            
-            # Try to identify user preferences based on searches
-            if len(search_memory["successful_searches"]) > 2:
-                # Check if user frequently searches by department
-                dept_pattern = r"(hr|it|finance|marketing|sales|engineering)"
-                dept_matches = [re.search(dept_pattern, s["term"], re.IGNORECASE) for s in search_memory["past_searches"]]
-                if any(dept_matches):
-                    search_memory["user_preferences"]["searches_by_department"] = True
-        
-        # Prepare a summary of results for the AI
-        max_to_show = min(5, len(results))
-        results_formatted = []
-        for i, r in enumerate(results[:max_to_show]):
-            results_formatted.append({
-                "index": i + 1,
-                "name": r.get("Name", "N/A"),
-                "nik": r.get("NIK", "N/A"),
-                "phone_number": r.get("Phone Number", "N/A"),
-                "address": r.get("Address", "N/A")
-            })
-        
-        # Add user message to conversation
-        conversation_history.append({"role": "user", "content": search_term})
-        
-        # Provide context about current search state to the AI
-        if results:
-            ai_context = {
-                "search_term": search_term,
-                "results": results_formatted,
-                "total_matches": len(results),
-                "search_memory": {
-                    "past_searches_count": len(search_memory["past_searches"]),
-                    "recent_searches": [s["term"] for s in search_memory["past_searches"][-3:]],
-                    "preferences": search_memory["user_preferences"]
-                }
-            }
-            
-            # Add relevance analysis
-            eval_results = evaluate_search_results(search_term, results)
-            ai_context["relevance_analysis"] = eval_results
-            
-            context_json = json.dumps(ai_context, indent=2)
-        else:
-            context_json = json.dumps({
-                "search_term": search_term,
-                "results": "No results found",
-                "search_memory": {
-                    "past_searches": [s["term"] for s in search_memory["past_searches"][-3:]]
-                }
-            })
-        
-        # Add this rich context to the conversation
-        conversation_history.append({
-            "role": "system", 
-            "content": f"Current search context (AI use only):\n{context_json}"
-        })
+        track_search(search_memory, search_term)
         
-        # Call GPT-4o with conversation history and prompting
-        ai_search_animation("AI formulating response")
+        # One tool-calling exchange, or intent, search, evaluation and reply
+        # as a concurrent pipeline when tools are turned off
+        spinner = ai_search_animation("AI formulating response")
+        printer = ReplyPrinter(spinner, prefix=f"\n{Fore.CYAN}AI: {Fore.WHITE}")
+        turn_number += 1
+        metrics = telemetry.start_turn("personal", search_term, session_id, turn_number)
+        degraded = False
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=conversation_history,
-                max_tokens=400,  # Allow longer responses for more natural conversation
-                temperature=0.8,  # Higher temperature for more creative responses
-                presence_penalty=0.6,  # Encourage varied responses
-                frequency_penalty=0.3  # Discourage repetition
-            )
-            ai_reply = response.choices[0].message.content.strip()
+            with spinner:
+                if USE_TOOL_CALLING:
+                    results, ai_reply = run_tool_turn(
+                        search_term, data_file, conversation_history, search_memory, on_token=printer
+                    )
+                else:
+                    results, ai_reply = asyncio.run(
+                        run_personal_turn(search_term, data_file, conversation_history, search_memory, on_token=printer)
+                    )
+            last_results = results
             
             # Add the AI response to conversation history
             conversation_history.append({"role": "assistant", "content": ai_reply})
             
-            # Limit conversation history to prevent token overflow
-            if len(conversation_history) > 12:  # Keep most recent turns
-                # Always keep the system prompt
-                system_prompt = conversation_history[0]
-                conversation_history = [system_prompt] + conversation_history[-11:]
+            # Earlier search context is superseded by this turn's; the token
+            # budget (fit_to_budget) keeps each request flat from here on
+            conversation_history = drop_stale_context(conversation_history)
         except Exception as e:
-            print(f"{Fore.RED}AI Error: {e}")
-            print(f"{Fore.CYAN}AI: I'm having trouble connecting right now. Let's try again in a moment.")
-            conversation_history.append({"role": "assistant", "content": "I'm having trouble connecting right now."})
-            return
+            # Keep the conversation going on a local search (degraded)
+            printer.finish()
+            print(f"\n{Fore.YELLOW}AI unavailable ({e}); answering from a local search.")
+            printer = ReplyPrinter()
+            degraded = True
+            results, ai_reply = degraded_turn(search_term, data_file)
+            last_results = results
+            conversation_history.append({"role": "assistant", "content": ai_reply})
+            conversation_history = drop_stale_context(conversation_history)
+        
+        max_to_show = min(5, len(results))
         
-        # Print AI response with better formatting
-        print(f"\n{Fore.CYAN}AI: {Fore.WHITE}{ai_reply}")
+        # Print AI response with better formatting, unless it was streamed
+        if not printer.finish():
+            print(f"\n{Fore.CYAN}AI: {Fore.WHITE}{ai_reply}")
+        telemetry.finish_turn(metrics, result_count=len(results), degraded=degraded)
         
         # Get next user input
         user_input = input(f"\n{Fore.BLUE}You: {Fore.WHITE}").strip()
@@ -669,17 +1495,20 @@ def ai_conversation_loop_personal(initial_query, data_file=DATA_FILE):
                 })
                 
                 # Call API for a natural follow-up response
+                follow_up_printer = ReplyPrinter(prefix=f"\n{Fore.CYAN}AI: {Fore.WHITE}")
                 try:
-                    follow_up = client.chat.completions.create(
+                    follow_up_reply = stream_chat_completion(
+                        fit_to_budget(conversation_history),
+                        on_token=follow_up_printer,
                         model="gpt-4o",
-                        messages=conversation_history,
                         max_tokens=150,
                         temperature=0.7
                     )
-                    follow_up_reply = follow_up.choices[0].message.content.strip()
-                    print(f"\n{Fore.CYAN}AI: {Fore.WHITE}{follow_up_reply}")
+                    if not follow_up_printer.finish():
+                        print(f"\n{Fore.CYAN}AI: {Fore.WHITE}{follow_up_reply}")
                     conversation_history.append({"role": "assistant", "content": follow_up_reply})
                 except Exception:
+                    follow_up_printer.finish()
                     print(f"\n{Fore.CYAN}AI: There you go! All the results for '{search_term}'. Anything else you'd like to know?")
             else:
                 print(f"\n{Fore.CYAN}AI: I've already shown you all the results I have.")
@@ -720,9 +1549,28 @@ def display_ai_help():
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}back{Fore.WHITE} to return to main menu")
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}help{Fore.WHITE} to show this guide")
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}clear{Fore.WHITE} to clear the screen")
+    print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}cache{Fore.WHITE} to see AI response cache statistics")
+    print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}stats{Fore.WHITE} to see p50/p95 timings per stage of past turns")
     print(f"{Fore.BLUE}{'~' * 60}")
     input(f"\n{Fore.CYAN}Press Enter to return to search...")
 
+def display_cache_stats():
+    """Display the AI response cache statistics."""
+    stats = llm_cache.stats()
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}AI response cache{Style.RESET_ALL} {Fore.WHITE}({LLM_CACHE['path']})")
+    print(f"{Fore.BLUE}{'~' * 60}")
+    if LLM_CACHE["ttl"] <= 0:
+        print(f"{Fore.YELLOW}Caching is turned off (SEADAT_LLM_CACHE_TTL=0)")
+    print(tabulate([
+        ["Cached responses", stats["entries"]],
+        ["Hits / misses (this session)", f"{stats['hits']} / {stats['misses']} ({stats['hit_rate']:.0%})"],
+        ["Time saved (this session)", f"{stats['saved_ms'] / 1000:.1f}s"],
+        ["Hits / misses (all time)", f"{stats['total_hits']} / {stats['total_misses']}"],
+        ["Time saved (all time)", f"{stats['total_saved_ms'] / 1000:.1f}s"],
+        ["Reused evaluations (this session)", f"{evaluation_memo.hits} / {evaluation_memo.hits + evaluation_memo.misses}"],
+    ], tablefmt="pretty"))
+    input(f"\n{Fore.CYAN}Press Enter to continue...")
+
 # Ensure run_ai_search is available for import
 def run_ai_search():
     """Run the AI conversational search functionality."""
@@ -746,7 +1594,14 @@ def run_ai_search():
             continue
         elif search_term == 'clear':
             continue  # Will clear on next loop
-        if search_term not in ['back', 'help', 'clear']:
+        elif search_term == 'cache':
+            display_cache_stats()
+            continue
+        elif search_term == 'stats':
+            telemetry.print_summary()
+            input(f"\n{Fore.CYAN}Press Enter to continue...")
+            continue
+        if search_term not in ['back', 'help', 'clear', 'cache', 'stats']:
             if search_term not in search_history:
                 search_history.append(search_term)
                 if len(search_history) > 5:
@@ -0,0 +1,345 @@
+"""
+Local multi-user AI Search service.
+
+One process hosts the conversations of many analysts over a small JSON/HTTP
+API, sharing a single warm copy of the dataset, the AI response cache and one
+pooled OpenAI client:
+
+    python main.py --ai-service --port 8700
+
+    POST   /sessions                      -> {"success", "session_id"}
+    POST   /sessions/<id>/messages        {"message": "who lives in banjarbaru"}
+                                          -> {"success", "reply", "count", "results", "degraded"}
+    DELETE /sessions/<id>
+    GET    /health                        GET /stats
+
+Each session keeps its own conversation history and search memory, and its
+turns run one at a time; turns of different sessions run concurrently on the
+AI Search worker pool, so a slow model call only holds up its own session.
+Responses use the same "success"/"error" shape as assets/api.py.
+"""
+import json
+import time
+import uuid
+import asyncio
+import argparse
+
+from . import ai_search as ai
+from . import telemetry
+from .search import count_records, warm_up_index
+from .context_budget import drop_stale_context
+from .settings import env_number
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8700
+
+# Sessions idle for longer than this are closed
+SESSION_IDLE_TIMEOUT = 30 * 60
+MAX_SESSIONS = 200
+
+# Records returned with each reply (the model sees the same top five)
+RESULTS_IN_REPLY = 5
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+
+# Seconds a client has to send a whole request, including the wait for the
+# next request on a kept-alive connection; then it gets a 408 and is closed
+REQUEST_READ_TIMEOUT = env_number('SEADAT_SERVICE_READ_TIMEOUT', 30.0, minimum=0)
+
+class ChatSession:
+    """One analyst's conversation: history, search memory and a turn lock."""
+
+    def __init__(self, session_id):
+        self.id = session_id
+        self.history = [{"role": "system", "content": ai.PERSONAL_SYSTEM_PROMPT}]
+        self.memory = ai.new_search_memory()
+        self.turns = 0
+        self.created = time.time()
+        self.last_used = self.created
+        self.lock = asyncio.Lock()
+
+    def idle_for(self, now=None):
+        return (now or time.time()) - self.last_used
+
+class ChatService:
+    """
+    Conversations for many users on shared AI Search state.
+
+    Args:
+        data_file (str): Data file searched by every session
+        max_sessions (int): Open sessions allowed at once
+        idle_timeout (float): Seconds after which an unused session is closed
+    """
+
+    def __init__(self, data_file=None, max_sessions=MAX_SESSIONS, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.data_file = str(data_file or ai.DATA_FILE)
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.started = time.time()
+        self.turns = 0
+        self.degraded_turns = 0
+
+    async def warm_up(self):
+        """Load the dataset, the n-gram engine and the OpenAI client before the first request."""
+        loop = asyncio.get_running_loop()
+        executor = ai.get_turn_executor()
+        await loop.run_in_executor(executor, warm_up_index, self.data_file)
+        if ai.USE_LOCAL_RELEVANCE:
+            await loop.run_in_executor(executor, ai.ngram_search.get_engine, self.data_file)
+        if ai.API_KEY:
+            await loop.run_in_executor(executor, ai.get_client)
+
+    def expire_sessions(self):
+        """Close sessions that have been idle past the timeout."""
+        now = time.time()
+        for session_id in [sid for sid, s in self.sessions.items() if s.idle_for(now) > self.idle_timeout]:
+            del self.sessions[session_id]
+
+    def create_session(self):
+        """
+        Open a session.
+
+        Returns:
+            dict: success, session_id and error
+        """
+        self.expire_sessions()
+        if len(self.sessions) >= self.max_sessions:
+            return {"success": False, "session_id": None, "error": "Too many open sessions, try again later."}
+        session = ChatSession(uuid.uuid4().hex[:12])
+        self.sessions[session.id] = session
+        return {"success": True, "session_id": session.id, "error": None}
+
+    def close_session(self, session_id):
+        if self.sessions.pop(session_id, None) is None:
+            return {"success": False, "error": f"Unknown session {session_id}"}
+        return {"success": True, "error": None}
+
+    async def send_message(self, session_id, message):
+        """
+        Run one conversation turn for a session.
+
+        Returns:
+            dict: success, session_id, reply, count, results, degraded and error
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {"success": False, "session_id": session_id, "error": f"Unknown session {session_id}"}
+        message = str(message or "").strip()
+        if not message:
+            return {"success": False, "session_id": session_id, "error": "message is required"}
+
+        async with session.lock:
+            session.last_used = time.time()
+            session.turns += 1
+            results, reply, degraded = await self._run_turn(session, message)
+            session.last_used = time.time()
+        self.turns += 1
+        self.degraded_turns += degraded
+        return {
+            "success": True,
+            "session_id": session_id,
+            "reply": reply,
+            "count": len(results),
+            "results": results[:RESULTS_IN_REPLY],
+            "degraded": degraded,
+            "error": None
+        }
+
+    async def _run_turn(self, session, message):
+        loop = asyncio.get_running_loop()
+        executor = ai.get_turn_executor()
+        ai.track_search(session.memory, message)
+        metrics = telemetry.start_turn("service", message, session.id, session.turns)
+        degraded = False
+        try:
+            if ai.USE_TOOL_CALLING:
+                results, reply = await loop.run_in_executor(
+                    executor, telemetry.bind(ai.run_tool_turn),
+                    message, self.data_file, session.history, session.memory
+                )
+            else:
+                results, reply = await ai.run_personal_turn(message, self.data_file, session.history, session.memory)
+        except Exception:
+            # Answer from a local search and keep the session usable
+            degraded = True
+            results, reply = await loop.run_in_executor(executor, ai.degraded_turn, message, self.data_file)
+        session.history.append({"role": "assistant", "content": reply})
+        session.history = drop_stale_context(session.history)
+        telemetry.finish_turn(metrics, result_count=len(results), degraded=degraded)
+        return results, reply, degraded
+
+    def stats(self):
+        """Return service, cache and evaluation reuse statistics."""
+        self.expire_sessions()
+        return {
+            "success": True,
+            "sessions": len(self.sessions),
+            "turns": self.turns,
+            "degraded_turns": self.degraded_turns,
+            "uptime_s": round(time.time() - self.started),
+            "llm_cache": ai.llm_cache.stats(),
+            "evaluation_reuses": ai.evaluation_memo.hits,
+            "error": None
+        }
+
+    def health(self):
+        return {
+            "success": True,
+            "sessions": len(self.sessions),
+            "records": count_records(self.data_file),
+            "model_configured": bool(ai.API_KEY),
+            "error": None
+        }
+
+    async def dispatch(self, method, path, body):
+        """
+        Route one request.
+
+        Returns:
+            tuple: (HTTP status, response dict)
+        """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if method == "GET" and parts == ["health"]:
+            return 200, self.health()
+        if method == "GET" and parts == ["stats"]:
+            return 200, self.stats()
+        if method == "POST" and parts == ["sessions"]:
+            created = self.create_session()
+            return (201 if created["success"] else 503), created
+        if len(parts) >= 2 and parts[0] == "sessions":
+            session_id = parts[1]
+            if method == "DELETE" and len(parts) == 2:
+                closed = self.close_session(session_id)
+                return (200 if closed["success"] else 404), closed
+            if method == "POST" and parts[2:] == ["messages"]:
+                try:
+                    payload = json.loads(body or b"{}")
+                except json.JSONDecodeError:
+                    return 400, {"success": False, "error": "Body must be JSON"}
+                if not isinstance(payload, dict):
+                    return 400, {"success": False, "error": "Body must be a JSON object"}
+                reply = await self.send_message(session_id, payload.get("message"))
+                if reply["success"]:
+                    return 200, reply
+                return (404 if session_id not in self.sessions else 400), reply
+        return 404, {"success": False, "error": f"No route for {method} {path}"}
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 408: "Request Timeout",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+async def read_request(reader, timeout=None):
+    """
+    Read one HTTP/1.1 request.
+
+    Args:
+        reader (StreamReader): The connection
+        timeout (float): Seconds for the whole request, defaults to REQUEST_READ_TIMEOUT
+
+    Returns:
+        tuple: (method, path, headers, body), or None when the client closed
+            the connection
+
+    Raises:
+        asyncio.TimeoutError: If the request did not arrive in time
+    """
+    timeout = REQUEST_READ_TIMEOUT if timeout is None else timeout
+    return await asyncio.wait_for(_read_request(reader), timeout)
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+def write_response(writer, status, payload, keep_alive=True):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+    )
+
+async def handle_connection(service, reader, writer):
+    """Serve requests on one connection until the client closes it."""
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except asyncio.TimeoutError:
+                write_response(writer, 408, {"success": False, "error": "Request timed out"}, keep_alive=False)
+                break
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                write_response(writer, 413 if "too large" in str(e) else 400,
+                               {"success": False, "error": str(e) or "Malformed request"}, keep_alive=False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            try:
+                status, payload = await service.dispatch(method, path, body)
+            except Exception as e:
+                status, payload = 500, {"success": False, "error": str(e)}
+            keep_alive = headers.get("connection", "").lower() != "close"
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()  # Also on cancellation, which then propagates so the server can shut down
+
+async def start_service(host=DEFAULT_HOST, port=DEFAULT_PORT, data_file=None):
+    """
+    Start the service on the running event loop.
+
+    Returns:
+        tuple: (asyncio server, ChatService)
+    """
+    service = ChatService(data_file)
+    await service.warm_up()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port
+    )
+    return server, service
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, data_file=None):
+    server, service = await start_service(host, port, data_file)
+    address = server.sockets[0].getsockname()
+    print(f"SeaDat AI service listening on http://{address[0]}:{address[1]} "
+          f"({count_records(service.data_file)} records)")
+    if not ai.API_KEY:
+        print("AIMLAPI_KEY is not set: replies will come from plain local searches (degraded).")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host AI Search conversations for several users.")
+    parser.add_argument("--ai-service", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--data", help="Data file to search, defaults to data/data.csv")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data))
+    except KeyboardInterrupt:
+        print("\nAI service stopped.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
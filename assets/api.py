@@ -0,0 +1,169 @@
+"""
+Headless SeaDat API.
+
+Every function here returns a plain dict and never prints, clears the screen
+or waits for input, so SeaDat can be embedded in other programs:
+
+    from assets.api import search, track_ip
+
+    found = search("*:jakarta")
+    if found["success"]:
+        for record in found["results"]:
+            ...
+
+Results follow the same shape as the rest of SeaDat: a "success" flag, the
+payload, and an "error" message when something went wrong. The modules behind
+each feature are imported on first use.
+"""
+import os
+
+def search(query, data_file=None, mode=None):
+    """
+    Search the employee data.
+
+    Args:
+        query (str): Search text; '*:term' searches all fields and a 16-digit
+            number is looked up as a NIK, as in the interactive search
+        data_file (str): CSV file or Parquet dataset, defaults to the one the
+            interactive search would use
+        mode (str): Force 'name', 'fields' or 'nik' instead of reading it
+            from the query
+
+    Returns:
+        dict: success, mode, term, count, results and error
+    """
+    from .search import classify_query, get_data_file, find_by_name, find_by_fields, find_by_nik
+
+    finders = {"name": find_by_name, "fields": find_by_fields, "nik": find_by_nik}
+    data_file = str(data_file or get_data_file())
+    try:
+        if mode is None:
+            mode, term = classify_query(query)
+        elif mode in finders:
+            term = query.strip().lower()
+        else:
+            raise ValueError(f"Unknown search mode '{mode}'")
+        results = finders[mode](term, data_file)
+    except FileNotFoundError:
+        return {"success": False, "mode": mode, "term": query, "count": 0, "results": [],
+                "error": f"Data file not found at {data_file}"}
+    except Exception as e:
+        return {"success": False, "mode": mode, "term": query, "count": 0, "results": [], "error": str(e)}
+    return {"success": True, "mode": mode, "term": term, "count": len(results), "results": results, "error": None}
+
+def track_ip(target, service=None, save_history=False):
+    """
+    Look up an IP address, domain name or 'my ip'.
+
+    Args:
+        target (str): What to look up
+        service (str): Lookup service, one of ip_track.API_SERVICES or "local"
+        save_history (bool): Also record the lookup in the IP history file
+
+    Returns:
+        dict: success, ip, query, service, data and timestamp, or error
+    """
+    from .ip_track import track_ip as _track_ip
+
+    return _track_ip(target, service=service, save_history=save_history)
+
+def bulk_track_ip(targets, service=None, output=None, concurrency=None):
+    """
+    Look up many IP addresses and domain names concurrently.
+
+    Args:
+        targets (list): IP addresses and domain names
+        service (str): Lookup service, one of ip_track.API_SERVICES or "local"
+        output (str): Also write the results to this .jsonl or .csv file
+        concurrency (int): Lower the service's concurrency limit
+
+    Returns:
+        dict: success, total, succeeded, failed, elapsed, output, results
+            (in completion order) and error
+    """
+    from .ip_bulk import bulk_lookup
+
+    results = []
+    summary = bulk_lookup(list(targets), service, output, concurrency=concurrency, progress=False,
+                          on_result=results.append)
+    summary["results"] = results
+    return summary
+
+def ip_history(limit=100, ip=None):
+    """
+    Return the saved IP lookups, newest first.
+
+    Args:
+        limit (int): Most entries to return, None for all of them
+        ip (str): Only lookups of this IP address
+
+    Returns:
+        dict: success and history
+    """
+    from .ip_track import get_history
+
+    return {"success": True, "history": get_history(limit, ip)}
+
+def search_face(image, annotate=False):
+    """
+    Recognize the faces in an image.
+
+    Args:
+        image (str): Local image path or image URL
+        annotate (bool): Also save a copy of the image with the faces marked
+
+    Returns:
+        dict: success, matches, annotated_image (when annotate is set) and error
+    """
+    from .image_search import validate_input, fetch_image, find_faces, annotate_image
+
+    is_valid, input_type = validate_input(image)
+    if not is_valid:
+        return {"success": False, "matches": [],
+                "error": "Not a supported image path or URL (.jpg, .jpeg, .png, .gif, .bmp)"}
+
+    image_path = image
+    try:
+        if input_type == "url":
+            image_path = fetch_image(image)
+        matches = find_faces(image_path)
+        result = {"success": True, "matches": matches, "error": None}
+        if annotate and matches:
+            result["annotated_image"] = annotate_image(image_path, matches)
+        return result
+    except Exception as e:
+        return {"success": False, "matches": [], "error": str(e)}
+    finally:
+        if input_type == "url" and image_path != image:
+            try:
+                os.unlink(image_path)
+            except OSError:
+                pass
+
+def ai_search(query, data_file=None, evaluate=True):
+    """
+    Search the employee data with the AI picking the fields and search term.
+
+    Args:
+        query (str): Natural-language query
+        data_file (str): Data file to search, defaults to the AI search data file
+        evaluate (bool): Also ask the model how well the results fit the query
+
+    Returns:
+        dict: success, query, intent, term, count, results, evaluation, error
+            and degraded (True when the model could not be used and a plain
+            name search or no relevance judgement stands in)
+    """
+    from . import ai_search as ai
+
+    data_file = str(data_file or ai.DATA_FILE)
+    intent = ai.analyze_search_intent(query, show_progress=False, data_file=data_file)
+    try:
+        term, results = ai.search_for_intent(intent, query, data_file)
+    except Exception as e:
+        return {"success": False, "query": query, "intent": intent, "term": None, "count": 0,
+                "results": [], "evaluation": None, "error": str(e), "degraded": bool(intent.get("degraded"))}
+    evaluation = ai.evaluate_search_results(query, results, show_progress=False, data_file=data_file) if evaluate else None
+    degraded = bool(intent.get("degraded") or (evaluation or {}).get("degraded"))
+    return {"success": True, "query": query, "intent": intent, "term": term, "count": len(results),
+            "results": results, "evaluation": evaluation, "error": None, "degraded": degraded}
@@ -0,0 +1,186 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .settings import env_number
+
+# Seconds a model call may take in total, retries and backoff included
+CALL_DEADLINE = env_number('SEADAT_LLM_DEADLINE', 30.0, minimum=0)
+
+# Seconds a single attempt may take (for a streamed reply: between chunks)
+ATTEMPT_TIMEOUT = env_number('SEADAT_LLM_TIMEOUT', 12.0, minimum=0)
+
+# Retries after the first attempt for timeouts, rate limits and server errors
+MAX_RETRIES = env_number('SEADAT_LLM_RETRIES', 2, int, minimum=0)
+
+# Exponential backoff: up to BACKOFF_BASE * 2**retry seconds, capped, with
+# full jitter so clients that failed together do not retry together
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 4.0
+
+# Send a second, identical request when the first is slower than the recent
+# p95 for its kind of call; whichever answers first is used. Only for calls
+# whose output is not streamed. SEADAT_LLM_HEDGE=0 turns it off
+HEDGE_REQUESTS = os.getenv('SEADAT_LLM_HEDGE', '1') != '0'
+# Hedge delay until HEDGE_MIN_SAMPLES latencies have been seen
+HEDGE_DEFAULT_DELAY = 4.0
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MIN_SAMPLES = 10
+
+# Latencies kept per kind of call for the p95
+LATENCY_WINDOW = 200
+
+# Error class names (from the openai package) worth retrying
+TRANSIENT_ERRORS = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call runs out of its deadline, retries included."""
+
+class LatencyTracker:
+    """Recent latencies of one kind of call, for percentiles."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        """Return the given percentile (0-1) of the recent latencies, or None without any."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+# Trackers by kind of call, created on first use
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+def get_tracker(kind):
+    """Return the LatencyTracker for a kind of call ("completion", "chat", ...)."""
+    with _trackers_lock:
+        return _trackers.setdefault(kind, LatencyTracker())
+
+# Threads for hedged requests; a losing request runs on here until its own
+# timeout, since an HTTP call in flight cannot be cancelled
+_hedge_executor = None
+
+def get_hedge_executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="seadat-hedge")
+    return _hedge_executor
+
+def is_transient(error):
+    """True for errors a retry can fix: timeouts, lost connections, 429 and 5xx."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in TRANSIENT_ERRORS:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in (408, 409, 429) or status >= 500)
+
+def backoff_delay(retry):
+    """Seconds to wait before the given retry (0 for the first), with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** retry))
+
+def hedge_delay(tracker):
+    """Seconds after which a second request is sent: the recent p95."""
+    if len(tracker) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, tracker.percentile(0.95))
+
+def _hedged(request, timeout, tracker):
+    executor = get_hedge_executor()
+    started = time.perf_counter()
+    delay = hedge_delay(tracker)
+    pending = {executor.submit(request, timeout)}
+    done, _ = wait(pending, timeout=min(delay, timeout))
+    if not done and timeout - delay > HEDGE_MIN_DELAY:
+        # The first request is slower than usual: race an identical one
+        pending.add(executor.submit(request, timeout - delay))
+    error = None
+    while pending:
+        remaining = timeout - (time.perf_counter() - started)
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                error = e
+                continue
+            tracker.record(time.perf_counter() - started)
+            return result
+    if error is not None:
+        raise error
+    raise TimeoutError(f"No response within {timeout:.1f}s")
+
+def call_with_policy(request, kind="chat", deadline=None, retries=None, hedge=None, can_retry=None):
+    """
+    Run a model request with a deadline, retries and optional hedging.
+
+    Transient failures (see is_transient) are retried with jittered
+    exponential backoff while the deadline allows; other errors, and a
+    DeadlineExceeded raised by request itself, are raised straight away. With hedging, a second identical request is sent once the
+    first has taken longer than the recent p95 for this kind of call, and
+    the first answer wins.
+
+        response = call_with_policy(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **params),
+            kind="completion"
+        )
+
+    Args:
+        request (callable): Makes one attempt, given the seconds it may take
+        kind (str): Groups calls for the latency percentiles
+        deadline (float): Seconds for the whole call, defaults to CALL_DEADLINE
+        retries (int): Retries after the first attempt, defaults to MAX_RETRIES
+        hedge (bool): Allow a hedged request, defaults to HEDGE_REQUESTS
+        can_retry (callable): Checked before each retry; a streamed reply
+            that has already printed text cannot be retried
+
+    Returns:
+        Whatever request returns
+
+    Raises:
+        DeadlineExceeded: If the deadline ran out before a response
+        Exception: The last error, when it was not transient or no retries are left
+    """
+    deadline = CALL_DEADLINE if deadline is None else deadline
+    retries = MAX_RETRIES if retries is None else retries
+    hedge = HEDGE_REQUESTS if hedge is None else hedge
+    tracker = get_tracker(kind)
+    started = time.perf_counter()
+    retry = 0
+    while True:
+        remaining = deadline - (time.perf_counter() - started)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No response within the {deadline:g}s deadline")
+        timeout = min(ATTEMPT_TIMEOUT, remaining)
+        try:
+            if hedge:
+                return _hedged(request, timeout, tracker)
+            attempt_started = time.perf_counter()
+            result = request(timeout)
+            tracker.record(time.perf_counter() - attempt_started)
+            return result
+        except Exception as e:
+            if (isinstance(e, DeadlineExceeded) or not is_transient(e) or retry >= retries
+                    or (can_retry is not None and not can_retry())):
+                raise
+            pause = backoff_delay(retry)
+            if deadline - (time.perf_counter() - started) <= pause:
+                raise DeadlineExceeded(f"No response within the {deadline:g}s deadline") from e
+            time.sleep(pause)
+            retry += 1
@@ -0,0 +1,226 @@
+import json
+
+from .settings import env_number
+
+# Token budget for the messages sent with each conversational request
+# (the reply's own max_tokens comes on top)
+CONTEXT_TOKEN_BUDGET = env_number('SEADAT_CONTEXT_TOKENS', 3000, int, minimum=1)
+
+# Most recent messages that are always sent verbatim
+KEEP_RECENT_MESSAGES = 6
+
+# Per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+# Summary lines kept for older turns (two per turn), oldest dropped first
+MAX_SUMMARY_LINES = 16
+
+# tiktoken encoder, loaded on first use; False when tiktoken is not installed
+_encoder = None
+
+def get_encoder():
+    """Return the tiktoken encoder for gpt-4o, or None without tiktoken."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoder = False
+    return _encoder or None
+
+def count_tokens(text):
+    """
+    Count the tokens in text.
+
+    Uses tiktoken when it is installed and otherwise estimates four
+    characters per token, which is close enough for budgeting.
+    """
+    if not text:
+        return 0
+    encoder = get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return (len(text) + 3) // 4
+
+def count_message_tokens(messages):
+    """Count the tokens a list of chat messages takes up in a request."""
+    return sum(count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD for message in messages)
+
+def compact_json(data):
+    """
+    Serialize data as compact JSON for a prompt.
+
+    No indentation or spaces, and empty values (None, "", [] and {}) are
+    left out.
+    """
+    def prune(value):
+        if isinstance(value, dict):
+            pruned = {key: prune(item) for key, item in value.items()}
+            return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+        if isinstance(value, list):
+            return [prune(item) for item in value]
+        return value
+    return json.dumps(prune(data), separators=(",", ":"), ensure_ascii=False)
+
+def is_context_message(message, position):
+    """True for the system messages a loop adds each turn (anything but the first)."""
+    return message.get("role") == "system" and position > 0
+
+def drop_stale_context(messages):
+    """
+    Return messages with every per-turn system message removed except the latest.
+
+    Search context from earlier turns is superseded by the current one.
+    """
+    latest = None
+    for position, message in enumerate(messages):
+        if is_context_message(message, position) and not message["content"].startswith(SUMMARY_PREFIX):
+            latest = position
+    return [
+        message for position, message in enumerate(messages)
+        if not is_context_message(message, position)
+        or position == latest
+        or message["content"].startswith(SUMMARY_PREFIX)
+    ]
+
+def _clip(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def shrink_context(content, limit):
+    """
+    Shorten a search context message to about limit tokens without breaking it.
+
+    A context holding JSON (a header line, then the object) loses whole
+    entries of its "results" list from the end, then its "search_memory",
+    and is serialized again, so the model always gets valid JSON with
+    "results_omitted" saying how many records were left out. A plain-text
+    context loses whole lines from before its last line (the total).
+
+    Returns:
+        str: The shortened context; it can still be over limit when nothing
+            more can be dropped
+    """
+    header, newline, body = content.partition("\n")
+    if not newline:
+        header, body = "", content
+    try:
+        context = json.loads(body)
+    except ValueError:
+        context = None
+
+    if isinstance(context, dict):
+        prefix = header + newline
+        results = context.get("results")
+        results = list(results) if isinstance(results, list) else None
+        omitted = 0
+        while True:
+            text = prefix + compact_json(context)
+            if count_tokens(text) <= limit:
+                return text
+            if results:
+                results.pop()
+                omitted += 1
+                context = dict(context, results=results, results_omitted=omitted)
+            elif "search_memory" in context:
+                context = {key: value for key, value in context.items() if key != "search_memory"}
+            else:
+                return text
+
+    lines = content.splitlines()
+    while count_tokens("\n".join(lines)) > limit and len(lines) > 2:
+        del lines[-2]
+    return "\n".join(lines)
+
+def fit_tool_results(messages, budget=None):
+    """
+    Return a copy of messages with tool results shrunk to fit the token budget.
+
+    Tool messages must each stay to answer their tool call, so instead of
+    being dropped they all lose records (see shrink_context) in proportion
+    to their size. Meant for the messages fit_to_budget returned plus the
+    tool exchange of the current turn.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    over = count_message_tokens(messages) - budget
+    tool_positions = [position for position, message in enumerate(messages) if message.get("role") == "tool"]
+    if over <= 0 or not tool_positions:
+        return messages
+    tool_tokens = sum(count_tokens(messages[position]["content"]) for position in tool_positions)
+    keep = max(tool_tokens - over, 0) / tool_tokens if tool_tokens else 0
+    messages = list(messages)
+    for position in tool_positions:
+        content = messages[position]["content"]
+        messages[position] = dict(messages[position], content=shrink_context(content, int(count_tokens(content) * keep)))
+    return messages
+
+def summarize_messages(messages):
+    """
+    Summarize older user and assistant turns in one line each.
+
+    Done locally, without a model call, so trimming never adds latency.
+    """
+    lines = []
+    for message in messages:
+        content = message.get("content", "")
+        if content.startswith(SUMMARY_PREFIX):
+            lines.extend(content[len(SUMMARY_PREFIX):].strip().splitlines())
+        elif message.get("role") == "user":
+            lines.append(f"- User asked: {_clip(content, 80)}")
+        elif message.get("role") == "assistant":
+            lines.append(f"  You answered: {_clip(content, 120)}")
+    return {"role": "system", "content": SUMMARY_PREFIX + "\n" + "\n".join(lines[-MAX_SUMMARY_LINES:])}
+
+def fit_to_budget(messages, budget=None, keep_recent=KEEP_RECENT_MESSAGES):
+    """
+    Return a copy of messages that fits within the token budget.
+
+    In order, until the messages fit:
+    1. Search context from earlier turns is dropped (only the latest is kept).
+    2. Turns older than the last keep_recent messages are folded into one
+       summary message after the system prompt.
+    3. The oldest summary lines are dropped.
+    4. Records are dropped from the latest search context (see shrink_context).
+
+    The first (system prompt) message and the latest user message are always
+    kept whole.
+
+    Args:
+        messages (list): Chat messages, system prompt first
+        budget (int): Token budget, defaults to CONTEXT_TOKEN_BUDGET
+        keep_recent (int): Messages at the end that are never summarized
+
+    Returns:
+        list: Messages to send
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    if not messages:
+        return []
+    messages = drop_stale_context(messages)
+    if count_message_tokens(messages) <= budget:
+        return messages
+
+    system_prompt, rest = messages[0], messages[1:]
+    older, recent = rest[:-keep_recent], rest[-keep_recent:]
+    if older:
+        summary = summarize_messages(older)
+        messages = [system_prompt, summary] + recent
+        while count_message_tokens(messages) > budget and "\n" in summary["content"][len(SUMMARY_PREFIX) + 1:]:
+            header, _, lines = summary["content"].partition("\n")
+            summary = {"role": "system", "content": header + "\n" + lines.partition("\n")[2]}
+            messages = [system_prompt, summary] + recent
+        if count_message_tokens(messages) <= budget:
+            return messages
+
+    # Still over: shorten the latest search context to what is left
+    over = count_message_tokens(messages) - budget
+    for position in range(len(messages) - 1, 0, -1):
+        message = messages[position]
+        if is_context_message(message, position) and not message["content"].startswith(SUMMARY_PREFIX):
+            keep = max(count_tokens(message["content"]) - over, 0)
+            messages[position] = {"role": "system", "content": shrink_context(message["content"], keep)}
+            break
+    return messages
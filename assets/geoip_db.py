@@ -0,0 +1,246 @@
+import os
+import csv
+import socket
+import bisect
+import ipaddress
+import threading
+from array import array
+
+# Column names accepted for each field of a CSV range database (compared
+# lower-cased); the first two columns are the range when none of the start
+# and end names is present
+START_COLUMNS = ["start", "start_ip", "ip_from", "range_start", "first_ip"]
+END_COLUMNS = ["end", "end_ip", "ip_to", "range_end", "last_ip"]
+NETWORK_COLUMNS = ["network", "cidr", "prefix"]
+FIELD_COLUMNS = {
+    "country": ["country", "country_code", "countrycode", "country_iso_code"],
+    "region": ["region", "regionname", "region_name", "stateprov", "subdivision", "subdivision_1_name", "state"],
+    "city": ["city", "city_name"],
+    "lat": ["lat", "latitude"],
+    "lon": ["lon", "lng", "longitude"],
+    "postal": ["postal", "postal_code", "zip", "zipcode"],
+    "timezone": ["timezone", "time_zone"],
+    "org": ["org", "organization", "isp", "as_organization", "autonomous_system_organization", "as_name"],
+    "asn": ["asn", "as", "as_number", "autonomous_system_number"],
+}
+
+# Fields of header-less CSVs by column count, after the start and end columns:
+# the DB-IP lite country, ASN and city layouts, with addresses as text...
+HEADERLESS_FIELDS = {
+    3: ["country"],
+    4: ["asn", "org"],
+    8: ["continent", "country", "region", "city", "lat", "lon"],
+}
+# ...and the IP2Location LITE DB1, DB3, DB5 and DB11 layouts, with addresses
+# as integers
+HEADERLESS_INTEGER_FIELDS = {
+    4: ["country", "country_name"],
+    6: ["country", "country_name", "region", "city"],
+    8: ["country", "country_name", "region", "city", "lat", "lon"],
+    10: ["country", "country_name", "region", "city", "lat", "lon", "postal", "timezone"],
+}
+
+class GeoIPDatabase:
+    """
+    IP ranges from a CSV file, searched with bisect.
+
+    Each row is a range (start and end addresses, either as text or as
+    integers, or a CIDR network) with location fields. Ranges are kept per
+    address family as a sorted array of range starts, a parallel array of
+    range ends and one array per location field holding an index into a
+    table of the distinct field values, so a lookup is one binary search and
+    the file is read into flat arrays without an object per row:
+
+        db = GeoIPDatabase("dbip-city-lite.csv")
+        db.lookup("8.8.8.8")  # {"city": "Mountain View", "country": "US", ...}
+
+    Ranges are expected not to overlap; where they do, the one starting last
+    wins.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._ranges = {}
+        self._strings = [None]  # Distinct field values; 0 stands for an empty field
+        self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return
+            columns, rows_iter = self._columns(first, reader)
+            fields = columns["fields"]
+            # IPv6 addresses do not fit in a machine integer, so they stay in lists
+            ranges = {
+                version: (array("Q") if version == 4 else [], array("Q") if version == 4 else [],
+                          [array("I") for _ in fields])
+                for version in (4, 6)
+            }
+            string_ids = {"": 0, "-": 0}
+            strings = self._strings
+            for row in rows_iter:
+                try:
+                    version, first, last = self._range(row, columns)
+                except (ValueError, IndexError):
+                    continue  # Comments, blank lines and malformed ranges
+                starts, ends, values = ranges[version]
+                starts.append(first)
+                ends.append(last)
+                for (_, index), column in zip(fields, values):
+                    value = row[index].strip() if index < len(row) else ""
+                    string_id = string_ids.get(value)
+                    if string_id is None:
+                        string_id = string_ids[value] = len(strings)
+                        strings.append(value)
+                    column.append(string_id)
+
+        names = [name for name, _ in fields]
+        for version, (starts, ends, values) in ranges.items():
+            if any(starts[i] > starts[i + 1] for i in range(len(starts) - 1)):
+                # Range files are usually sorted already; otherwise reorder every column
+                order = sorted(range(len(starts)), key=starts.__getitem__)
+                starts, ends = ([column[i] for i in order] for column in (starts, ends))
+                if version == 4:
+                    starts, ends = array("Q", starts), array("Q", ends)
+                values = [array("I", (column[i] for i in order)) for column in values]
+            self._ranges[version] = (starts, ends, dict(zip(names, values)))
+
+    @staticmethod
+    def _columns(first, reader):
+        names = [name.strip().lower() for name in first]
+
+        def find(candidates):
+            return next((names.index(name) for name in candidates if name in names), None)
+
+        start, end, network = find(START_COLUMNS), find(END_COLUMNS), find(NETWORK_COLUMNS)
+        if (start is not None and end is not None) or network is not None:
+            fields = [(field, find(candidates)) for field, candidates in FIELD_COLUMNS.items()]
+            fields = [(field, index) for field, index in fields if index is not None]
+            return {"start": start, "end": end, "network": network, "fields": fields}, reader
+        # No header: the first row is data
+        layouts = HEADERLESS_INTEGER_FIELDS if first[0].strip().isdigit() else HEADERLESS_FIELDS
+        fields = layouts.get(len(first), [f"field{i}" for i in range(2, len(first))])
+        columns = {"start": 0, "end": 1, "network": None, "fields": [(name, i + 2) for i, name in enumerate(fields)]}
+        return columns, _prepend(first, reader)
+
+    @staticmethod
+    def _range(row, columns):
+        if columns["network"] is not None:
+            network = ipaddress.ip_network(row[columns["network"]].strip(), strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+        version, first = _parse_address(row[columns["start"]])
+        last_version, last = _parse_address(row[columns["end"]])
+        if version != last_version or last < first:
+            raise ValueError("Invalid range")
+        return version, first, last
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._ranges.values())
+
+    def lookup(self, ip):
+        """
+        Find the range containing ip.
+
+        Returns:
+            dict: The range's location fields, or None when no range holds ip
+        """
+        version, value = _parse_address(ip)
+        starts, ends, values = self._ranges.get(version, ((), (), {}))
+        index = bisect.bisect_right(starts, value) - 1
+        if index < 0 or value > ends[index]:
+            return None
+        return {name: self._strings[column[index]] for name, column in values.items() if column[index]}
+
+class MMDBDatabase:
+    """
+    A MaxMind DB file (GeoLite2/GeoIP2 City, Country or ASN, or DB-IP's
+    .mmdb), read into memory with the maxminddb package. The file is a
+    search tree already, so lookups go straight to it.
+    """
+
+    def __init__(self, path):
+        try:
+            import maxminddb
+        except ImportError:
+            raise ImportError("Reading .mmdb files needs the maxminddb package (pip install maxminddb)")
+        self.path = str(path)
+        self._reader = maxminddb.open_database(self.path, maxminddb.MODE_MEMORY)
+
+    def lookup(self, ip):
+        """
+        Find ip in the database.
+
+        Returns:
+            dict: Location fields named as in GeoIPDatabase, or None
+        """
+        entry = self._reader.get(ip)
+        if not entry:
+            return None
+        record = {}
+        country = entry.get("country") or entry.get("registered_country") or {}
+        if country.get("iso_code"):
+            record["country"] = country["iso_code"]
+        subdivisions = entry.get("subdivisions") or []
+        if subdivisions:
+            record["region"] = _english_name(subdivisions[0])
+        if entry.get("city"):
+            record["city"] = _english_name(entry["city"])
+        location = entry.get("location") or {}
+        if "latitude" in location and "longitude" in location:
+            record["lat"], record["lon"] = location["latitude"], location["longitude"]
+        if location.get("time_zone"):
+            record["timezone"] = location["time_zone"]
+        if (entry.get("postal") or {}).get("code"):
+            record["postal"] = entry["postal"]["code"]
+        if entry.get("autonomous_system_number"):
+            record["asn"] = entry["autonomous_system_number"]
+        if entry.get("autonomous_system_organization"):
+            record["org"] = entry["autonomous_system_organization"]
+        return {key: value for key, value in record.items() if value not in (None, "")}
+
+def _english_name(entry):
+    names = entry.get("names") or {}
+    return names.get("en") or next(iter(names.values()), None)
+
+def _prepend(row, rows):
+    yield row
+    yield from rows
+
+def _parse_address(text):
+    """Return (IP version, address as an integer); ValueError when text is not an address."""
+    text = text.strip()
+    if text.isdigit():
+        value = int(text)
+        # Plain integers: IPv4 when they fit, as in IP2Location's CSVs
+        if value > (1 << 128) - 1:
+            raise ValueError(f"Not an IP address: {text}")
+        return (4 if value <= 0xFFFFFFFF else 6), value
+    # inet_pton is several times faster than the ipaddress module
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except OSError:
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, text.split("%")[0]), "big")
+    except OSError:
+        raise ValueError(f"Not an IP address: {text}")
+
+def open_database(path):
+    """Open a range database, as MMDB for .mmdb files and CSV otherwise."""
+    if str(path).lower().endswith(".mmdb"):
+        return MMDBDatabase(path)
+    return GeoIPDatabase(path)
+
+# Databases by path, loaded on first use
+_databases = {}
+_databases_lock = threading.Lock()
+
+def get_database(path):
+    """Return the database at path, loading it the first time it is asked for."""
+    path = os.path.abspath(path)
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = open_database(path)
+        return _databases[path]
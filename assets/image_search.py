@@ -7,25 +7,17 @@ from pathlib import Path
 from colorama import init, Fore, Back, Style
 from tabulate import tabulate
 import requests
-from deepface import DeepFace
-import numpy as np
-import cv2
-from tqdm import tqdm
 import tempfile
 import sys
 
+try:
+    from .spinner import Spinner, DOTS_FRAMES
+except ImportError:
+    from spinner import Spinner, DOTS_FRAMES
+
 misc_path = str(Path(__file__).resolve().parent.parent / "misc")
 if misc_path not in sys.path:
     sys.path.append(misc_path)
-try:
-    from misc.training import FaceRecognitionSystem
-except ImportError:
-    try:
-        from training import FaceRecognitionSystem
-    except ImportError as e:
-        print(f"{Fore.RED}Error: Could not import FaceRecognitionSystem from training.py in {misc_path}")
-        print(f"{Fore.RED}{e}")
-        exit(1)
 
 # Initialize colorama
 init(autoreset=True)
@@ -70,26 +62,63 @@ def display_image_search_header():
     print()
 
 def scanning_animation(message="Scanning face patterns"):
-    """Display a scanning animation."""
-    print(f"\n{Fore.CYAN}{message}", end="", flush=True)
-    frames = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
-    for _ in range(10):
-        for frame in frames:
-            print(f"\r{Fore.CYAN}{message} {frame}", end="", flush=True)
-            time.sleep(0.1)
-    print("\n")
+    """Return a scanning spinner that runs while the download or face search inside it runs."""
+    return Spinner(message, frames=DOTS_FRAMES)
+
+# DeepFace/TensorFlow and OpenCV take seconds to import, so they are loaded on
+# the first face search instead of when the module is imported
+_face_recognition_system = None
+
+def get_cv2():
+    """Import OpenCV on first use."""
+    import cv2
+    return cv2
+
+def get_face_recognition_system():
+    """
+    Import the face recognition stack (DeepFace, TensorFlow) on first use.
+
+    Returns:
+        type: The FaceRecognitionSystem class from misc/training.py
+
+    Raises:
+        ImportError: If training.py or its dependencies cannot be imported
+    """
+    global _face_recognition_system
+    if _face_recognition_system is None:
+        try:
+            from misc.training import FaceRecognitionSystem
+        except ImportError:
+            try:
+                from training import FaceRecognitionSystem
+            except ImportError as e:
+                raise ImportError(f"Could not import FaceRecognitionSystem from training.py in {misc_path}: {e}")
+        _face_recognition_system = FaceRecognitionSystem
+    return _face_recognition_system
+
+def fetch_image(url):
+    """
+    Download image from URL to a temporary .jpg file.
+
+    Returns:
+        str: Path of the temporary file; the caller deletes it
+
+    Raises:
+        requests.RequestException: If the download fails
+    """
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+    
+    # Create temp file with .jpg extension
+    temp = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
+    temp.write(response.content)
+    temp.close()
+    return temp.name
 
 def download_image(url):
     """Download image from URL to temporary file."""
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        # Create temp file with .jpg extension
-        temp = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-        temp.write(response.content)
-        temp.close()
-        return temp.name
+        return fetch_image(url)
     except Exception as e:
         print(f"{Fore.RED}Error downloading image: {str(e)}")
         return None
@@ -126,19 +155,53 @@ def get_image_path(path_or_url):
     else:  # URL
         return download_image(path_or_url)
 
+def find_faces(image_path):
+    """
+    Recognize the faces in an image against the trained face database.
+
+    Prints nothing and lets errors propagate.
+
+    Returns:
+        list: One dict per face with person, confidence and region
+    """
+    # Initialize and load the trained face database
+    face_system = get_face_recognition_system()()
+    face_system.load_or_build_database()
+    # Recognize faces in the input image
+    return face_system.recognize_faces(image_path)
+
 def search_face_in_database(image_path):
     """Search for matching faces in the database using the trained system."""
     try:
-        # Initialize and load the trained face database
-        face_system = FaceRecognitionSystem()
-        face_system.load_or_build_database()
-        # Recognize faces in the input image
-        results = face_system.recognize_faces(image_path)
-        return results
+        return find_faces(image_path)
     except Exception as e:
         print(f"{Fore.RED}Error during face search: {str(e)}")
         return []
 
+def annotate_image(orig_image_path, matches):
+    """
+    Draw the matched face boxes and names onto a copy of the image.
+
+    Returns:
+        str: Path of the annotated image in the results folder
+    """
+    cv2 = get_cv2()
+    results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
+    os.makedirs(results_dir, exist_ok=True)
+    img = cv2.imread(orig_image_path)
+    for result in matches:
+        region = result.get("region")
+        if not region:
+            continue
+        x, y, w, h = region["x"], region["y"], region["w"], region["h"]
+        color = (0, 255, 0) if result["person"] != "Unknown" else (0, 0, 255)
+        cv2.rectangle(img, (x, y), (x+w, y+h), color, 2)
+        text = f"{result['person']} ({result['confidence']:.2f})"
+        cv2.putText(img, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    result_img_path = os.path.join(results_dir, f"search_{os.path.basename(orig_image_path)}")
+    cv2.imwrite(result_img_path, img)
+    return result_img_path
+
 def display_results(matches, orig_image_path=None):
     """Display search results in a formatted table and save annotated image if possible."""
     if not matches:
@@ -169,20 +232,7 @@ def display_results(matches, orig_image_path=None):
 
     # Save annotated image to results folder if possible
     if orig_image_path and os.path.exists(orig_image_path):
-        results_dir = os.path.join(os.path.dirname(__file__), "..", "results")
-        os.makedirs(results_dir, exist_ok=True)
-        img = cv2.imread(orig_image_path)
-        for result in matches:
-            region = result.get("region")
-            if not region:
-                continue
-            x, y, w, h = region["x"], region["y"], region["w"], region["h"]
-            color = (0, 255, 0) if result["person"] != "Unknown" else (0, 0, 255)
-            cv2.rectangle(img, (x, y), (x+w, y+h), color, 2)
-            text = f"{result['person']} ({result['confidence']:.2f})"
-            cv2.putText(img, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        result_img_path = os.path.join(results_dir, f"search_{os.path.basename(orig_image_path)}")
-        cv2.imwrite(result_img_path, img)
+        result_img_path = annotate_image(orig_image_path, matches)
         print(f"{Fore.GREEN}Result image saved to: {Fore.WHITE}{result_img_path}")
 
 def run_image_search():
@@ -208,12 +258,8 @@ def run_image_search():
             time.sleep(2)
             continue
         
-        if input_type == "url":
-            scanning_animation("Downloading image")
-        else:
-            scanning_animation("Loading image")
-            
-        image_path = get_image_path(image_input)
+        with scanning_animation("Downloading image" if input_type == "url" else "Loading image"):
+            image_path = get_image_path(image_input)
         
         if not image_path:
             print(f"{Fore.RED}Failed to process image. Please try another file or URL.")
@@ -221,8 +267,8 @@ def run_image_search():
             continue
         
         try:
-            scanning_animation("Analyzing facial features")
-            matches = search_face_in_database(image_path)
+            with scanning_animation("Analyzing facial features"):
+                matches = search_face_in_database(image_path)
             display_results(matches, orig_image_path=image_path)
             
             # Cleanup temporary file only if it was downloaded from URL
@@ -0,0 +1,397 @@
+import os
+import sys
+import csv
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from colorama import init, Fore
+
+try:
+    from .ip_track import CONFIG, API_SERVICES, LOCAL_SERVICE, is_valid_ip, resolve_target, fetch_ip_info
+except ImportError:
+    from ip_track import CONFIG, API_SERVICES, LOCAL_SERVICE, is_valid_ip, resolve_target, fetch_ip_info
+
+init(autoreset=True)
+
+# Lookups allowed in flight per provider, and requests per minute where the
+# free tier enforces one (ip-api.com answers 429 past 45 a minute)
+PROVIDER_LIMITS = {
+    "ipinfo": {"concurrency": 8, "per_minute": None},
+    "ip-api": {"concurrency": 4, "per_minute": 45},
+    "ipgeolocation": {"concurrency": 4, "per_minute": None},
+    # The local range database is CPU-bound; more threads only add contention
+    LOCAL_SERVICE: {"concurrency": 1, "per_minute": None},
+}
+DEFAULT_LIMIT = {"concurrency": 4, "per_minute": None}
+
+# DNS lookups for domain targets run ahead of the API calls
+RESOLVE_WORKERS = 32
+
+# Targets submitted but not yet written, per lookup worker; reading further
+# into the targets waits until results are written, so a large file is never
+# queued up in memory all at once
+IN_FLIGHT_PER_WORKER = 8
+
+CSV_FIELDS = ["query", "ip", "success", "service", "country", "region", "city", "org", "error", "timestamp"]
+
+class ProviderLimiter:
+    """
+    Bounds the lookups sent to one provider: at most concurrency at a time,
+    and no more than per_minute starts in any minute.
+
+        with limiter:
+            fetch_ip_info(ip, service)
+    """
+
+    def __init__(self, concurrency, per_minute=None):
+        self.concurrency = concurrency
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def __enter__(self):
+        self._slots.acquire()
+        if self.interval:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
+def get_limiter(service, concurrency=None):
+    """Return a ProviderLimiter for service, optionally with a lower concurrency."""
+    limit = PROVIDER_LIMITS.get(service, DEFAULT_LIMIT)
+    wanted = limit["concurrency"] if concurrency is None else min(concurrency, limit["concurrency"])
+    return ProviderLimiter(max(wanted, 1), limit["per_minute"])
+
+def read_targets(source, unique=True):
+    """
+    Read IP addresses and domains, one per line.
+
+    Blank lines and lines starting with '#' are skipped; anything after the
+    first comma or whitespace is ignored, so the first column of a CSV
+    export works too.
+
+    Args:
+        source (str): File path, or '-' for stdin
+        unique (bool): Drop repeated targets, keeping the first
+
+    Returns:
+        list: Target strings in input order
+    """
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        targets = []
+        seen = set()
+        for line in stream:
+            target = line.strip().split(",")[0].split()[0] if line.strip() else ""
+            if not target or target.startswith("#"):
+                continue
+            if unique:
+                if target.lower() in seen:
+                    continue
+                seen.add(target.lower())
+            targets.append(target)
+        return targets
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def flatten_result(result):
+    """
+    Reduce a lookup result to the CSV_FIELDS columns.
+
+    The providers name their fields differently; ipinfo's region and org,
+    ip-api's regionName and isp, and ipgeolocation's state_prov all end up
+    in the same columns.
+    """
+    data = result.get("data") or {}
+    return {
+        "query": result.get("query"),
+        "ip": result.get("ip"),
+        "success": bool(result.get("success")),
+        "service": result.get("service"),
+        "country": data.get("country") or data.get("country_name"),
+        "region": data.get("region") or data.get("regionName") or data.get("state_prov"),
+        "city": data.get("city"),
+        "org": data.get("org") or data.get("isp") or data.get("organization"),
+        "error": result.get("error"),
+        "timestamp": result.get("timestamp"),
+    }
+
+class ResultWriter:
+    """
+    Writes lookup results to a file as they arrive.
+
+    JSONL keeps each full result; CSV keeps the flattened columns. The format
+    follows the file extension unless fmt is given. Every row is flushed, so
+    an interrupted run keeps what it has done.
+    """
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = (fmt or ("csv" if str(path).lower().endswith(".csv") else "jsonl")).lower()
+        self.rows = 0
+        directory = os.path.dirname(str(path))
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result):
+        if self._csv is not None:
+            self._csv.writerow(flatten_result(result))
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class TextProgress:
+    """Minimal progress bar for when tqdm is not installed."""
+
+    def __init__(self, total, stream=None, width=30):
+        self.total = total
+        self.count = 0
+        self.failed = 0
+        self.stream = stream or sys.stderr
+        self.width = width
+        self.started = time.monotonic()
+        self.drawn = 0.0
+
+    def update(self, failed=False):
+        self.count += 1
+        self.failed += failed
+        now = time.monotonic()
+        if self.count == self.total or now - self.drawn >= 0.2:
+            self.drawn = now
+            done = int(self.width * self.count / max(self.total, 1))
+            rate = self.count / max(now - self.started, 1e-6)
+            self.stream.write(f"\r[{'#' * done}{'.' * (self.width - done)}] {self.count}/{self.total} "
+                              f"{rate:.1f}/s {self.failed} failed")
+            self.stream.flush()
+
+    def close(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+class TqdmProgress:
+    def __init__(self, total, stream=None):
+        from tqdm import tqdm
+        self.failed = 0
+        self.bar = tqdm(total=total, unit="ip", file=stream or sys.stderr)
+
+    def update(self, failed=False):
+        self.failed += failed
+        self.bar.set_postfix(failed=self.failed, refresh=False)
+        self.bar.update(1)
+
+    def close(self):
+        self.bar.close()
+
+def make_progress(total, enabled=True):
+    """Return a progress bar (tqdm when installed), or None when disabled."""
+    if not enabled:
+        return None
+    try:
+        return TqdmProgress(total)
+    except ImportError:
+        return TextProgress(total)
+
+def bulk_lookup(targets, service=None, output=None, fmt=None, concurrency=None, progress=True, on_result=None,
+                use_cache=True):
+    """
+    Resolve and look up many targets concurrently.
+
+    Domains are resolved on a separate pool so slow DNS does not hold up
+    API calls; lookups then go through the provider's ProviderLimiter with
+    one pooled HTTP session per worker. With the local range database, IP
+    addresses skip the resolver pool. At most IN_FLIGHT_PER_WORKER targets
+    per lookup worker are in progress at a time; results are written in the
+    order they complete. Bulk lookups are not added to the IP history.
+
+    Args:
+        targets (list): IP addresses and domain names
+        service (str): Key of API_SERVICES or LOCAL_SERVICE, defaults to
+            CONFIG["default_service"]
+        output (str): JSONL or CSV file to write, or None to only return counts
+        fmt (str): 'jsonl' or 'csv', instead of going by the extension
+        concurrency (int): Lower the provider's concurrency limit
+        progress (bool): Show a progress bar on stderr
+        on_result (callable): Called with every result dict as it completes
+        use_cache (bool): Answer from the lookup cache where it can (see
+            ip_track.get_ip_cache); cached answers skip the provider limit
+
+    Returns:
+        dict: success, total, succeeded, failed, elapsed, output and error
+    """
+    service = service or CONFIG["default_service"]
+    if service not in API_SERVICES and service != LOCAL_SERVICE:
+        return {"success": False, "total": len(targets), "succeeded": 0, "failed": 0, "elapsed": 0.0,
+                "output": output, "error": f"Unknown service {service}"}
+    limiter = get_limiter(service, concurrency)
+    local = threading.local()
+
+    def get_session():
+        if getattr(local, "session", None) is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            local.session = session
+        return local.session
+
+    def lookup(target_info):
+        if not target_info["success"]:
+            return dict(target_info, service=service, timestamp=datetime.now().isoformat())
+        info = fetch_ip_info(target_info["ip"], service, session=get_session(), use_cache=use_cache, limiter=limiter)
+        info["ip"] = target_info["ip"]
+        info["query"] = target_info["query"]
+        info.setdefault("timestamp", datetime.now().isoformat())
+        return info
+
+    completed = queue.Queue()
+    resolvers = ThreadPoolExecutor(max_workers=RESOLVE_WORKERS, thread_name_prefix="seadat-resolve")
+    lookups = ThreadPoolExecutor(max_workers=limiter.concurrency, thread_name_prefix="seadat-lookup")
+
+    def run_lookup(target, resolve):
+        try:
+            completed.put(lookup(resolve()))
+        except Exception as e:
+            completed.put({"success": False, "query": target, "service": service,
+                           "error": f"Unexpected error: {str(e)}", "timestamp": datetime.now().isoformat()})
+
+    started = time.monotonic()
+    succeeded = failed = 0
+    bar = make_progress(len(targets), progress)
+    writer = ResultWriter(output, fmt) if output else None
+
+    def record(result):
+        nonlocal succeeded, failed
+        ok = bool(result.get("success"))
+        succeeded += ok
+        failed += not ok
+        if writer is not None:
+            writer.write(result)
+        if on_result is not None:
+            on_result(result)
+        if bar is not None:
+            bar.update(failed=not ok)
+
+    try:
+        pending = 0
+        max_pending = IN_FLIGHT_PER_WORKER * limiter.concurrency
+        for target in targets:
+            while pending >= max_pending:
+                record(completed.get())
+                pending -= 1
+            pending += 1
+            if service == LOCAL_SERVICE and is_valid_ip(target.strip()):
+                lookups.submit(run_lookup, target, lambda target=target: resolve_target(target))
+                continue
+            # Each target is looked up as soon as it is resolved
+            resolvers.submit(resolve_target, target).add_done_callback(
+                lambda resolved, target=target: lookups.submit(run_lookup, target, resolved.result)
+            )
+        for _ in range(pending):
+            record(completed.get())
+    finally:
+        resolvers.shutdown(wait=False, cancel_futures=True)
+        lookups.shutdown(wait=False, cancel_futures=True)
+        if writer is not None:
+            writer.close()
+        if bar is not None:
+            bar.close()
+    return {"success": True, "total": len(targets), "succeeded": succeeded, "failed": failed,
+            "elapsed": time.monotonic() - started, "output": output, "error": None}
+
+def run_bulk_interactive():
+    """Ask for a targets file and an output file, then run bulk_lookup."""
+    print(f"\n{Fore.CYAN}File with one IP address or domain per line:")
+    source = input(f"{Fore.BLUE}≈≈≈> {Fore.WHITE}").strip().strip('"')
+    if not source:
+        return
+    try:
+        targets = read_targets(source)
+    except OSError as e:
+        print(f"{Fore.RED}Could not read targets: {e}")
+        input(f"{Fore.GREEN}Press Enter to continue...")
+        return
+    if not targets:
+        print(f"{Fore.YELLOW}No targets found in {source}.")
+        input(f"{Fore.GREEN}Press Enter to continue...")
+        return
+    default_output = f"ip_bulk_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+    print(f"{Fore.CYAN}Save results to (.jsonl or .csv) [{default_output}]:")
+    output = input(f"{Fore.BLUE}≈≈≈> {Fore.WHITE}").strip().strip('"') or default_output
+    print(f"{Fore.CYAN}Looking up {len(targets)} target(s)... (Ctrl+C stops, keeping what is done)")
+    try:
+        summary = bulk_lookup(targets, output=output)
+        print(f"{Fore.GREEN}{summary['succeeded']} succeeded, {summary['failed']} failed in "
+              f"{summary['elapsed']:.1f}s. Results written to {output}")
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Stopped. Results so far are in {output}")
+    input(f"{Fore.GREEN}Press Enter to continue...")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up a list of IP addresses and domains.")
+    parser.add_argument("--ip-bulk", dest="source", metavar="FILE", required=True,
+                        help="File with one IP or domain per line, or - for stdin")
+    parser.add_argument("--output", "-o", help="Results file (.jsonl or .csv); default: ip_bulk_<time>.jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Output format instead of the file extension")
+    parser.add_argument("--service", choices=sorted([*API_SERVICES, LOCAL_SERVICE]), default=CONFIG["default_service"])
+    parser.add_argument("--concurrency", type=int, help="Lower the provider's concurrency limit")
+    parser.add_argument("--keep-duplicates", action="store_true", help="Look up repeated targets again")
+    parser.add_argument("--quiet", action="store_true", help="No progress bar")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Ask the provider even when a cached answer is fresh")
+    args = parser.parse_args(argv)
+
+    try:
+        targets = read_targets(args.source, unique=not args.keep_duplicates)
+    except OSError as e:
+        print(f"{Fore.RED}Could not read targets: {e}")
+        return 1
+    if not targets:
+        print(f"{Fore.YELLOW}No targets to look up.")
+        return 1
+    output = args.output or f"ip_bulk_{datetime.now():%Y%m%d_%H%M%S}.{args.format or 'jsonl'}"
+    print(f"{Fore.CYAN}Looking up {len(targets)} target(s) with {args.service} "
+          f"(up to {get_limiter(args.service, args.concurrency).concurrency} at a time)...", file=sys.stderr)
+    summary = bulk_lookup(targets, args.service, output, args.format, args.concurrency, progress=not args.quiet,
+                          use_cache=args.use_cache)
+    if not summary["success"]:
+        print(f"{Fore.RED}{summary['error']}")
+        return 1
+    print(f"{Fore.GREEN}{summary['succeeded']} succeeded, {summary['failed']} failed in "
+          f"{summary['elapsed']:.1f}s. Results written to {output}", file=sys.stderr)
+    return 0 if summary["succeeded"] or not summary["total"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,25 @@
 import os
-import sys
 import time
 import socket
 import re
-import json
 import platform
+from contextlib import nullcontext
 from datetime import datetime
 import requests
 from requests.exceptions import RequestException, Timeout
 from colorama import init, Fore, Style, Back
 
+try:
+    from .spinner import Spinner, BRAILLE_FRAMES
+    from .ttl_cache import TTLCache, make_key
+    from .lookup_history import LookupHistory
+    from .geoip_db import get_database
+except ImportError:
+    from spinner import Spinner, BRAILLE_FRAMES
+    from ttl_cache import TTLCache, make_key
+    from lookup_history import LookupHistory
+    from geoip_db import get_database
+
 # Initialize colorama with autoreset
 init(autoreset=True)
 
@@ -39,6 +49,9 @@ API_SERVICES = {
     "ipgeolocation": "https://api.ipgeolocation.io/ipgeo?apiKey={api_key}&ip={ip}"
 }
 
+# Answers from CONFIG["geoip_database"] instead of an online service
+LOCAL_SERVICE = "local"
+
 # Configuration
 CONFIG = {
     "api_keys": {
@@ -46,10 +59,29 @@ CONFIG = {
     },
     "timeout": 10,
     "save_history": True,
+    # Lookup history (see LookupHistory); a history_file in the old JSON
+    # format is imported into it on first use
+    "history_db": "ip_track_history.sqlite3",
     "history_file": "ip_track_history.json",
-    "default_service": "ipinfo"
+    "history_max_entries": 10000,
+    "history_max_age_days": None,
+    # IP range database (CSV or .mmdb) for the "local" service; when set,
+    # lookups use it by default and need no network
+    "geoip_database": os.getenv('SEADAT_GEOIP_DB'),
+    "default_service": "local" if os.getenv('SEADAT_GEOIP_DB') else "ipinfo",
+    # Lookup cache keyed by (service, IP); a cache_ttl of 0 turns it off
+    "cache_file": "ip_track_cache.sqlite3",
+    "cache_ttl": 24 * 3600,
+    # Seconds a failed lookup is remembered (HTTP 4xx other than 429 only;
+    # timeouts, rate limits and server errors are always retried)
+    "negative_cache_ttl": 15 * 60,
+    "cache_max_entries": 100000
 }
 
+# Opened on first use by get_ip_cache() and get_lookup_history()
+_ip_cache = None
+_lookup_history = None
+
 def clear_screen():
     """Clear the terminal screen based on the operating system."""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -63,19 +95,9 @@ def display_header():
     print(Fore.CYAN + f"System: {platform.system()} {platform.release()} | Python: {platform.python_version()}")
     print(Fore.BLUE + "~" * 60)
 
-def loading_animation(message, duration=1.5):
-    """Display a simple loading animation."""
-    chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
-    end_time = time.time() + duration
-    i = 0
-    
-    print()
-    while time.time() < end_time:
-        sys.stdout.write(f"\r{Fore.CYAN}{chars[i % len(chars)]} {message}")
-        sys.stdout.flush()
-        time.sleep(0.1)
-        i += 1
-    print()
+def loading_animation(message):
+    """Return a spinner that runs while the lookup inside it runs."""
+    return Spinner(message, frames=BRAILLE_FRAMES)
 
 def is_valid_ip(ip):
     """Check if the given string is a valid IPv4 or IPv6 address."""
@@ -103,12 +125,102 @@ def resolve_domain_to_ip(domain):
     except socket.gaierror:
         return None
 
-def fetch_ip_info(ip, service="ipinfo"):
-    """Fetch IP information from the specified service."""
+def get_ip_cache():
+    """Return the lookup cache, or None when CONFIG["cache_ttl"] turns it off."""
+    global _ip_cache
+    if CONFIG["cache_ttl"] <= 0:
+        return None
+    if _ip_cache is None:
+        _ip_cache = TTLCache(CONFIG["cache_file"], ttl=CONFIG["cache_ttl"],
+                             max_entries=CONFIG["cache_max_entries"])
+    return _ip_cache
+
+def cache_ttl_for(result):
+    """Seconds to cache a lookup result for, or 0 for results not worth caching."""
+    if result.get("success"):
+        return CONFIG["cache_ttl"]
+    status = str(result.get("error", ""))
+    if status.startswith("HTTP Error: 4") and status != "HTTP Error: 429":
+        return CONFIG["negative_cache_ttl"]
+    return 0
+
+def fetch_ip_info(ip, service=None, session=None, use_cache=True, limiter=None):
+    """
+    Fetch IP information from the specified service, CONFIG["default_service"]
+    when it is None or unknown.
+
+    Answers come from the lookup cache (see get_ip_cache) while they are
+    fresh, marked with "cached": True; permanent failures are cached for a
+    shorter time so a bad address is not retried on every lookup.
+
+    Pass a requests.Session as session to reuse its connections across
+    lookups, and a context manager as limiter to hold while the provider is
+    asked (see ip_bulk.py); cached answers skip both.
+
+    The "local" service answers from CONFIG["geoip_database"] (see
+    lookup_local) without the cache or the network.
+    """
+    if service not in API_SERVICES and service != LOCAL_SERVICE:
+        service = CONFIG["default_service"]
+    if service == LOCAL_SERVICE:
+        return lookup_local(ip)
+    cache = get_ip_cache() if use_cache else None
+    if cache is not None:
+        key = make_key("ip", service, ip)
+        try:
+            cached = cache.get(key)
+        except Exception:
+            cache, cached = None, None  # An unusable cache file only costs the speed-up
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+    with limiter or nullcontext():
+        started = time.perf_counter()
+        result = request_ip_info(ip, service, session)
+    ttl = cache_ttl_for(result)
+    if cache is not None and ttl > 0:
+        try:
+            cache.set(key, result, ttl=ttl, cost_ms=(time.perf_counter() - started) * 1000)
+        except Exception:
+            pass
+    return result
+
+def lookup_local(ip):
+    """
+    Look ip up in the IP range database set as CONFIG["geoip_database"].
+
+    Returns:
+        dict: The fetch_ip_info result shape, with the location fields named
+            as ipinfo names them
+    """
+    result = {"success": False, "service": LOCAL_SERVICE, "timestamp": datetime.now().isoformat()}
+    if not CONFIG["geoip_database"]:
+        result["error"] = "No IP range database configured (set SEADAT_GEOIP_DB)"
+        return result
+    try:
+        database = get_database(CONFIG["geoip_database"])
+    except (OSError, ImportError, ValueError, RuntimeError) as e:
+        # ValueError covers a file that is not UTF-8; RuntimeError a corrupt .mmdb
+        result["error"] = f"IP range database unavailable: {str(e)}"
+        return result
+    try:
+        record = database.lookup(ip)
+    except ValueError:
+        result["error"] = f"Invalid IP address: {ip}"
+        return result
+    if record is None:
+        result["error"] = "IP address not found in the range database"
+        return result
+    data = {"ip": ip}
+    data.update((key, value) for key, value in record.items() if key not in ("lat", "lon"))
+    if "lat" in record and "lon" in record:
+        data["loc"] = f"{record['lat']},{record['lon']}"
+    result.update(success=True, data=data)
+    return result
+
+def request_ip_info(ip, service, session=None):
+    """Ask the service about ip, bypassing the cache."""
     try:
-        if service not in API_SERVICES:
-            service = CONFIG["default_service"]
-            
         url = API_SERVICES[service].format(
             ip=ip, 
             api_key=CONFIG["api_keys"].get(service, "")
@@ -118,7 +230,7 @@ def fetch_ip_info(ip, service="ipinfo"):
             "User-Agent": "IP-Tracker/1.2 (https://github.com/username/ip-tracker)"
         }
         
-        response = requests.get(url, headers=headers, timeout=CONFIG["timeout"])
+        response = (session or requests).get(url, headers=headers, timeout=CONFIG["timeout"])
         
         if response.status_code == 200:
             return {
@@ -141,44 +253,49 @@ def fetch_ip_info(ip, service="ipinfo"):
     except Exception as e:
         return {"success": False, "error": f"Unexpected error: {str(e)}", "service": service}
 
+def get_lookup_history():
+    """Return the lookup history, importing the old JSON history file the first time."""
+    global _lookup_history
+    if _lookup_history is None:
+        history = LookupHistory(CONFIG["history_db"], max_entries=CONFIG["history_max_entries"],
+                                max_age_days=CONFIG["history_max_age_days"])
+        history.import_json(CONFIG["history_file"])
+        _lookup_history = history
+    return _lookup_history
+
 def save_to_history(ip, result):
-    """Save the IP lookup result to history file."""
+    """
+    Save the IP lookup result to history.
+
+    Returns:
+        dict: success, and error when the history could not be written
+    """
     if not CONFIG["save_history"]:
-        return
-        
-    history_data = []
+        return {"success": False, "error": "History is disabled"}
     try:
-        if os.path.exists(CONFIG["history_file"]):
-            with open(CONFIG["history_file"], "r") as f:
-                history_data = json.load(f)
-    except Exception:
-        pass
-        
-    # Add new entry
-    entry = {
-        "ip": ip,
-        "timestamp": datetime.now().isoformat(),
-        "result": result
-    }
-    
-    # Limit history to 100 entries
-    history_data = [entry] + history_data[:99]
-    
-    try:
-        with open(CONFIG["history_file"], "w") as f:
-            json.dump(history_data, f, indent=2)
+        get_lookup_history().add(ip, result)
+        return {"success": True}
     except Exception as e:
-        print(f"Error saving history: {str(e)}")
+        return {"success": False, "error": f"Error saving history: {str(e)}"}
+
+def get_history(limit=100, ip=None):
+    """
+    Retrieve IP lookup history, newest first.
+
+    Args:
+        limit (int): Most entries to return, None for all of them
+        ip (str): Only lookups of this IP address
 
-def get_history():
-    """Retrieve IP lookup history."""
+    Returns:
+        list: {"ip", "timestamp", "result"} entries
+    """
     try:
-        if os.path.exists(CONFIG["history_file"]):
-            with open(CONFIG["history_file"], "r") as f:
-                return json.load(f)
+        history = get_lookup_history()
+        if ip is not None:
+            return history.for_ip(ip, limit)
+        return history.recent(-1 if limit is None else limit)
     except Exception:
-        pass
-    return []
+        return []
 
 def format_location_info(data):
     """Format location information for display."""
@@ -318,6 +435,8 @@ def show_help():
     print(f"  {Fore.YELLOW}history{Fore.WHITE}: View your IP tracking history")
     print(f"  {Fore.YELLOW}clear{Fore.WHITE}: Clear the screen")
     print(f"  {Fore.YELLOW}my ip{Fore.WHITE}: Track your own public IP address")
+    print(f"  {Fore.YELLOW}bulk{Fore.WHITE}: Look up a file of IPs and domains, saving the results to JSONL or CSV")
+    print(f"  {Fore.YELLOW}cache{Fore.WHITE}: Show lookup cache statistics")
     print(f"  {Fore.YELLOW}exit/quit/back{Fore.WHITE}: Exit the program")
     print()
     print(f"{Fore.CYAN}After tracking an IP, you can use these additional commands:{Style.RESET_ALL}")
@@ -333,7 +452,7 @@ def show_history():
     print(f"{Fore.WHITE}{Style.BRIGHT}📜 IP Tracking History{Style.RESET_ALL}")
     print(Fore.BLUE + "─" * 60)
     
-    history = get_history()
+    history = get_history(15)  # Show only the most recent 15
     
     if not history:
         print(f"{Fore.YELLOW}No tracking history found.")
@@ -341,7 +460,7 @@ def show_history():
         print(f"{Fore.CYAN}{'#':2} {'IP Address':15} {'Date':19} {'Location'}")
         print(Fore.BLUE + "─" * 60)
         
-        for i, entry in enumerate(history[:15]):  # Show only the most recent 15
+        for i, entry in enumerate(history):
             ip = entry["ip"]
             timestamp = entry["timestamp"][:19]  # Truncate milliseconds
             location = format_location_info(entry["result"])
@@ -367,9 +486,28 @@ def show_history():
         except ValueError:
             print(f"{Fore.RED}Please enter a valid number.")
 
+def show_cache_stats():
+    """Display the lookup cache statistics."""
+    display_header()
+    print(f"{Fore.WHITE}{Style.BRIGHT}Lookup cache{Style.RESET_ALL} {Fore.WHITE}({CONFIG['cache_file']})")
+    print(Fore.BLUE + "─" * 60)
+    cache = get_ip_cache()
+    if cache is None:
+        print(f"{Fore.YELLOW}The lookup cache is turned off (CONFIG['cache_ttl'] is 0).")
+    else:
+        stats = cache.stats()
+        print(f"{Fore.CYAN}Cached lookups: {Fore.WHITE}{stats['entries']}")
+        print(f"{Fore.CYAN}Hits / misses (this session): {Fore.WHITE}{stats['hits']} / {stats['misses']} "
+              f"({stats['hit_rate']:.0%})")
+        print(f"{Fore.CYAN}Hits / misses (all time): {Fore.WHITE}{stats['total_hits']} / {stats['total_misses']}")
+        print(f"{Fore.CYAN}Time saved (all time): {Fore.WHITE}{stats['total_saved_ms'] / 1000:.1f}s")
+        print(f"{Fore.CYAN}Answers are kept for {CONFIG['cache_ttl'] // 3600}h, "
+              f"failed lookups for {CONFIG['negative_cache_ttl'] // 60}min")
+    print(Fore.BLUE + "─" * 60)
+    input(f"{Fore.GREEN}Press Enter to continue...")
+
 def get_own_ip():
     """Get the user's own public IP address."""
-    loading_animation("Detecting your public IP address...")
     try:
         response = requests.get("https://api.ipify.org?format=json", timeout=5)
         if response.status_code == 200:
@@ -379,13 +517,63 @@ def get_own_ip():
     except Exception:
         return None
 
+def resolve_target(target):
+    """
+    Turn user input into the IP address to track.
+
+    Args:
+        target (str): An IPv4/IPv6 address, a domain name, or 'my ip'
+
+    Returns:
+        dict: success, ip and query, plus resolved_from ('self' or 'domain')
+            when the IP was looked up, or error on failure
+    """
+    target = target.strip()
+    if target.lower() == 'my ip':
+        ip = get_own_ip()
+        if not ip:
+            return {"success": False, "query": target, "error": "Unable to detect your public IP address."}
+        return {"success": True, "query": target, "ip": ip, "resolved_from": "self"}
+    if is_domain(target):
+        ip = resolve_domain_to_ip(target)
+        if not ip:
+            return {"success": False, "query": target, "error": f"Unable to resolve domain {target} to an IP address."}
+        return {"success": True, "query": target, "ip": ip, "resolved_from": "domain"}
+    if not is_valid_ip(target):
+        return {"success": False, "query": target, "error": "Invalid IP address format."}
+    return {"success": True, "query": target, "ip": target}
+
+def track_ip(target, service=None, save_history=True):
+    """
+    Resolve target and fetch its IP information without any terminal output.
+
+    Args:
+        target (str): An IP address, domain name, or 'my ip'
+        service (str): Key of API_SERVICES or LOCAL_SERVICE, defaults to CONFIG["default_service"]
+        save_history (bool): Record successful lookups in the history file
+
+    Returns:
+        dict: The fetch_ip_info result with 'ip' and 'query' added, or the
+            resolve_target error
+    """
+    target_info = resolve_target(target)
+    if not target_info["success"]:
+        return target_info
+    ip = target_info["ip"]
+    info = fetch_ip_info(ip, service)
+    info["ip"] = ip
+    info["query"] = target_info["query"]
+    if info.get("success", False) and save_history:
+        save_to_history(ip, info)
+    return info
+
 def run_ip_track():
     """Main IP tracking function."""
     while True:
         display_header()
         
         print(f"{Fore.CYAN}Enter an IP address or domain to track:")
-        print(f"{Fore.CYAN}(or type 'help', 'history', 'my ip', 'clear', or 'exit')")
+        print(f"{Fore.CYAN}(or type 'help', 'history', 'my ip', 'bulk', 'cache', 'clear', or 'exit')")
         
         user_input = input(f"{Fore.BLUE}≈≈≈> {Fore.WHITE}").strip()
         
@@ -407,39 +595,46 @@ def run_ip_track():
             continue
         elif user_input_lower == 'clear':
             continue  # Just refresh the screen
-        elif user_input_lower == 'my ip':
-            ip = get_own_ip()
-            if not ip:
-                print(f"{Fore.RED}Unable to detect your public IP address.")
-                input(f"{Fore.GREEN}Press Enter to continue...")
-                continue
-            print(f"{Fore.GREEN}Your public IP address: {ip}")
-            user_input = ip  # Track this IP
-        
-        # Check if input is domain and resolve it
-        elif is_domain(user_input):
-            loading_animation(f"Resolving domain {user_input} to IP...")
-            ip = resolve_domain_to_ip(user_input)
-            if not ip:
-                print(f"{Fore.RED}Unable to resolve domain {user_input} to an IP address.")
-                input(f"{Fore.GREEN}Press Enter to continue...")
-                continue
-            print(f"{Fore.GREEN}Domain {user_input} resolved to IP: {ip}")
-            user_input = ip  # Track the resolved IP
+        elif user_input_lower == 'cache':
+            show_cache_stats()
+            continue
+        elif user_input_lower == 'bulk':
+            try:
+                from .ip_bulk import run_bulk_interactive
+            except ImportError:
+                from ip_bulk import run_bulk_interactive
+            run_bulk_interactive()
+            continue
         
-        # Validate IP address
-        elif not is_valid_ip(user_input):
-            print(f"{Fore.RED}Invalid IP address format.")
+        # Resolve 'my ip' and domain names, and validate IP addresses
+        if user_input_lower == 'my ip' or is_domain(user_input):
+            if user_input_lower == 'my ip':
+                message = "Detecting your public IP address..."
+            else:
+                message = f"Resolving domain {user_input} to IP..."
+            with loading_animation(message):
+                target = resolve_target(user_input)
+        else:
+            target = resolve_target(user_input)
+        if not target["success"]:
+            print(f"{Fore.RED}{target['error']}")
             input(f"{Fore.GREEN}Press Enter to continue...")
             continue
+        if target.get("resolved_from") == "self":
+            print(f"{Fore.GREEN}Your public IP address: {target['ip']}")
+        elif target.get("resolved_from") == "domain":
+            print(f"{Fore.GREEN}Domain {user_input} resolved to IP: {target['ip']}")
+        user_input = target["ip"]  # Track this IP
         
         # Fetch IP information
-        loading_animation(f"Tracking IP address {user_input}, please wait...")
-        info = fetch_ip_info(user_input)
+        with loading_animation(f"Tracking IP address {user_input}, please wait..."):
+            info = fetch_ip_info(user_input)
         
         # Save to history if successful
         if info.get("success", False):
-            save_to_history(user_input, info)
+            saved = save_to_history(user_input, info)
+            if not saved["success"] and CONFIG["save_history"]:
+                print(f"{Fore.YELLOW}{saved['error']}")
         
         # Display information
         display_ip_info(user_input, info)
@@ -0,0 +1,160 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+class LookupHistory:
+    """
+    IP lookup history in a SQLite file.
+
+    Each lookup is one inserted row, indexed by IP and by time, so recording
+    a lookup costs the same however long the history is, and "the latest N"
+    and "every lookup of this IP" are index scans:
+
+        history = LookupHistory("ip_track_history.sqlite3", max_entries=10000)
+        history.add("8.8.8.8", result)
+        history.recent(15)
+        history.for_ip("8.8.8.8")
+
+    Retention (max_entries and max_age_days) is enforced when the file is
+    opened, after an import and then every PRUNE_EVERY inserts rather than
+    on each one, so short runs that add a few lookups each still keep the
+    history within its limits.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, max_entries=10000, max_age_days=None):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._conn = None
+        self._inserts = 0
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lookups ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ip TEXT NOT NULL, timestamp TEXT NOT NULL, "
+                "service TEXT, success INTEGER NOT NULL, result TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS lookups_ip ON lookups (ip, timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS lookups_timestamp ON lookups (timestamp)")
+            self._prune(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    def add(self, ip, result, timestamp=None):
+        """
+        Record a lookup.
+
+        Args:
+            ip (str): The IP address looked up
+            result (dict): The fetch_ip_info result
+            timestamp (str): ISO time of the lookup, defaults to now
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO lookups (ip, timestamp, service, success, result) VALUES (?, ?, ?, ?, ?)",
+                (ip, timestamp, result.get("service"), int(bool(result.get("success"))), json.dumps(result))
+            )
+            self._inserts += 1
+            if self._inserts % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+            conn.commit()
+
+    def _prune(self, conn):
+        if self.max_age_days:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            conn.execute("DELETE FROM lookups WHERE timestamp < ?", (cutoff,))
+        if self.max_entries:
+            conn.execute(
+                "DELETE FROM lookups WHERE id IN "
+                "(SELECT id FROM lookups ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def prune(self):
+        """Apply the retention limits now."""
+        with self._lock:
+            conn = self._connect()
+            self._prune(conn)
+            conn.commit()
+
+    def _entries(self, rows):
+        return [{"ip": ip, "timestamp": timestamp, "result": json.loads(result)} for ip, timestamp, result in rows]
+
+    def recent(self, limit=100):
+        """Return the latest lookups, newest first, as {"ip", "timestamp", "result"} dicts."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT ip, timestamp, result FROM lookups ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return self._entries(rows)
+
+    def for_ip(self, ip, limit=None):
+        """Return every lookup of ip (or the latest limit), newest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT ip, timestamp, result FROM lookups WHERE ip = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (ip, -1 if limit is None else limit)
+            ).fetchall()
+        return self._entries(rows)
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def clear(self):
+        """Delete every recorded lookup."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM lookups")
+            conn.commit()
+
+    def import_json(self, path):
+        """
+        Import a history file in the old JSON format (a list of entries,
+        newest first) and rename it to <path>.imported.
+
+        Returns:
+            int: Entries imported, 0 when there is no file
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        rows = [
+            (entry["ip"], entry.get("timestamp") or datetime.now().isoformat(),
+             (entry.get("result") or {}).get("service"), int(bool((entry.get("result") or {}).get("success"))),
+             json.dumps(entry.get("result") or {}))
+            for entry in reversed(entries) if isinstance(entry, dict) and entry.get("ip")
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO lookups (ip, timestamp, service, success, result) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._prune(conn)
+            conn.commit()
+        os.replace(path, path + ".imported")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,227 @@
+import threading
+import importlib.util
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    from .search import DATA_FILE, SEARCH_FIELDS, get_index
+except ImportError:
+    from search import DATA_FILE, SEARCH_FIELDS, get_index
+
+# Fields vectorized for approximate matching
+NGRAM_FIELDS = ["Name", "Address"]
+
+# Character n-gram sizes; 2-4 catches typos and transposed letters in names
+NGRAM_RANGE = (2, 4)
+
+# Lowest cosine similarity returned by NgramSearchEngine.search
+MIN_SCORE = 0.2
+
+# Share of changed records above which refit() fits a new vocabulary instead
+# of transforming just the new records with the current one
+FULL_REFIT_FRACTION = 0.2
+
+def is_available():
+    """True if scikit-learn is installed."""
+    return importlib.util.find_spec("sklearn") is not None
+
+def record_key(record):
+    """Identity of a record for incremental refits."""
+    return tuple(str(record.get(field) or "") for field in SEARCH_FIELDS)
+
+class NgramSearchEngine:
+    """
+    Approximate search over Name and Address with character n-gram TF-IDF.
+
+    Each field becomes a sparse TF-IDF matrix over one shared vocabulary;
+    because the rows are L2-normalized, a query's cosine similarity to every
+    record is a single sparse matrix product. Misspellings and partial names
+    still share most of their n-grams with the real value, so they rank
+    close to it:
+
+        engine = NgramSearchEngine().fit(records)
+        engine.search("unjanni winarmo", k=5)
+
+    scikit-learn and numpy are imported when the engine is first fitted.
+    A fitted engine is not changed afterwards (refit() returns a new one),
+    so it can be searched from several threads while a refit runs.
+    """
+
+    def __init__(self, fields=NGRAM_FIELDS, ngram_range=NGRAM_RANGE):
+        self.fields = list(fields)
+        self.ngram_range = ngram_range
+        self.vectorizer = None
+        self.matrices = {}
+        self.records = []
+        self.fingerprint = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _texts(self, records, field):
+        return [str(record.get(field) or "") for record in records]
+
+    def _copy(self):
+        return NgramSearchEngine(self.fields, self.ngram_range)
+
+    def fit(self, records, fingerprint=None):
+        """
+        Build the vocabulary and the field matrices from scratch.
+
+        Records with no text in any field leave the engine unfitted (there is
+        no vocabulary to build), and it then finds nothing.
+
+        Returns:
+            NgramSearchEngine: self
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        import numpy as np
+
+        self.records = list(records)
+        self.fingerprint = fingerprint
+        texts = [text for field in self.fields for text in self._texts(self.records, field)]
+        if not any(text.strip() for text in texts):
+            self.vectorizer = None
+            self.matrices = {}
+            return self
+        self.vectorizer = TfidfVectorizer(
+            analyzer="char_wb", ngram_range=self.ngram_range, lowercase=True,
+            sublinear_tf=True, dtype=np.float32
+        )
+        self.vectorizer.fit(texts)
+        self.matrices = {
+            field: self.vectorizer.transform(self._texts(self.records, field)).tocsr()
+            for field in self.fields
+        }
+        return self
+
+    def refit(self, records, fingerprint=None):
+        """
+        Return an engine brought up to date with a changed dataset.
+
+        Rows of records that are still present are kept, and only new
+        records are vectorized, with the current vocabulary. When more than
+        FULL_REFIT_FRACTION of the records changed, the vocabulary is fitted
+        again instead so the n-gram weights stay representative.
+
+        Returns:
+            NgramSearchEngine: A new engine; this one is left as it was
+        """
+        if self.vectorizer is None:
+            return self._copy().fit(records, fingerprint)
+        from scipy.sparse import vstack
+
+        positions = defaultdict(list)
+        for position, record in enumerate(self.records):
+            positions[record_key(record)].append(position)
+        kept, kept_records, added = [], [], []
+        for record in records:
+            previous = positions.get(record_key(record))
+            if previous:
+                kept.append(previous.pop())
+                kept_records.append(record)
+            else:
+                added.append(record)
+        removed = len(self.records) - len(kept)
+        if not records or (len(added) + removed) / max(len(records), 1) > FULL_REFIT_FRACTION:
+            return self._copy().fit(records, fingerprint)
+
+        engine = self._copy()
+        engine.vectorizer = self.vectorizer  # Only read after fitting, so it can be shared
+        for field in self.fields:
+            parts = [self.matrices[field][kept]]
+            if added:
+                parts.append(self.vectorizer.transform(self._texts(added, field)))
+            engine.matrices[field] = vstack(parts).tocsr()
+        engine.records = kept_records + added
+        engine.fingerprint = fingerprint
+        return engine
+
+    def _scores(self, query):
+        import numpy as np
+
+        query_vector = self.vectorizer.transform([query]).T
+        best = np.zeros(len(self.records), dtype=np.float32)
+        best_field = np.zeros(len(self.records), dtype=np.int32)
+        for number, field in enumerate(self.fields):
+            scores = (self.matrices[field] @ query_vector).toarray().ravel()
+            better = scores > best
+            best[better] = scores[better]
+            best_field[better] = number
+        return best, best_field
+
+    def search(self, query, k=10, min_score=MIN_SCORE):
+        """
+        Return the k records most similar to query.
+
+        Args:
+            query (str): Search text, possibly misspelled
+            k (int): Most records to return
+            min_score (float): Lowest cosine similarity to include
+
+        Returns:
+            list: Record copies, best first, with '_score' (0-1) and
+                '_matched_field' added
+        """
+        import numpy as np
+
+        if self.vectorizer is None or not self.records or not query or not query.strip():
+            return []
+        scores, fields = self._scores(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for position in top:
+            if scores[position] < min_score:
+                break
+            record = dict(self.records[position])
+            record["_score"] = float(scores[position])
+            record["_matched_field"] = self.fields[fields[position]]
+            results.append(record)
+        return results
+
+    def score(self, query, records):
+        """
+        Return the similarity of query to each of the given records.
+
+        The records do not have to be part of the fitted dataset.
+
+        Returns:
+            list: One float (0-1) per record, the best over the fields
+        """
+        import numpy as np
+
+        if self.vectorizer is None or not records or not query or not query.strip():
+            return [0.0] * len(records)
+        query_vector = self.vectorizer.transform([query]).T
+        best = np.zeros(len(records), dtype=np.float32)
+        for field in self.fields:
+            scores = (self.vectorizer.transform(self._texts(records, field)) @ query_vector).toarray().ravel()
+            best = np.maximum(best, scores)
+        return [float(value) for value in best]
+
+# Fitted engines by resolved data path, refreshed when the search index changes
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(data_file=DATA_FILE):
+    """
+    Return the NgramSearchEngine for data_file, fitting or refitting it as needed.
+
+    The records come from the search module's in-memory index, so the data
+    file is read once for both. A changed dataset gets a new engine that
+    replaces the cached one in a single step; searches already holding the
+    old engine finish on it.
+    """
+    index = get_index(data_file)
+    key = str(Path(data_file).resolve())
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = NgramSearchEngine().fit(index.records, index.fingerprint)
+            _engines[key] = engine
+        elif engine.fingerprint != index.fingerprint:
+            engine = engine.refit(index.records, index.fingerprint)
+            _engines[key] = engine
+        return engine
@@ -2,16 +2,45 @@ import os
 import csv
 import time
 import re
+import gc
+import json
+import threading
+import importlib.util
 from datetime import datetime
 from pathlib import Path
 from colorama import init, Fore, Back, Style
 from tabulate import tabulate
 
+try:
+    from .spinner import Spinner, SONAR_FRAMES
+except ImportError:
+    from spinner import Spinner, SONAR_FRAMES
+
 # Initialize colorama for cross-platform colored terminal
 init(autoreset=True)
 
 # Configuration
 DATA_FILE = str(Path(__file__).resolve().parent.parent / "data" / "data.csv")
+# Province-partitioned Parquet dataset written by misc/transfer.py --format parquet.
+# Preferred over DATA_FILE when present and pyarrow is installed.
+PARQUET_DATA_DIR = str(Path(__file__).resolve().parent.parent / "data" / "data.parquet")
+
+SEARCH_FIELDS = ["Name", "NIK", "Phone Number", "Address"]
+
+# A 16-digit Indonesian NIK; the first two digits are the province code
+NIK_PATTERN = re.compile(r"\d{16}")
+
+# Serve CSV searches from an in-memory index of the dataset. Turn off for files
+# too large to hold in memory; searches then stream the CSV per query. Parquet
+# datasets are always scanned, with column projection and predicate pushdown.
+USE_MEMORY_INDEX = True
+
+# Prebuilt index snapshots are stored next to the data file as <data file><suffix>
+# (e.g. data.csv.idx). They are plain JSON, never pickle, since anyone who can
+# write to the data directory could otherwise run code through them. Bump the
+# version when the snapshot layout changes.
+INDEX_SNAPSHOT_SUFFIX = ".idx"
+INDEX_SNAPSHOT_VERSION = 3
 
 VERSION = "3.0.0" 
 
@@ -50,63 +79,479 @@ def display_search_header():
     print()
 
 def search_animation(message="Scanning the depths"):
-    """Display a sonar-like scanning animation."""
-    print(f"\n{Fore.CYAN}{message}", end="", flush=True)
-    for i in range(5):
-        time.sleep(0.2)
-        print(Fore.BLUE + "." + Fore.CYAN + "○" + Fore.BLUE + ".", end="", flush=True)
-        time.sleep(0.2)
-    print("\n")
+    """Return a sonar-like spinner that runs while the search inside it runs."""
+    return Spinner(message, frames=SONAR_FRAMES, interval=0.2)
 
-def search_by_name(search_term, data_file=DATA_FILE):
+def arrow():
     """
-    Search for employees by name in the CSV file.
+    Import pyarrow on first use.
+
+    Columnar (Parquet) datasets are optional and pyarrow is slow to import, so
+    CSV searches never pay for it.
+
+    Returns:
+        tuple: The pyarrow, pyarrow.compute and pyarrow.dataset modules
     """
-    results = []
-    search_term = search_term.lower()
     try:
-        with open(data_file, 'r', newline='', encoding='utf-8') as file:
-            # Always skip the first row and use the second row as header
-            next(file)  # skip index/empty header row
-            reader = csv.DictReader(file)
-            for row in reader:
-                if search_term in row.get('Name', '').lower():
-                    results.append(row)
-        if results:
-            results.sort(key=lambda x: x.get('Name', '').lower())
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError("Reading Parquet data requires pyarrow (pip install pyarrow)")
+    return pa, pc, ds
+
+def get_data_file():
+    """Return the dataset to search: the Parquet dataset if available, else the CSV file."""
+    if Path(PARQUET_DATA_DIR).is_dir() and importlib.util.find_spec("pyarrow") is not None:
+        return PARQUET_DATA_DIR
+    return DATA_FILE
+
+def is_columnar(data_file):
+    """Check whether data_file points at a Parquet file or a Parquet dataset directory."""
+    path = Path(data_file)
+    return path.suffix == ".parquet" or path.is_dir()
+
+def open_dataset(data_file):
+    """Open a Parquet file or province-partitioned Parquet dataset."""
+    pa, _, ds = arrow()
+    if not Path(data_file).exists():
+        raise FileNotFoundError(data_file)
+    if not Path(data_file).is_dir():
+        # A single file has no province directories; declaring the partitioning
+        # would add an all-null province column that filters out every row
+        return ds.dataset(str(data_file), format="parquet")
+    return ds.dataset(
+        str(data_file),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("province", pa.string())]), flavor="hive"),
+    )
+
+def scan_columnar(data_file, filter_expr, columns=None, partition_filter=None):
+    """
+    Read the rows matching filter_expr from a Parquet dataset.
+
+    Only the requested columns (the search fields by default) are decoded, and the
+    filter is pushed down to the scanner so partitions and row groups whose
+    statistics rule out a match are never read. partition_filter is applied only
+    when the dataset is actually partitioned by province.
+    """
+    dataset = open_dataset(data_file)
+    if partition_filter is not None and "province" in dataset.schema.names:
+        filter_expr = partition_filter & filter_expr
+    columns = [field for field in (columns or SEARCH_FIELDS) if field in dataset.schema.names]
+    return _fill_nulls(dataset.to_table(columns=columns, filter=filter_expr).to_pylist())
+
+def _fill_nulls(rows):
+    # Parquet cells can be null where a CSV cell is empty; searches expect strings
+    return [{key: "" if value is None else value for key, value in row.items()} for row in rows]
+
+def iter_csv_rows(data_file):
+    """
+    Yield the records of the CSV data file as dicts.
+
+    Handles both the clean layout written by misc/transfer.py (header on the
+    first line) and older exports whose first line is an "Unnamed: 0,..."
+    placeholder with the real header on the second line.
+    """
+    with open(data_file, 'r', newline='', encoding='utf-8') as file:
+        header = next(csv.reader([file.readline()]), [])
+        if "Name" in header:
+            yield from csv.DictReader(file, fieldnames=header)
+        else:
+            yield from csv.DictReader(file)  # real header is on the next line
+
+def load_records(data_file):
+    """Load every record of the CSV file or Parquet dataset as a list of dicts."""
+    if is_columnar(data_file):
+        dataset = open_dataset(data_file)
+        columns = [field for field in SEARCH_FIELDS if field in dataset.schema.names]
+        return _fill_nulls(dataset.to_table(columns=columns).to_pylist())
+    return list(iter_csv_rows(data_file))
+
+def uses_memory_index(data_file):
+    """Check whether searches of data_file are served from the in-memory SearchIndex."""
+    return USE_MEMORY_INDEX and not is_columnar(data_file)
+
+def data_fingerprint(data_file):
+    """Return a cheap (name, mtime, size) fingerprint used to detect a changed dataset."""
+    path = Path(data_file)
+    if path.is_dir():
+        files = [(str(f.relative_to(path)), f) for f in sorted(path.rglob("*.parquet"))]
+    else:
+        files = [(path.name, path)]
+    return tuple((name, f.stat().st_mtime_ns, f.stat().st_size) for name, f in files)
+
+def count_records(data_file=DATA_FILE):
+    """Return the number of records in data_file, without loading a Parquet dataset into memory."""
+    if uses_memory_index(data_file):
+        return len(get_index(data_file))
+    if is_columnar(data_file):
+        return open_dataset(data_file).count_rows()
+    return sum(1 for _ in iter_csv_rows(data_file))
+
+def normalize_phone(phone):
+    """Reduce a phone number to its digits, with the +62 country code folded to a leading 0."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if digits.startswith("62"):
+        digits = "0" + digits[2:]
+    return digits
+
+class SearchIndex:
+    """
+    In-memory copy of a dataset with the lookups the search functions need.
+
+    Lowercased copies of the searchable columns are prepared once, and NIK and
+    phone numbers get exact-match maps (to a record position, or a list of
+    positions when several records share the value), so a query scans prepared
+    strings or does a dict lookup instead of re-parsing the data file. An index loaded from a
+    snapshot passes those lookups in (prepared) rather than building them again.
+    """
+
+    def __init__(self, records, fingerprint=None, prepared=None):
+        self.records = records
+        self.fingerprint = fingerprint
+        if prepared is not None:
+            self.folded, self.nik_index, self.phone_index = prepared
+            return
+        self.folded = {
+            field: [str(record.get(field) or "").lower() for record in records]
+            for field in SEARCH_FIELDS
+        }
+        self.nik_index = {}
+        self.phone_index = {}
+        for position, record in enumerate(records):
+            _add_position(self.nik_index, str(record.get("NIK") or "").strip(), position)
+            _add_position(self.phone_index, normalize_phone(record.get("Phone Number")), position)
+
+    def __len__(self):
+        return len(self.records)
+
+    def find(self, search_term, field="Name"):
+        """Return copies of the records whose field contains search_term (case-insensitive)."""
+        search_term = search_term.lower()
+        return [
+            dict(self.records[position])
+            for position, value in enumerate(self.folded[field])
+            if search_term in value
+        ]
+
+    def find_any(self, search_term):
+        """Return copies of the records matching search_term in any field, tagged with _matched_field."""
+        search_term = search_term.lower()
+        results = []
+        columns = [self.folded[field] for field in SEARCH_FIELDS]
+        for position in range(len(self.records)):
+            for field, column in zip(SEARCH_FIELDS, columns):
+                if column[position] and search_term in column[position]:
+                    record = dict(self.records[position])
+                    record['_matched_field'] = field
+                    results.append(record)
+                    break
         return results
-    except FileNotFoundError:
-        print(f"{Fore.RED}ERROR: Data file not found at {data_file}")
+
+    def lookup_nik(self, nik):
+        """Return copies of the records with exactly this NIK."""
+        return [dict(self.records[position]) for position in _positions(self.nik_index, nik.strip())]
+
+    def lookup_phone(self, phone):
+        """Return copies of the records with this phone number, ignoring formatting."""
+        return [dict(self.records[position]) for position in _positions(self.phone_index, normalize_phone(phone))]
+
+def _add_position(index, key, position):
+    # Most keys are unique, so they map to a bare position rather than a list
+    existing = index.get(key)
+    if existing is None:
+        index[key] = position
+    elif isinstance(existing, int):
+        index[key] = [existing, position]
+    else:
+        existing.append(position)
+
+def _positions(index, key):
+    positions = index.get(key, [])
+    return [positions] if isinstance(positions, int) else positions
+
+# Built indexes by resolved data path, and a build lock per path so concurrent
+# callers (the warm-up thread and the first search) share one build
+_index_cache = {}
+_index_locks = {}
+_index_locks_guard = threading.Lock()
+
+def _index_key(data_file):
+    key = str(Path(data_file).resolve())
+    with _index_locks_guard:
+        lock = _index_locks.setdefault(key, threading.Lock())
+    return key, lock
+
+def index_snapshot_path(data_file):
+    """Return where the prebuilt index snapshot for data_file lives."""
+    return str(data_file).rstrip("/\\") + INDEX_SNAPSHOT_SUFFIX
+
+def save_index_snapshot(data_file, index=None):
+    """
+    Build (unless given) and save the search index for data_file.
+
+    The snapshot holds the records as JSON rows together with the index's
+    lowercased columns and NIK and phone maps, so loading it skips the index
+    build as well as the CSV parse, and the data file's fingerprint, so it is
+    only used while the data file is unchanged. Written atomically, so a
+    search never sees a half-written snapshot.
+
+    Returns:
+        str: Path to the snapshot file
+    """
+    if index is None:
+        index = SearchIndex(load_records(data_file), data_fingerprint(data_file))
+    columns = list(dict.fromkeys(key for record in index.records for key in record if isinstance(key, str)))
+    snapshot = {
+        "version": INDEX_SNAPSHOT_VERSION,
+        "fingerprint": index.fingerprint,
+        "columns": columns,
+        "rows": [[record.get(column) for column in columns] for record in index.records],
+        "folded": index.folded,
+        "nik_index": index.nik_index,
+        "phone_index": index.phone_index,
+    }
+    snapshot_path = index_snapshot_path(data_file)
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"), default=str)
+    os.replace(temp_path, snapshot_path)
+    return snapshot_path
+
+def load_index_snapshot(data_file, fingerprint=None):
+    """
+    Load the prebuilt index for data_file if it exists and is still current.
+
+    Returns:
+        SearchIndex: The index, or None if there is no usable snapshot (older
+            pickled snapshots included; they are rebuilt, never unpickled)
+    """
+    snapshot_path = index_snapshot_path(data_file)
+    if not os.path.exists(snapshot_path):
+        return None
+    # The snapshot is millions of small objects, none of them cyclic; pausing
+    # the cycle collector while they are created saves about a third of the load
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != INDEX_SNAPSHOT_VERSION:
+            return None
+        snapshot_fingerprint = tuple(tuple(entry) for entry in snapshot["fingerprint"])
+        if snapshot_fingerprint != (fingerprint or data_fingerprint(data_file)):
+            return None
+        columns = snapshot["columns"]
+        records = [dict(zip(columns, row)) for row in snapshot["rows"]]
+        folded = snapshot["folded"]
+        if set(folded) != set(SEARCH_FIELDS) or any(len(column) != len(records) for column in folded.values()):
+            return None
+        prepared = (folded, snapshot["nik_index"], snapshot["phone_index"])
+        return SearchIndex(records, snapshot_fingerprint, prepared)
+    except Exception:
+        return None
+    finally:
+        if collecting:
+            gc.enable()
+
+def get_index(data_file=DATA_FILE):
+    """
+    Return the SearchIndex for data_file, building it if needed.
+
+    If another thread is already building it (e.g. the start-up warm-up), this
+    waits for that build to finish instead of starting a second one. The index
+    is rebuilt automatically when the file changes on disk.
+    """
+    key, lock = _index_key(data_file)
+    with lock:
+        fingerprint = data_fingerprint(data_file)
+        index = _index_cache.get(key)
+        if index is None or index.fingerprint != fingerprint:
+            index = load_index_snapshot(data_file, fingerprint)
+            if index is None:
+                index = SearchIndex(load_records(data_file), fingerprint)
+            _index_cache[key] = index
+        return index
+
+def index_ready(data_file=DATA_FILE):
+    """Check whether the index for data_file is built from the current file and no build is in progress."""
+    key, lock = _index_key(data_file)
+    index = _index_cache.get(key)
+    if index is None or lock.locked():
+        return False
+    try:
+        return index.fingerprint == data_fingerprint(data_file)
+    except OSError:
+        return False
+
+def warm_up_index(data_file=None):
+    """
+    Build the search index ahead of the first query.
+
+    Meant to run on a background thread at start-up. Errors are swallowed here;
+    the first real search rebuilds the index and reports them.
+
+    Returns:
+        bool: True if the index was built; False also when the dataset is
+            searched without one (see uses_memory_index)
+    """
+    data_file = data_file or get_data_file()
+    if not uses_memory_index(data_file):
+        return False
+    try:
+        get_index(data_file)
+        return True
+    except Exception:
+        return False
+
+def find_by_name(search_term, data_file=DATA_FILE):
+    """
+    Find employees whose name contains search_term.
+
+    Unlike search_by_name this prints nothing and lets errors propagate.
+
+    Returns:
+        list: Matching records sorted by name
+    """
+    search_term = search_term.lower()
+    if uses_memory_index(data_file):
+        results = get_index(data_file).find(search_term, "Name")
+    elif is_columnar(data_file):
+        _, pc, ds = arrow()
+        results = scan_columnar(
+            data_file, pc.match_substring(ds.field("Name"), pattern=search_term, ignore_case=True)
+        )
+    else:
+        results = [row for row in iter_csv_rows(data_file) if search_term in row.get('Name', '').lower()]
+    results.sort(key=lambda x: x.get('Name', '').lower())
+    return results
+
+def find_by_fields(search_term, data_file=DATA_FILE):
+    """
+    Find employees with search_term in any of SEARCH_FIELDS.
+
+    Each record carries the first field that matched in '_matched_field'.
+    Unlike search_by_multiple_fields this prints nothing and lets errors propagate.
+    """
+    search_term = search_term.lower()
+    if uses_memory_index(data_file):
+        return get_index(data_file).find_any(search_term)
+    if is_columnar(data_file):
+        _, pc, ds = arrow()
+        filter_expr = None
+        for field in SEARCH_FIELDS:
+            expr = pc.match_substring(ds.field(field), pattern=search_term, ignore_case=True)
+            filter_expr = expr if filter_expr is None else filter_expr | expr
+        reader = scan_columnar(data_file, filter_expr)
+    else:
+        reader = iter_csv_rows(data_file)
+    results = []
+    for row in reader:
+        # Only search in Name, NIK, Phone Number, Address
+        for field in SEARCH_FIELDS:
+            value = row.get(field, "")
+            if value and search_term in str(value).lower():
+                row_copy = dict(row)
+                row_copy['_matched_field'] = field
+                results.append(row_copy)
+                break
+    return results
+
+def find_by_nik(nik, data_file=DATA_FILE):
+    """
+    Find employees by exact NIK.
+
+    On a Parquet dataset only the province partition named by the first two
+    digits of the NIK is opened, and only the row groups whose NIK statistics
+    can contain the value are read. Prints nothing and lets errors propagate.
+    """
+    nik = nik.strip()
+    if uses_memory_index(data_file):
+        return get_index(data_file).lookup_nik(nik)
+    if is_columnar(data_file):
+        _, _, ds = arrow()
+        return scan_columnar(
+            data_file, ds.field("NIK") == nik, partition_filter=ds.field("province") == nik[:2]
+        )
+    return [row for row in iter_csv_rows(data_file) if row.get('NIK', '').strip() == nik]
+
+def find_by_phone(phone, data_file=DATA_FILE):
+    """
+    Find employees by phone number, ignoring formatting and the +62/0 prefix.
+
+    Prints nothing and lets errors propagate.
+    """
+    if uses_memory_index(data_file):
+        return get_index(data_file).lookup_phone(phone)
+    wanted = normalize_phone(phone)
+    if not wanted:
         return []
+    reader = scan_columnar(data_file, None) if is_columnar(data_file) else iter_csv_rows(data_file)
+    return [dict(row) for row in reader if normalize_phone(row.get('Phone Number')) == wanted]
+
+def classify_query(search_input):
+    """
+    Work out which search a query asks for.
+
+    Args:
+        search_input (str): Raw query; '*:' searches all fields and a 16-digit
+            number is looked up as a NIK
+
+    Returns:
+        tuple: (mode, term) where mode is 'fields', 'nik' or 'name'
+
+    Raises:
+        ValueError: If the '*:' prefix is repeated or has no term after it
+    """
+    search_term = search_input.strip().lower()
+    if search_term.startswith('*:'):
+        # Prevent multiple *: prefixes (e.g., *:*:name)
+        if search_term.count('*:') > 1:
+            raise ValueError("Invalid search: Please use only one '*:' prefix for all-fields search.")
+        actual_term = search_term[2:]
+        if not actual_term:
+            raise ValueError("Please enter a search term after '*:'")
+        return "fields", actual_term
+    if NIK_PATTERN.fullmatch(search_term):
+        return "nik", search_term
+    return "name", search_term
+
+def _report_search_error(error, data_file):
+    """Print a search error for the interactive search screens."""
+    if isinstance(error, FileNotFoundError):
+        print(f"{Fore.RED}ERROR: Data file not found at {data_file}")
+    else:
+        print(f"{Fore.RED}ERROR: {str(error)}")
+
+def search_by_name(search_term, data_file=DATA_FILE):
+    """
+    Search for employees by name in the CSV file or Parquet dataset.
+    """
+    try:
+        return find_by_name(search_term, data_file)
     except Exception as e:
-        print(f"{Fore.RED}ERROR: {str(e)}")
+        _report_search_error(e, data_file)
         return []
 
 def search_by_multiple_fields(search_term, data_file=DATA_FILE):
     """
     Search across multiple fields in the CSV file.
     """
-    results = []
-    search_term = search_term.lower()
     try:
-        with open(data_file, 'r', newline='', encoding='utf-8') as file:
-            next(file)  # skip index/empty header row
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Only search in Name, NIK, Phone Number, Address
-                for field in ["Name", "NIK", "Phone Number", "Address"]:
-                    value = row.get(field, "")
-                    if value and search_term in str(value).lower():
-                        row_copy = dict(row)
-                        row_copy['_matched_field'] = field
-                        results.append(row_copy)
-                        break
-        return results
-    except FileNotFoundError:
-        print(f"{Fore.RED}ERROR: Data file not found at {data_file}")
+        return find_by_fields(search_term, data_file)
+    except Exception as e:
+        _report_search_error(e, data_file)
         return []
+
+def search_by_nik(nik, data_file=DATA_FILE):
+    """
+    Look up employees by exact NIK.
+    """
+    try:
+        return find_by_nik(nik, data_file)
     except Exception as e:
-        print(f"{Fore.RED}ERROR: {str(e)}")
+        _report_search_error(e, data_file)
         return []
 
 def highlight_match(text, search_term):
@@ -159,6 +604,8 @@ def display_help():
     print(f"{Fore.BLUE}{'~' * 60}")
     print(f"{Fore.WHITE}Search Commands:")
     print(f"{Fore.CYAN}• {Fore.WHITE}Enter any text to search by name")
+    print(f"{Fore.CYAN}• {Fore.WHITE}Enter a 16-digit NIK to look it up directly")
+    print(f"{Fore.CYAN}• {Fore.WHITE}Prefix with {Fore.YELLOW}*:{Fore.WHITE} to search all fields")
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}back{Fore.WHITE} to return to main menu")
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}help{Fore.WHITE} to show this guide")
     print(f"{Fore.CYAN}• {Fore.WHITE}Type {Fore.YELLOW}clear{Fore.WHITE} to clear the screen")
@@ -203,35 +650,35 @@ def run_search():
                 if len(search_history) > 5:  # Keep only last 5 searches
                     search_history.pop(0)
         
-        data_file = Path(DATA_FILE)
+        data_file = Path(get_data_file())
         
         if not data_file.exists():
-            print(f"\n{Fore.RED}⚠ WARNING: Data file not found at {DATA_FILE}")
+            print(f"\n{Fore.RED}⚠ WARNING: Data file not found at {data_file}")
             print(f"{Fore.YELLOW}Please make sure the data file exists and try again.")
             input(f"\n{Fore.CYAN}Press Enter to continue...")
             continue
             
-        # Check for all-fields search
-        if search_term.startswith('*:'):
-            # Prevent multiple *: prefixes (e.g., *:*:name)
-            if search_term.count('*:') > 1 or search_term.startswith('*:*:'):
-                print(f"{Fore.YELLOW}Invalid search: Please use only one '*:' prefix for all-fields search.")
-                time.sleep(1.5)
-                continue
-
-            actual_term = search_term[2:]
-            if not actual_term:
-                print(f"{Fore.YELLOW}Please enter a search term after '*:'")
-                time.sleep(1.5)
-                continue
-                
-            search_animation(f"Deep scanning all fields for '{actual_term}'")
-            results = search_by_multiple_fields(actual_term, data_file)
-            display_results(results, actual_term)
+        # The first search of a session waits here for the start-up warm-up to finish
+        if uses_memory_index(data_file) and not index_ready(data_file):
+            print(f"{Fore.CYAN}Charting the depths (building the search index)...")
+
+        try:
+            mode, actual_term = classify_query(search_term)
+        except ValueError as e:
+            print(f"{Fore.YELLOW}{e}")
+            time.sleep(1.5)
+            continue
+
+        if mode == "fields":
+            with search_animation(f"Deep scanning all fields for '{actual_term}'"):
+                results = search_by_multiple_fields(actual_term, data_file)
+        elif mode == "nik":
+            with search_animation(f"Looking up NIK {actual_term}"):
+                results = search_by_nik(actual_term, data_file)
         else:
-            search_animation(f"Searching employee names for '{search_term}'")
-            results = search_by_name(search_term, data_file)
-            display_results(results, search_term)
+            with search_animation(f"Searching employee names for '{actual_term}'"):
+                results = search_by_name(actual_term, data_file)
+        display_results(results, actual_term)
         
         # Provide suggestions if no results
         if not results:
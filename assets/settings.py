@@ -0,0 +1,32 @@
+import os
+import warnings
+
+def env_number(name, default, cast=float, minimum=None):
+    """
+    Read a numeric setting from the environment.
+
+    A missing, malformed or out-of-range value falls back to default with a
+    warning, so a typo in one SEADAT_* variable does not stop every module
+    that reads it from importing.
+
+    Args:
+        name (str): Environment variable
+        default: Value used when the variable is unset or unusable
+        cast (type): float or int
+        minimum: Smallest accepted value, if any
+
+    Returns:
+        The parsed value, or default
+    """
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = cast(raw.strip())
+    except ValueError:
+        warnings.warn(f"Ignoring {name}={raw!r}: not a number, using {default}")
+        return default
+    if minimum is not None and value < minimum:
+        warnings.warn(f"Ignoring {name}={raw!r}: below {minimum}, using {default}")
+        return default
+    return value
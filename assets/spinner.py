@@ -0,0 +1,84 @@
+import sys
+import time
+import threading
+from colorama import Fore
+
+# Frame sets used across the SeaDat modules
+WAVE_FRAMES = ["~", "≈", "∽", "^"]
+SONAR_FRAMES = [".○.", "○..", "..○", ".○."]
+BRAILLE_FRAMES = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+DOTS_FRAMES = ["⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷"]
+
+class Spinner:
+    """
+    Terminal spinner that animates on a background thread while real work runs.
+
+    Use it as a context manager around the work itself; the animation stops the
+    moment the block exits, so the user waits only as long as the work takes:
+
+        with Spinner("Searching the depths"):
+            results = search_by_name(term)
+
+    When the output is not a terminal the message is printed once and nothing
+    is animated.
+    """
+
+    def __init__(self, message, frames=BRAILLE_FRAMES, interval=0.1, color=Fore.CYAN, stream=None):
+        self.message = message
+        self.frames = frames
+        self.interval = interval
+        self.color = color
+        self.stream = stream or sys.stdout
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self._running = False
+
+    def _animate(self):
+        i = 0
+        while not self._stop_event.wait(self.interval):
+            frame = self.frames[i % len(self.frames)]
+            self.stream.write(f"\r{self.color}{self.message} {Fore.BLUE}{frame}")
+            self.stream.flush()
+            i += 1
+
+    def start(self):
+        """Show the message and start animating."""
+        self._started_at = time.time()
+        self._running = True
+        self._stop_event.clear()
+        self.stream.write(f"\n{self.color}{self.message}")
+        self.stream.flush()
+        if hasattr(self.stream, "isatty") and self.stream.isatty():
+            self._thread = threading.Thread(target=self._animate, name="seadat-spinner", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop animating and leave the message on its own line.
+
+        Safe to call more than once, e.g. early when output starts arriving
+        and again when the with block exits.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            width = len(self.message) + 8
+            self.stream.write(f"\r{' ' * width}\r{self.color}{self.message}")
+        self.stream.write("\n")
+        self.stream.flush()
+        if self._started_at is not None:
+            self.elapsed = time.time() - self._started_at
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import uuid
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from colorama import Fore, Style
+from tabulate import tabulate
+
+# Per-turn metrics of AI Search, one JSON object per line; SEADAT_TELEMETRY=0
+# turns recording off. No query text or results are written, only sizes
+TELEMETRY_ENABLED = os.getenv('SEADAT_TELEMETRY', '1') != '0'
+TELEMETRY_FILE = os.getenv(
+    'SEADAT_TELEMETRY_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "telemetry.jsonl")
+)
+# The file is rotated at MAX_BYTES, keeping BACKUP_COUNT older files (.1, .2, ...)
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+
+STAGES = ["intent", "search", "evaluation", "reply"]
+
+# Turn being recorded in the current context; asyncio tasks inherit it, and
+# bind() carries it into worker threads
+_current_turn = contextvars.ContextVar("seadat_turn", default=None)
+
+_logger = None
+
+class TurnMetrics:
+    """
+    Timings and sizes collected during one AI Search turn.
+
+    Stage times add up when a stage runs more than once in a turn (e.g.
+    several tool searches); stages that run concurrently overlap, so they
+    can add up to more than total_ms.
+    """
+
+    def __init__(self, loop, query="", session=None, turn=None):
+        self.started = time.perf_counter()
+        self.record = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "session": session,
+            "turn": turn,
+            "loop": loop,
+            "query_chars": len(query or ""),
+            "intent_source": None,
+            **{f"{stage}_ms": 0.0 for stage in STAGES},
+            "total_ms": None,
+            "result_count": None,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "tokens_estimated": False,
+            "model_calls": 0,
+            "cache_hits": 0,
+            "evaluation_reuses": 0,
+            "degraded": False,
+        }
+
+    def add_time(self, stage, seconds):
+        self.record[f"{stage}_ms"] += seconds * 1000
+
+    def add(self, name, amount=1):
+        self.record[name] = (self.record.get(name) or 0) + amount
+
+    def set(self, name, value):
+        self.record[name] = value
+
+def new_session_id():
+    """Short random id that groups the turns of one conversation."""
+    return uuid.uuid4().hex[:8]
+
+def current_turn():
+    """Return the TurnMetrics being recorded, or None."""
+    return _current_turn.get()
+
+def start_turn(loop, query="", session=None, turn=None):
+    """
+    Start recording a turn in the current context.
+
+    Returns:
+        TurnMetrics: Pass it to finish_turn()
+    """
+    metrics = TurnMetrics(loop, query, session, turn)
+    metrics.token = _current_turn.set(metrics)
+    return metrics
+
+def finish_turn(metrics, **fields):
+    """
+    Stop recording a turn and append it to the telemetry file.
+
+    Args:
+        metrics (TurnMetrics): From start_turn()
+        **fields: Final values to set (result_count, degraded, ...)
+
+    Returns:
+        dict: The record written
+    """
+    metrics.record.update(fields)
+    metrics.record["total_ms"] = (time.perf_counter() - metrics.started) * 1000
+    for key, value in metrics.record.items():
+        if isinstance(value, float):
+            metrics.record[key] = round(value, 1)
+    try:
+        _current_turn.reset(metrics.token)
+    except ValueError:
+        _current_turn.set(None)  # Finished from another context
+    write_record(metrics.record)
+    return metrics.record
+
+def add(name, amount=1):
+    """Add to a counter of the current turn, if one is being recorded."""
+    metrics = _current_turn.get()
+    if metrics is not None:
+        metrics.add(name, amount)
+
+def set_value(name, value):
+    """Set a field of the current turn, if one is being recorded."""
+    metrics = _current_turn.get()
+    if metrics is not None:
+        metrics.set(name, value)
+
+def add_tokens(prompt_tokens, completion_tokens, estimated=False):
+    """Count one model call and its tokens in the current turn."""
+    metrics = _current_turn.get()
+    if metrics is None:
+        return
+    metrics.add("model_calls")
+    metrics.add("prompt_tokens", prompt_tokens or 0)
+    metrics.add("completion_tokens", completion_tokens or 0)
+    if estimated:
+        metrics.set("tokens_estimated", True)
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a stage of the current turn."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current_turn.get()
+        if metrics is not None:
+            metrics.add_time(name, time.perf_counter() - started)
+
+def timed(name):
+    """Decorator that times every call of a function as stage name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(func):
+    """
+    Return func bound to a copy of the current context, for running in a
+    worker thread (loop.run_in_executor does not carry the context over).
+    """
+    return functools.partial(contextvars.copy_context().run, func)
+
+def get_logger():
+    """Return the logger that writes records to the rotating telemetry file."""
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("seadat.telemetry")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        directory = os.path.dirname(TELEMETRY_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(TELEMETRY_FILE, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+                                      encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+def write_record(record):
+    """Append one record to the telemetry file; failures are ignored."""
+    if not TELEMETRY_ENABLED:
+        return
+    try:
+        get_logger().info(json.dumps(record, separators=(",", ":")))
+    except Exception:
+        pass  # Telemetry must never break a search
+
+def read_records(path=None):
+    """
+    Read every telemetry record, oldest first, including the rotated files.
+
+    Returns:
+        list: Record dicts; unreadable lines are skipped
+    """
+    path = path or TELEMETRY_FILE
+    files = [f"{path}.{number}" for number in range(BACKUP_COUNT, 0, -1)] + [path]
+    records = []
+    for name in files:
+        if not os.path.exists(name):
+            continue
+        with open(name, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize(records):
+    """
+    Summarize telemetry records per stage and size metric.
+
+    Returns:
+        list: [metric, turns, p50, p95, max] rows; stage rows only count turns
+            in which the stage ran
+    """
+    rows = []
+    for name in [f"{stage}_ms" for stage in STAGES] + ["total_ms"]:
+        values = [r[name] for r in records if r.get(name)]
+        if values:
+            rows.append([name, len(values), percentile(values, 0.5), percentile(values, 0.95), max(values)])
+    for name in ["result_count", "prompt_tokens", "completion_tokens", "model_calls"]:
+        values = [r[name] for r in records if r.get(name) is not None]
+        if values:
+            rows.append([name, len(values), percentile(values, 0.5), percentile(values, 0.95), max(values)])
+    return rows
+
+def print_summary(path=None):
+    """Print p50/p95 per stage for the recorded turns."""
+    records = read_records(path)
+    print(f"\n{Fore.CYAN}{Style.BRIGHT}AI Search telemetry{Style.RESET_ALL} {Fore.WHITE}({path or TELEMETRY_FILE})")
+    print(f"{Fore.BLUE}{'~' * 60}")
+    if not records:
+        print(f"{Fore.YELLOW}No turns recorded yet.")
+        if not TELEMETRY_ENABLED:
+            print(f"{Fore.YELLOW}Recording is turned off (SEADAT_TELEMETRY=0)")
+        return
+    rows = [[name, count, f"{p50:.0f}", f"{p95:.0f}", f"{top:.0f}"] for name, count, p50, p95, top in summarize(records)]
+    print(tabulate(rows, headers=["Metric", "Turns", "p50", "p95", "Max"], tablefmt="pretty"))
+    turns = len(records)
+    print(f"{Fore.WHITE}{turns} turn(s) in {len({r.get('session') for r in records})} session(s); "
+          f"{sum(r.get('cache_hits', 0) for r in records)} cache hit(s), "
+          f"{sum(r.get('evaluation_reuses', 0) for r in records)} reused evaluation(s), "
+          f"{sum(1 for r in records if r.get('degraded'))} degraded turn(s), "
+          f"{sum(1 for r in records if r.get('intent_source') == 'local')} intent(s) classified locally")
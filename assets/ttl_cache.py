@@ -0,0 +1,216 @@
+import os
+import json
+import atexit
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Stores between evictions: expired entries and the max_entries limit are
+# enforced on the first store after opening and then on every this many
+EVICT_EVERY = 100
+
+# Reads between writes of the pending hit/miss counters and access times
+# (see TTLCache.flush); they are also written on every eviction and at exit
+FLUSH_EVERY = 100
+
+class TTLCache:
+    """
+    Persistent key-value cache in a SQLite file with per-entry expiry.
+
+    Values must be JSON-serializable. Each entry records how long the value
+    took to produce, so the cache can report how much waiting it has saved.
+    When the cache holds more than max_entries, the least recently used
+    entries are dropped; that is checked every EVICT_EVERY stores, so the
+    file can briefly hold up to EVICT_EVERY entries more.
+
+        cache = TTLCache("data/llm_cache.sqlite3", ttl=3600)
+        key = make_key("gpt-4o", prompt)
+        value = cache.get(key)
+        if value is None:
+            value = expensive_call()
+            cache.set(key, value, cost_ms=elapsed_ms)
+
+    Hit/miss counters are kept per process in .hits, .misses and .saved_ms,
+    and totals across runs are stored in the same file (see stats()). get()
+    only reads the file: the stored counters and the access times the
+    eviction order uses are collected in memory and written in one
+    transaction now and then (see flush()), so a cache hit costs no disk write.
+    """
+
+    def __init__(self, path, ttl=3600, max_entries=5000):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._sets_since_evict = None  # None until the first store evicts
+        self._pending_counters = {}
+        self._pending_access = {}
+        self._reads_since_flush = 0
+        atexit.register(self.flush)
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Safe with WAL: a crash can lose the last commits, never corrupt the file
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, cost_ms REAL NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _bump(self, name, amount=1):
+        self._pending_counters[name] = self._pending_counters.get(name, 0) + amount
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None if it is missing or expired.
+
+        Expired entries are left for the next eviction to delete.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at, cost_ms FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            found = row is not None and row[1] > now
+            if not found:
+                self.misses += 1
+                self._bump("misses")
+            else:
+                self._pending_access[key] = now
+                self.hits += 1
+                self.saved_ms += row[2]
+                self._bump("hits")
+                self._bump("saved_ms", row[2])
+            self._reads_since_flush += 1
+            if self._reads_since_flush >= FLUSH_EVERY:
+                self._flush(conn)
+                conn.commit()
+        return json.loads(row[0]) if found else None
+
+    def _flush(self, conn):
+        conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?",
+                         [(accessed_at, key) for key, accessed_at in self._pending_access.items()])
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            list(self._pending_counters.items())
+        )
+        self._pending_access.clear()
+        self._pending_counters.clear()
+        self._reads_since_flush = 0
+
+    def flush(self):
+        """Write the pending counters and access times to the file."""
+        with self._lock:
+            if not (self._pending_access or self._pending_counters):
+                return
+            try:
+                conn = self._connect()
+                self._flush(conn)
+                conn.commit()
+            except sqlite3.Error:
+                pass  # Only statistics and the eviction order are lost
+
+    def set(self, key, value, ttl=None, cost_ms=0.0):
+        """
+        Store value under key.
+
+        Args:
+            key (str): Cache key, usually from make_key()
+            value: JSON-serializable value
+            ttl (float): Seconds until the entry expires, defaults to self.ttl
+            cost_ms (float): How long producing the value took
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, expires_at, accessed_at, cost_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(value), now, now + ttl, now, cost_ms)
+            )
+            if self._sets_since_evict is None or self._sets_since_evict >= EVICT_EVERY:
+                self._flush(conn)
+                self._evict(conn, now)
+                self._sets_since_evict = 0
+            self._sets_since_evict += 1
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every entry and reset the stored counters."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+            conn.commit()
+            self._pending_access.clear()
+            self._pending_counters.clear()
+        self.hits = self.misses = 0
+        self.saved_ms = 0.0
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: entries, plus hits/misses/saved_ms/hit_rate for this process
+                and total_hits/total_misses/total_saved_ms across runs
+        """
+        self.flush()
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            totals = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_ms": self.saved_ms,
+            "total_hits": int(totals.get("hits", 0)),
+            "total_misses": int(totals.get("misses", 0)),
+            "total_saved_ms": totals.get("saved_ms", 0.0),
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def make_key(*parts):
+    """Build a cache key from JSON-serializable parts (order matters)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
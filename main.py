@@ -2,6 +2,9 @@ import os
 import sys
 import time
 import random
+import subprocess
+import threading
+import importlib.util
 from pathlib import Path
 from colorama import init, Fore, Back, Style
 
@@ -10,6 +13,8 @@ project_root = str(Path(__file__).resolve().parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from assets.spinner import Spinner, WAVE_FRAMES
+
 # Initialize colorama for cross-platform colored terminal text
 init(autoreset=True)
 
@@ -24,6 +29,19 @@ WAVE_PATTERNS = [
 
 VERSION = "3.0.0"
 
+# Modules reported by --import-profile; the heavy third-party packages are only
+# imported on first use, so they are profiled on their own
+PROFILE_MODULES = [
+    "assets.spinner",
+    "assets.search",
+    "assets.ip_track",
+    "assets.instagram_lookup",
+    "assets.ai_search",
+    "assets.image_search",
+]
+DEFERRED_MODULES = ["openai", "pyarrow.dataset", "cv2", "deepface", "tensorflow"]
+IMPORT_BUDGET_MS = 300
+
 # Enhanced SeaDat ASCII logo
 LOGO = """
             .--.                .--.
@@ -72,18 +90,29 @@ def display_menu():
     print(Fore.BLUE + random_wave() * 2)
 
 def loading_indicator(message="Searching the depths"):
-    """Display a loading indicator with an ocean theme."""
-    print(f"\n{Fore.CYAN}{message}", end="")
-    for _ in range(5):
-        time.sleep(0.3)
-        print(Fore.BLUE + random.choice(["~", "≈", "∽", "^"]), end="", flush=True)
-    print()
+    """Return an ocean-themed spinner to wrap around the work being waited on."""
+    return Spinner(message, frames=WAVE_FRAMES, interval=0.15)
+
+def warm_up_search_index():
+    """Import the search module and build its index (runs on a background thread)."""
+    try:
+        from assets.search import warm_up_index
+        warm_up_index()
+    except Exception:
+        # The first search rebuilds the index and reports any problem itself
+        pass
+
+def start_background_warmup():
+    """Start building the search index while the menu is on screen."""
+    thread = threading.Thread(target=warm_up_search_index, name="seadat-warmup", daemon=True)
+    thread.start()
+    return thread
 
 def execute_search():
     """Execute the Employee Data Search module."""
     try:
-        loading_indicator("🌊 Diving for employee data")
-        from assets.search import run_search
+        with loading_indicator("🌊 Diving for employee data"):
+            from assets.search import run_search
         run_search()
     except ImportError as e:
         print(f"\n{Fore.RED}ERROR: search.py module not found!")
@@ -97,8 +126,8 @@ def execute_search():
 def execute_ai_search():
     """Execute the AI Search module."""
     try:
-        loading_indicator("🤖 Activating AI Search")
-        from assets.ai_search import run_ai_search
+        with loading_indicator("🤖 Activating AI Search"):
+            from assets.ai_search import run_ai_search
         run_ai_search()
     except ImportError as e:
         print(f"\n{Fore.RED}ERROR: ai_search.py module not found!")
@@ -112,8 +141,8 @@ def execute_ai_search():
 def execute_ip_track():
     """Execute the IP Address Track module."""
     try:
-        loading_indicator("🌊 Tracking IP address")
-        from assets.ip_track import run_ip_track
+        with loading_indicator("🌊 Tracking IP address"):
+            from assets.ip_track import run_ip_track
         run_ip_track()
     except ImportError as e:
         print(f"\n{Fore.RED}ERROR: ip_track.py module not found!")
@@ -127,8 +156,8 @@ def execute_ip_track():
 def execute_instagram_lookup():
     """Execute the Instagram Lookup module."""
     try:
-        loading_indicator("🌊 Looking up Instagram profile")
-        from assets.instagram_lookup import run_instagram_lookup
+        with loading_indicator("🌊 Looking up Instagram profile"):
+            from assets.instagram_lookup import run_instagram_lookup
         run_instagram_lookup()
     except ImportError as e:
         print(f"\n{Fore.RED}ERROR: instagram_lookup.py module not found!")
@@ -142,8 +171,8 @@ def execute_instagram_lookup():
 def execute_image_search():
     """Execute the Image Search module."""
     try:
-        loading_indicator("🔍 Activating Face Search")
-        from assets.image_search import run_image_search
+        with loading_indicator("🔍 Activating Face Search"):
+            from assets.image_search import run_image_search
         run_image_search()
     except ImportError as e:
         print(f"\n{Fore.RED}ERROR: image_search.py module not found!")
@@ -154,8 +183,91 @@ def execute_image_search():
         print(f"\n{Fore.RED}ERROR: {str(e)}")
         input(f"\n{Fore.CYAN}Press Enter to continue...")
 
+def parse_importtime(output):
+    """Return {module: cumulative ms} from -X importtime output."""
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        timings[name] = int(parts[1]) / 1000
+    return timings
+
+def measure_import(module, baseline=()):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): Dotted module name
+        baseline (iterable): Modules the bare interpreter imports at startup,
+            left out of the heaviest sub-imports
+
+    Returns:
+        dict: total_ms, heaviest (list of (name, ms)) and error
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return {"total_ms": None, "heaviest": [], "error": lines[-1] if lines else "import failed"}
+
+    timings = parse_importtime(result.stderr)
+    baseline = set(baseline)
+    total = timings.get(module, sum(timings.values()))
+    heaviest = sorted(
+        ((name, ms) for name, ms in timings.items()
+         if name != module and "." not in name and name not in baseline),
+        key=lambda item: item[1], reverse=True
+    )[:3]
+    return {"total_ms": total, "heaviest": heaviest, "error": None}
+
+def run_import_profile():
+    """Print the import cost of each SeaDat module and each deferred dependency."""
+    from tabulate import tabulate
+
+    print(f"{Fore.CYAN}Measuring import cost (budget {IMPORT_BUDGET_MS} ms per module)...\n")
+    startup = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        cwd=project_root, capture_output=True, text=True
+    )
+    baseline = parse_importtime(startup.stderr)
+    rows = []
+    over_budget = []
+    deferred = [m for m in DEFERRED_MODULES if importlib.util.find_spec(m.split(".")[0]) is not None]
+    for module in PROFILE_MODULES + deferred:
+        kind = "module" if module in PROFILE_MODULES else "deferred"
+        timing = measure_import(module, baseline)
+        if timing["error"]:
+            rows.append([module, kind, f"{Fore.RED}failed{Style.RESET_ALL}", timing["error"]])
+            continue
+        total = timing["total_ms"]
+        heaviest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in timing["heaviest"])
+        if kind == "module" and total > IMPORT_BUDGET_MS:
+            over_budget.append(module)
+            total_str = f"{Fore.RED}{total:.1f}{Style.RESET_ALL}"
+        else:
+            total_str = f"{total:.1f}"
+        rows.append([module, kind, total_str, heaviest])
+
+    print(tabulate(rows, headers=["Import", "Kind", "Total (ms)", "Heaviest sub-imports"], tablefmt="pretty"))
+    skipped = [m for m in DEFERRED_MODULES if m not in deferred]
+    if skipped:
+        print(f"\n{Fore.YELLOW}Not installed: {', '.join(skipped)}")
+    if over_budget:
+        print(f"\n{Fore.RED}Over budget: {', '.join(over_budget)}")
+        return 1
+    print(f"\n{Fore.GREEN}All SeaDat modules are within the import budget.")
+    return 0
+
 def main():
     """Main function to run the SeaDat tool."""
+    start_background_warmup()
     
     while True:
         display_header()
@@ -184,6 +296,19 @@ def main():
             time.sleep(1.5)
 
 if __name__ == "__main__":
+    if "--import-profile" in sys.argv:
+        sys.exit(run_import_profile())
+    if "--ai-service" in sys.argv:
+        from assets.ai_service import main as run_ai_service
+        sys.exit(run_ai_service(sys.argv[1:]))
+    if "--ip-bulk" in sys.argv:
+        from assets.ip_bulk import main as run_ip_bulk
+        sys.exit(run_ip_bulk(sys.argv[1:]))
+    if "--telemetry" in sys.argv:
+        from assets.telemetry import print_summary
+        print_summary()
+        sys.exit(0)
+
     # Ensure the data directory exists
     data_dir = Path(project_root) / "data"
     if not data_dir.exists():
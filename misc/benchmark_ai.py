@@ -0,0 +1,211 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import builtins
+import argparse
+import threading
+import statistics
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Drives the AI Search conversation loops through recorded sessions against
+# misc/mock_llm.py and reports where each turn's time goes:
+#
+#   python misc/benchmark_ai.py --latency 0.4 --loop both
+#   python misc/benchmark_ai.py --sessions my_sessions.json --no-tools
+
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tabulate import tabulate
+from misc.mock_llm import MockConfig, start_mock_server, load_script
+
+STAGES = ["intent", "search", "evaluation", "reply"]
+
+# Used when no --sessions file is given. Each session is the first query and
+# then what the user types at every following prompt ("" ends the session)
+DEFAULT_SESSIONS = [
+    {"name": "single name", "initial": "Unjani", "inputs": ["more", ""]},
+    {"name": "natural language", "initial": "who lives in banjarbaru", "inputs": ["and is there anyone called budi", ""]},
+    {"name": "nik lookup", "initial": "3173062406881485", "inputs": ["phone 0813 5977 473", ""]},
+]
+
+def load_sessions(path):
+    """Load recorded sessions: a JSON list of {"name", "initial", "inputs"}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class TurnRecorder:
+    """
+    Collects per-stage timings for each turn of a conversation loop.
+
+    A turn runs from one prompt for user input to the next. Stage timings
+    are wall-clock time inside the instrumented functions; stages that run
+    concurrently overlap, so they can add up to more than the turn total.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.turns = []
+        self._current = None
+        self._lock = threading.Lock()
+
+    def start_turn(self, user_input):
+        self._current = {
+            "input": user_input,
+            "started": time.perf_counter(),
+            "requests_before": self.config.requests,
+            **{stage: 0.0 for stage in STAGES}
+        }
+
+    def end_turn(self):
+        if self._current is None:
+            return
+        turn = self._current
+        turn["total"] = time.perf_counter() - turn.pop("started")
+        turn["model_calls"] = self.config.requests - turn.pop("requests_before")
+        self.turns.append(turn)
+        self._current = None
+
+    def add(self, stage, seconds):
+        with self._lock:
+            if self._current is not None:
+                self._current[stage] += seconds
+
+    def timed(self, stage, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+        return wrapper
+
+def run_session(ai, loop_name, session, recorder):
+    """Run one recorded session through a conversation loop, discarding its output."""
+    loop = ai.ai_conversation_loop_personal if loop_name == "personal" else ai.ai_conversation_loop
+    pending = list(session.get("inputs", []))
+
+    def scripted_input(prompt=""):
+        recorder.end_turn()
+        user_input = pending.pop(0) if pending else ""
+        recorder.start_turn(user_input)
+        return user_input
+
+    original_input = builtins.input
+    builtins.input = scripted_input
+    try:
+        recorder.start_turn(session["initial"])
+        with redirect_stdout(io.StringIO()):
+            loop(session["initial"], ai.DATA_FILE)
+    finally:
+        builtins.input = original_input
+        # The final prompt's turn is the session ending, not a real turn
+        recorder._current = None
+
+def instrument(ai, recorder):
+    """Wrap the AI Search stages with timers."""
+    ai.analyze_search_intent = recorder.timed("intent", ai.analyze_search_intent)
+    ai.search_for_intent = recorder.timed("search", ai.search_for_intent)
+    ai.evaluate_search_results = recorder.timed("evaluation", ai.evaluate_search_results)
+    ai.stream_chat_message = recorder.timed("reply", ai.stream_chat_message)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI Search turns against the mock LLM server.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock response latency in seconds (default: 0.3)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds on the latency")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Seconds between streamed chunks")
+    parser.add_argument("--script", help="JSON file of scripted mock answers (see misc/mock_llm.py)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests that fail with a 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of mock requests that are slow")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Seconds before a slow mock response")
+    parser.add_argument("--sessions", help="JSON file of recorded sessions")
+    parser.add_argument("--loop", choices=["basic", "personal", "both"], default="both",
+                        help="Conversation loop to drive (default: both)")
+    parser.add_argument("--runs", type=int, default=1, help="Times to repeat every session")
+    parser.add_argument("--no-tools", dest="tools", action="store_false",
+                        help="Use the intent/evaluation prompts instead of tool calling")
+    parser.add_argument("--no-stream", dest="stream", action="store_false", help="Disable streamed replies")
+    parser.add_argument("--cache", action="store_true", help="Keep the AI response cache on")
+    parser.add_argument("--json", dest="json_out", help="Also write every turn to this JSON file")
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.jitter, args.token_delay,
+                        rules=load_script(args.script) if args.script else None,
+                        error_rate=args.error_rate, slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    server, base_url = start_mock_server(config)
+
+    # ai_search reads its settings at import time
+    os.environ["AIMLAPI_BASE_URL"] = base_url
+    os.environ["AIMLAPI_KEY"] = "mock-benchmark-key"
+    os.environ["SEADAT_TOOLS"] = "1" if args.tools else "0"
+    os.environ["SEADAT_STREAM"] = "1" if args.stream else "0"
+    if not args.cache:
+        os.environ["SEADAT_LLM_CACHE_TTL"] = "0"
+    # A throwaway cache and telemetry file, so the mock's answers and turns
+    # never land in data/llm_cache.sqlite3 or data/telemetry.jsonl
+    scratch_dir = tempfile.mkdtemp(prefix="seadat-benchmark-")
+    os.environ["SEADAT_LLM_CACHE"] = os.path.join(scratch_dir, "llm_cache.sqlite3")
+    os.environ["SEADAT_TELEMETRY_FILE"] = os.path.join(scratch_dir, "telemetry.jsonl")
+    from assets import ai_search as ai
+
+    recorder = TurnRecorder(config)
+    instrument(ai, recorder)
+    sessions = load_sessions(args.sessions) if args.sessions else DEFAULT_SESSIONS
+    loops = ["basic", "personal"] if args.loop == "both" else [args.loop]
+
+    rows = []
+    try:
+        for loop_name in loops:
+            for run in range(args.runs):
+                for session in sessions:
+                    first = len(recorder.turns)
+                    run_session(ai, loop_name, session, recorder)
+                    for number, turn in enumerate(recorder.turns[first:], 1):
+                        turn.update({"loop": loop_name, "session": session["name"], "turn": number, "run": run + 1})
+    finally:
+        server.shutdown()
+        ai.llm_cache.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    for turn in recorder.turns:
+        rows.append([
+            turn["loop"], turn["session"], turn["turn"], turn["input"][:28],
+            *(f"{turn[stage] * 1000:.0f}" for stage in STAGES),
+            f"{turn['total'] * 1000:.0f}", turn["model_calls"]
+        ])
+    print(f"Mock latency {args.latency * 1000:.0f} ms, tools {'on' if args.tools else 'off'}, "
+          f"streaming {'on' if args.stream else 'off'}, {config.errors} injected error(s)\n")
+    print(tabulate(rows, headers=["Loop", "Session", "Turn", "Input", "Intent ms", "Search ms",
+                                  "Eval ms", "Reply ms", "Total ms", "Calls"], tablefmt="pretty"))
+
+    summary = []
+    for loop_name in loops:
+        totals = [t["total"] * 1000 for t in recorder.turns if t["loop"] == loop_name and t["model_calls"]]
+        calls = [t["model_calls"] for t in recorder.turns if t["loop"] == loop_name and t["model_calls"]]
+        if totals:
+            summary.append([loop_name, len(totals), f"{statistics.mean(totals):.0f}",
+                            f"{percentile(totals, 0.5):.0f}", f"{percentile(totals, 0.95):.0f}",
+                            f"{statistics.mean(calls):.1f}"])
+    print()
+    print(tabulate(summary, headers=["Loop", "Model turns", "Mean ms", "p50 ms", "p95 ms", "Calls/turn"],
+                   tablefmt="pretty"))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(recorder.turns, f, indent=2)
+        print(f"\nTurn timings written to {args.json_out}")
+
+if __name__ == "__main__":
+    main()
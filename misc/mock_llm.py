@@ -0,0 +1,306 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI-compatible chat completions API, so AI Search
+# can be run and benchmarked without a key or network:
+#
+#   python misc/mock_llm.py --port 8765 --latency 0.4 --jitter 0.1
+#   AIMLAPI_BASE_URL=http://127.0.0.1:8765/v1 AIMLAPI_KEY=mock python main.py
+#
+# Answers come from a script of rules (--script) matched against the last
+# message, falling back to built-in answers for the SeaDat prompts.
+
+DEFAULT_PORT = 8765
+
+# Words in the default conversational reply
+DEFAULT_REPLY_WORDS = 60
+
+FILLER = (
+    "I searched the employee records and here is what stands out from the results "
+    "for your query, let me know if you want more detail on any of these people "
+).split()
+
+def estimate_tokens(text):
+    return (len(text or "") + 3) // 4
+
+class MockConfig:
+    """
+    Behaviour of the mock server.
+
+    Args:
+        latency (float): Seconds before the first byte of every response
+        jitter (float): Random +/- seconds added to latency
+        token_delay (float): Seconds between streamed chunks
+        reply_words (int): Length of the default conversational reply
+        rules (list): Scripted answers, see load_script()
+        error_rate (float): Share of requests answered with a 503
+        slow_rate (float): Share of requests delayed by slow_latency instead
+        slow_latency (float): Seconds before a slow response
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, token_delay=0.0, reply_words=DEFAULT_REPLY_WORDS, rules=None,
+                 error_rate=0.0, slow_rate=0.0, slow_latency=5.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.reply_words = reply_words
+        self.rules = rules or []
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        if self.slow_rate and random.random() < self.slow_rate:
+            time.sleep(self.slow_latency)
+            return
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self):
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return True
+        return False
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+def load_script(path):
+    """
+    Load scripted answers from a JSON file.
+
+    The file holds a list of rules, tried in order against the content of the
+    last message; the first whose "match" regex matches is used:
+
+        [
+          {"match": "Analyze this employee", "content": "{\"search_fields\": [\"Name\"], ...}"},
+          {"match": "jakarta", "tool_calls": [{"name": "search_employees",
+                                               "arguments": {"fields": ["all"], "term": "jakarta"}}]},
+          {"match": ".*", "content": "Here you go."}
+        ]
+
+    A rule with tool_calls is only used while the request offers tools and
+    the last message is not already a tool result.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    for rule in rules:
+        rule["pattern"] = re.compile(rule.get("match", ".*"), re.IGNORECASE | re.DOTALL)
+    return rules
+
+def default_answer(body, config):
+    """Built-in answer: (content, tool_calls) for the request body."""
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {}
+    content = last.get("content") or ""
+
+    if "Analyze this employee search query" in content:
+        query = re.search(r'query: "(.*?)"', content, re.DOTALL)
+        term = query.group(1) if query else ""
+        return json.dumps({
+            "search_fields": ["Name"], "search_term": term, "filters": [], "is_specific_person": False
+        }), None
+    if "Evaluate if these results" in content:
+        return json.dumps({
+            "relevant": True, "message": "The results match the query.",
+            "best_match_index": 0, "suggestions": []
+        }), None
+
+    if body.get("tools") and body.get("tool_choice") != "none" and last.get("role") == "user":
+        # Search for the last word that could be a name
+        words = [word for word in re.findall(r"[^\W_]+", content) if len(word) > 2]
+        term = words[-1] if words else content
+        return None, [{"name": "search_employees", "arguments": {"fields": ["all"], "term": term}}]
+
+    found = [m for m in messages if m.get("role") == "tool"]
+    lead = f"I ran {len(found)} search(es). " if found else ""
+    words = (FILLER * (config.reply_words // len(FILLER) + 1))[:config.reply_words]
+    return lead + " ".join(words) + ".", None
+
+def answer(body, config):
+    """Pick the scripted or built-in answer for a request."""
+    messages = body.get("messages", [])
+    last = messages[-1] if messages else {}
+    content = last.get("content") or ""
+    tools_allowed = body.get("tools") and body.get("tool_choice") != "none" and last.get("role") != "tool"
+    for rule in config.rules:
+        if not rule["pattern"].search(content):
+            continue
+        if rule.get("tool_calls") and not tools_allowed:
+            continue
+        return rule.get("content"), rule.get("tool_calls")
+    return default_answer(body, config)
+
+def format_tool_calls(tool_calls):
+    return [
+        {
+            "id": f"call_{index}_{random.randrange(16 ** 8):08x}",
+            "type": "function",
+            "function": {
+                "name": call["name"],
+                "arguments": call["arguments"] if isinstance(call["arguments"], str)
+                else json.dumps(call["arguments"])
+            }
+        }
+        for index, call in enumerate(tool_calls or [])
+    ]
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "SeaDatMockLLM/1.0"
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON"}})
+            return
+
+        config = self.config
+        config.count_request()
+        if config.should_fail():
+            config.delay()
+            self._send_json(503, {"error": {"message": "Service unavailable (injected by the mock)"}})
+            return
+        content, tool_calls = answer(body, config)
+        tool_calls = format_tool_calls(tool_calls)
+        prompt_tokens = sum(estimate_tokens(m.get("content")) for m in body.get("messages", []))
+        completion_tokens = estimate_tokens(content) + sum(
+            estimate_tokens(call["function"]["arguments"]) for call in tool_calls
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        response_id = f"chatcmpl-mock{random.randrange(16 ** 8):08x}"
+        model = body.get("model", "gpt-4o")
+
+        config.delay()
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            self._send_json(200, {
+                "id": response_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send(delta, finish=None, extra=None):
+            chunk = {
+                "id": response_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+            }
+            if extra:
+                chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        if content:
+            for word in re.findall(r"\S+\s*", content):
+                send({"content": word})
+                if config.token_delay:
+                    time.sleep(config.token_delay)
+        for index, call in enumerate(tool_calls):
+            send({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                  "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            arguments = call["function"]["arguments"]
+            for start in range(0, len(arguments), 16):
+                send({"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + 16]}}]})
+        send({}, finish=finish_reason)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = {"id": response_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+def start_mock_server(config=None, host="127.0.0.1", port=0):
+    """
+    Start the mock server on a background thread.
+
+    Args:
+        config (MockConfig): Server behaviour, defaults to no latency
+        host (str): Interface to listen on
+        port (int): Port, 0 picks a free one
+
+    Returns:
+        tuple: (server, base_url) - call server.shutdown() to stop it
+    """
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="seadat-mock-llm", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock chat server for SeaDat AI Search.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before each response (default: 0.3)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random +/- seconds on the latency")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--reply-words", type=int, default=DEFAULT_REPLY_WORDS,
+                        help="Words in the default conversational reply")
+    parser.add_argument("--script", help="JSON file of scripted answers")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail with a 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of requests that are slow")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="Seconds before a slow response")
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.jitter, args.token_delay, args.reply_words,
+                        load_script(args.script) if args.script else None,
+                        args.error_rate, args.slow_rate, args.slow_latency)
+    server, base_url = start_mock_server(config, args.host, args.port)
+    print(f"Mock LLM listening on {base_url}")
+    print(f"Run SeaDat against it with AIMLAPI_BASE_URL={base_url} AIMLAPI_KEY=mock")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\nServed {config.requests} request(s).")
+
+if __name__ == "__main__":
+    sys.exit(main())
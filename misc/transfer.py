@@ -1,18 +1,344 @@
 import pandas as pd
 import os
+import re
 import sys
+import csv
+import glob
+import json
+import time
+import hashlib
+import zipfile
+import xml.etree.ElementTree as ET
+import itertools
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
+from openpyxl import load_workbook
 
-def excel_to_csv(excel_file, output_csv=None, sheet_name="Sheet1"):
+# With --index, converted CSV outputs get a prebuilt search index (data.csv ->
+# data.csv.idx) when the search module is importable, so the first query
+# against them skips the build
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+try:
+    from assets.search import index_snapshot_path, save_index_snapshot
+except ImportError:
+    index_snapshot_path = None
+    save_index_snapshot = None
+
+# Parquet output is optional - CSV conversion works without pyarrow installed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+REQUIRED_COLUMNS = ["Name", "NIK", "Phone Number", "Address"]
+
+# How many leading rows to scan for the real header when a sheet has blank rows on top
+HEADER_SCAN_ROWS = 10
+
+# Print a progress line every this many rows while streaming a sheet
+PROGRESS_EVERY = 50000
+
+# Number of data rows shown in the post-conversion preview
+PREVIEW_ROWS = 5
+
+# Workbook extensions picked up by --batch
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+# Summary written to the --batch output directory
+MANIFEST_NAME = "manifest.json"
+
+# Per-output record of source hashes and sheet fingerprints, kept in each output
+# directory so re-runs only convert the sheets that changed
+STATE_NAME = ".transfer_state.json"
+
+# Rows per Parquet row group. Smaller groups give finer min/max statistics for
+# predicate pushdown on NIK, larger ones compress better.
+PARQUET_ROW_GROUP_SIZE = 65536
+
+# Rows buffered across all provinces while streaming a sheet to Parquet; past
+# this, the largest province buffer is written out as a (smaller) row group
+PARQUET_BUFFER_ROWS = 4 * PARQUET_ROW_GROUP_SIZE
+
+def _cell_to_str(value):
+    """Render a cell as text without turning whole numbers (NIK, phone) into floats."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def sheet_to_parquet(excel_file, output_dir, sheet_name="Sheet1"):
+    """
+    Stream one sheet into a province-partitioned Parquet dataset (no console output).
+
+    Rows are read with iter_sheet_rows, with the header found as in
+    sheet_to_csv, and buffered per province (the first two digits of the NIK).
+    A province's buffer is written to its file (province=31/part-0.parquet)
+    as one row group sorted by NIK once it holds PARQUET_ROW_GROUP_SIZE rows,
+    and the largest buffer is written early whenever PARQUET_BUFFER_ROWS rows
+    are held in all, so memory stays bounded however large the sheet is.
+    Files of a previous run are replaced for every province written.
+
+    No search index is written: Parquet datasets are searched by scanning
+    them with column projection and predicate pushdown.
+
+    Returns:
+        dict: rows written, partitions created, column names and missing
+            required columns
+
+    Raises:
+        KeyError: If the sheet does not exist
+    """
+    rows = iter_sheet_rows(excel_file, sheet_name)
+    leading_rows = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+    header_index, columns, keep, missing_columns = sheet_columns(leading_rows)
+    nik_position = columns.index("NIK") if "NIK" in columns else None
+    schema = pa.schema([(name, pa.string()) for name in columns])
+
+    buffers = {}
+    writers = {}
+    buffered = 0
+    row_count = 0
+
+    def flush(province):
+        buffer = buffers.pop(province)
+        if nik_position is not None:
+            buffer.sort(key=lambda cells: cells[nik_position])
+        writer = writers.get(province)
+        if writer is None:
+            partition = Path(output_dir) / f"province={province}"
+            partition.mkdir(parents=True, exist_ok=True)
+            for old in partition.glob("*.parquet"):
+                old.unlink()
+            writer = writers[province] = pq.ParquetWriter(str(partition / "part-0.parquet"), schema)
+        columns_data = [pa.array([cells[j] for cells in buffer], pa.string()) for j in range(len(columns))]
+        writer.write_table(pa.Table.from_arrays(columns_data, schema=schema), row_group_size=PARQUET_ROW_GROUP_SIZE)
+        return len(buffer)
+
+    try:
+        for row in itertools.chain(leading_rows[header_index + 1:], rows):
+            if all(value is None for value in row):
+                continue
+            cells = [_cell_to_str(row[j]) if j < len(row) else "" for j in keep]
+            nik = cells[nik_position] if nik_position is not None else ""
+            province = nik[:2] if len(nik) >= 2 else "00"
+            buffers.setdefault(province, []).append(cells)
+            buffered += 1
+            row_count += 1
+            if len(buffers[province]) >= PARQUET_ROW_GROUP_SIZE:
+                buffered -= flush(province)
+            elif buffered >= PARQUET_BUFFER_ROWS:
+                buffered -= flush(max(buffers, key=lambda name: len(buffers[name])))
+        for province in list(buffers):
+            flush(province)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {
+        "rows": row_count,
+        "partitions": len(writers),
+        "columns": columns,
+        "missing_columns": missing_columns,
+    }
+
+def excel_to_parquet(excel_file, output_dir=None, sheet_name="Sheet1"):
+    """
+    Convert Excel file (specific sheet) to a province-partitioned Parquet dataset
+
+    All columns are written as strings so NIK and phone numbers keep their exact
+    digits. Rows are partitioned by province (the first two digits of the NIK,
+    hive-style ``province=31/``) and sorted by NIK inside each row group, so
+    readers can skip whole partitions and row groups on a NIK lookup. The
+    sheet is streamed (see sheet_to_parquet), so memory stays bounded.
+
+    Args:
+        excel_file (str): Path to Excel file
+        output_dir (str, optional): Path to output dataset directory.
+                                   If None, will use same name as Excel file with .parquet extension
+        sheet_name (str, optional): Name of the sheet to convert. Default is "Sheet1"
+
+    Returns:
+        str: Path to the created Parquet dataset directory
+    """
+    if pa is None:
+        print("Error: Parquet output requires pyarrow. Install it with: pip install pyarrow")
+        return None
+
+    try:
+        if not os.path.exists(excel_file):
+            print(f"Error: File {excel_file} not found.")
+            return None
+
+        if output_dir is None:
+            output_dir = str(Path(excel_file).with_suffix('.parquet'))
+
+        print(f"Reading Excel file: {excel_file} (Sheet: {sheet_name})")
+        try:
+            stats = sheet_to_parquet(excel_file, output_dir, sheet_name)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            return None
+
+        if stats["missing_columns"]:
+            print(f"Warning: Missing columns: {', '.join(stats['missing_columns'])}")
+            print("Available columns:", ', '.join(stats["columns"]))
+        print(f"Successfully converted to Parquet: {output_dir} ({stats['rows']} rows, "
+              f"{stats['partitions']} province partitions)")
+
+        return output_dir
+
+    except Exception as e:
+        print(f"Error converting Excel to Parquet: {str(e)}")
+        return None
+
+def list_sheets(excel_file):
+    """Return the sheet names of a workbook without loading any cells."""
+    workbook = load_workbook(excel_file, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+def iter_sheet_rows(excel_file, sheet_name="Sheet1"):
+    """
+    Stream the rows of one sheet as lists of cell values.
+
+    Uses openpyxl's read-only mode, which parses the sheet XML incrementally
+    instead of loading the whole workbook, so memory stays flat no matter how
+    many rows the sheet has.
+
+    Raises:
+        KeyError: If the sheet does not exist (the message lists the available sheets)
+    """
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise KeyError(f"Worksheet named '{sheet_name}' not found. "
+                           f"Available sheets: {', '.join(workbook.sheetnames)}")
+        for row in workbook[sheet_name].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+def find_header_row(rows):
+    """
+    Return the index of the header row among the first rows of a sheet.
+
+    The header is the first row holding any of the required column names; when
+    none does, the first row is used, as pandas would.
+    """
+    for i, row in enumerate(rows):
+        if any(_cell_to_str(value) in REQUIRED_COLUMNS for value in row):
+            return i
+    return 0
+
+def sheet_columns(leading_rows):
+    """
+    Work out the output columns of a sheet from its first rows.
+
+    Blank rows above the header and unnamed padding columns (the empty index
+    column of HR exports) are dropped; a sheet with no header at all keeps
+    every column, named "Unnamed: <n>" as pandas would.
+
+    Returns:
+        tuple: (index of the header row, column names, positions of those
+            columns in a sheet row, missing required columns)
+    """
+    header_index = find_header_row(leading_rows)
+    header_names = [_cell_to_str(value) for value in leading_rows[header_index]] if leading_rows else []
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header_names]
+    keep = [j for j, name in enumerate(header_names) if name]
+    if not keep:
+        width = max((len(row) for row in leading_rows), default=0)
+        keep = list(range(width))
+        header_names = [f"Unnamed: {j}" for j in keep]
+    return header_index, [header_names[j] for j in keep], keep, missing_columns
+
+def sheet_to_csv(excel_file, output_csv, sheet_name="Sheet1", show_progress=True, build_index=False):
+    """
+    Stream one sheet into a CSV file with a clean header.
+
+    Rows are written as they are read. Only the first HEADER_SCAN_ROWS rows are
+    buffered, to locate the header and check it for the required columns. Blank
+    rows above the header and unnamed padding columns (the empty index column
+    of HR exports) are dropped, so the file starts with ``Name,NIK,...``.
+
+    With build_index, the search module's index is then built from the
+    written CSV and saved next to it (see assets.search.save_index_snapshot).
+    Writing keeps memory flat either way; building the index holds every
+    record, so it is opt-in.
+
+    Returns:
+        dict: rows written, seconds taken, header names, missing required columns,
+              a preview and the index snapshot path (if built)
+
+    Raises:
+        KeyError: If the sheet does not exist
+    """
+    rows = iter_sheet_rows(excel_file, sheet_name)
+    leading_rows = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+    header_index, columns, keep, missing_columns = sheet_columns(leading_rows)
+
+    if build_index and save_index_snapshot is None:
+        raise ImportError("Building the search index requires the assets.search module")
+
+    start_time = time.time()
+    row_count = 0
+    preview = []
+    with open(output_csv, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(columns)
+        for row in itertools.chain(leading_rows[header_index + 1:], rows):
+            if all(value is None for value in row):
+                continue
+            cells = [_cell_to_str(row[j]) if j < len(row) else "" for j in keep]
+            writer.writerow(cells)
+
+            row_count += 1
+            if len(preview) < PREVIEW_ROWS:
+                preview.append(cells)
+            if show_progress and row_count % PROGRESS_EVERY == 0:
+                elapsed = time.time() - start_time
+                print(f"\r  {row_count:,} rows written ({row_count / elapsed:,.0f} rows/s)", end="", flush=True)
+
+    if show_progress and row_count >= PROGRESS_EVERY:
+        print()
+
+    snapshot = save_index_snapshot(output_csv) if build_index else None
+
+    return {
+        "rows": row_count,
+        "seconds": time.time() - start_time,
+        "columns": columns,
+        "missing_columns": missing_columns,
+        "preview": preview,
+        "index": snapshot,
+    }
+
+def excel_to_csv(excel_file, output_csv=None, sheet_name="Sheet1", build_index=False):
     """
     Convert Excel file (specific sheet) to CSV file
-    
+
+    The sheet is streamed (see sheet_to_csv) and written with a clean
+    ``Name,NIK,Phone Number,Address`` header, in flat memory. With build_index
+    the search index is built from the written file afterwards; it holds
+    every record, so memory then grows with the sheet.
+
     Args:
         excel_file (str): Path to Excel file
-        output_csv (str, optional): Path to output CSV file. 
+        output_csv (str, optional): Path to output CSV file.
                                    If None, will use same name as Excel file with .csv extension
         sheet_name (str, optional): Name of the sheet to convert. Default is "Sheet1"
-    
+        build_index (bool, optional): Also write the search index snapshot. Default is False
+
     Returns:
         str: Path to the created CSV file
     """
@@ -21,56 +347,469 @@ def excel_to_csv(excel_file, output_csv=None, sheet_name="Sheet1"):
         if not os.path.exists(excel_file):
             print(f"Error: File {excel_file} not found.")
             return None
-        
-        # Read Excel file from specified sheet
-        print(f"Reading Excel file: {excel_file} (Sheet: {sheet_name})")
-        try:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
-        except ValueError as e:
-            print(f"Error: {str(e)}")
-            # List available sheets
-            available_sheets = pd.ExcelFile(excel_file).sheet_names
-            print(f"Available sheets: {', '.join(available_sheets)}")
-            return None
-        
-        # Check if required columns exist
-        required_columns = ["Name", "NIK", "Phone Number", "Address"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            print(f"Warning: Missing columns: {', '.join(missing_columns)}")
-            print("Available columns:", ', '.join(df.columns))
-        
+
         # Set output filename if not provided
         if output_csv is None:
             excel_path = Path(excel_file)
             output_csv = str(excel_path.with_suffix('.csv'))
-        
-        # Write to CSV
-        df.to_csv(output_csv, index=False)
-        print(f"Successfully converted to CSV: {output_csv}")
-        
+
+        print(f"Reading Excel file: {excel_file} (Sheet: {sheet_name})")
+        try:
+            stats = sheet_to_csv(excel_file, output_csv, sheet_name,
+                                 build_index=build_index and save_index_snapshot is not None)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            return None
+
+        if stats["missing_columns"]:
+            print(f"Warning: Missing columns: {', '.join(stats['missing_columns'])}")
+            print("Available columns:", ', '.join(stats["columns"]))
+
+        print(f"Successfully converted to CSV: {output_csv} "
+              f"({stats['rows']:,} rows in {stats['seconds']:.1f}s)")
+        if stats["index"]:
+            print(f"Search index written: {stats['index']}")
+
         # Display preview of the data
         print("\nData Preview:")
-        print(df.head())
-        
+        for cells in stats["preview"]:
+            print("  " + " | ".join(cells))
+
         return output_csv
-        
+
     except Exception as e:
         print(f"Error converting Excel to CSV: {str(e)}")
         return None
 
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def sheet_fingerprints(excel_file):
+    """
+    Fingerprint every sheet of a workbook without parsing any cells.
+
+    An .xlsx file is a zip archive with one XML part per sheet. A sheet's
+    fingerprint combines the CRC and size of its own part with those of the
+    shared-strings and styles parts its values depend on, all read from the zip
+    directory. An edit to one sheet leaves the other sheets' fingerprints alone,
+    unless it adds new text, which changes the shared strings for every sheet.
+
+    Returns:
+        dict: Sheet name -> fingerprint string
+    """
+    main_ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    rel_ns = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    with zipfile.ZipFile(excel_file) as archive:
+        def part_signature(name):
+            try:
+                info = archive.getinfo(name)
+            except KeyError:
+                return "-"
+            return f"{info.CRC:08x}:{info.file_size}"
+
+        shared = part_signature("xl/sharedStrings.xml") + "|" + part_signature("xl/styles.xml")
+        rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+
+        fingerprints = {}
+        for sheet in workbook.iter(f"{main_ns}sheet"):
+            target = targets.get(sheet.get(f"{rel_ns}id"), "")
+            part = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            signature = f"{part_signature(part)}|{shared}"
+            fingerprints[sheet.get("name")] = hashlib.sha256(signature.encode()).hexdigest()
+        return fingerprints
+
+def load_state(state_dir):
+    """Load the conversion state kept in state_dir (empty if there is none)."""
+    try:
+        with open(Path(state_dir) / STATE_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state_dir, state):
+    """Write the conversion state to state_dir."""
+    state_path = Path(state_dir) / STATE_NAME
+    temp_path = state_path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, state_path)
+
+def describe_source(excel_file, previous_entries=()):
+    """
+    Return the hash and sheet fingerprints of a workbook.
+
+    If a previous state entry for the same file has the same size and
+    modification time, its recorded hash and fingerprints are reused, so an
+    untouched workbook is not even read. Otherwise the file is hashed, and its
+    sheets are fingerprinted only when the hash has changed.
+    """
+    stat = os.stat(excel_file)
+    for entry in previous_entries:
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return {"sha256": entry["sha256"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                    "sheets": entry["sheet_fingerprints"]}
+
+    sha256 = file_sha256(excel_file)
+    for entry in previous_entries:
+        if entry.get("sha256") == sha256:
+            fingerprints = entry["sheet_fingerprints"]
+            break
+    else:
+        fingerprints = sheet_fingerprints(excel_file)
+    return {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sheets": fingerprints}
+
+def output_paths(output_base, output_format):
+    """Return the outputs written for a sheet converted to output_base in output_format."""
+    outputs = []
+    if output_format in ("csv", "both"):
+        outputs.append(f"{output_base}.csv")
+    if output_format in ("parquet", "both"):
+        outputs.append(f"{output_base}.parquet")
+    return outputs
+
+def is_up_to_date(previous, fingerprint, outputs):
+    """Check whether a sheet's recorded conversion still matches its source and outputs."""
+    return (
+        previous is not None
+        and previous.get("fingerprint") == fingerprint
+        and all(output in previous.get("outputs", []) and os.path.exists(output) for output in outputs)
+    )
+
+def refresh_search_indexes(outputs, only_missing=False):
+    """
+    Rebuild the prebuilt search index of each converted CSV output.
+
+    Returns:
+        list: Paths of the snapshots written
+    """
+    if save_index_snapshot is None:
+        return []
+    written = []
+    for output in outputs:
+        if not output.endswith(".csv"):
+            continue  # Parquet datasets are searched without the index
+        if only_missing and os.path.exists(index_snapshot_path(output)):
+            continue
+        written.append(save_index_snapshot(output))
+    return written
+
+def state_entry(source, sheet_name, output_format, outputs, description, rows):
+    """Build the state record for a successfully converted sheet."""
+    return {
+        "source": source,
+        "sheet": sheet_name,
+        "format": output_format,
+        "outputs": outputs,
+        "rows": rows,
+        "sha256": description["sha256"],
+        "size": description["size"],
+        "mtime_ns": description["mtime_ns"],
+        "fingerprint": description["sheets"].get(sheet_name),
+        "sheet_fingerprints": description["sheets"],
+        "converted": datetime.now().isoformat(),
+    }
+
+def expand_batch_source(source):
+    """Return the workbooks named by a directory, a glob pattern or a single file path."""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(str(p) for p in path.iterdir() if p.suffix.lower() in EXCEL_SUFFIXES)
+    if path.is_file():
+        return [str(path)]
+    return sorted(p for p in glob.glob(source, recursive=True) if Path(p).suffix.lower() in EXCEL_SUFFIXES)
+
+def _safe_name(name):
+    """Turn a sheet name into something usable as a file name."""
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or "sheet"
+
+def _unique_safe_names(names, label=None):
+    """
+    Map each name to a file name made by _safe_name(label(name)).
+
+    Names whose file names would clash (e.g. sheets "A B" and "A_B", or two
+    workbooks with the same stem in different directories; compared
+    case-insensitively, as on Windows and macOS) get a short hash of the name
+    appended, so no output overwrites another and each keeps the same file
+    name from run to run.
+
+    Returns:
+        dict: name -> file name
+    """
+    label = label or (lambda name: name)
+    safe = {name: _safe_name(label(name)) for name in names}
+    counts = Counter(value.lower() for value in safe.values())
+    return {
+        name: value if counts[value.lower()] == 1
+        else f"{value}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+        for name, value in safe.items()
+    }
+
+def convert_sheet_job(excel_file, sheet_name, output_base, output_format="csv", build_index=False):
+    """
+    Convert one sheet in a worker process and report what happened.
+
+    With build_index, the CSV output's search index is built after it is
+    written. Never raises, so one bad sheet does not abort the rest of the batch.
+
+    Returns:
+        dict: Manifest entry (source, sheet, outputs, rows, seconds, status, error)
+    """
+    start_time = time.time()
+    entry = {
+        "source": excel_file,
+        "sheet": sheet_name,
+        "outputs": [],
+        "rows": 0,
+        "seconds": 0.0,
+        "status": "ok",
+    }
+    build_index = build_index and save_index_snapshot is not None
+    try:
+        results = []
+        if output_format in ("csv", "both"):
+            output_csv = f"{output_base}.csv"
+            results.append((output_csv, sheet_to_csv(excel_file, output_csv, sheet_name,
+                                                     show_progress=False, build_index=build_index)))
+        if output_format in ("parquet", "both"):
+            if pa is None:
+                raise ImportError("Parquet output requires pyarrow")
+            output_dir = f"{output_base}.parquet"
+            results.append((output_dir, sheet_to_parquet(excel_file, output_dir, sheet_name)))
+        for output, stats in results:
+            entry["outputs"].append(output)
+            entry["rows"] = stats["rows"]
+            entry["missing_columns"] = stats["missing_columns"]
+        entry["indexes"] = [stats["index"] for _, stats in results if stats.get("index")]
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+    entry["seconds"] = round(time.time() - start_time, 3)
+    return entry
+
+def index_job(outputs):
+    """Rebuild missing search indexes for outputs whose sheets were unchanged (worker process)."""
+    try:
+        return refresh_search_indexes(outputs, only_missing=True)
+    except Exception:
+        return []
+
+def convert_batch(source, output_dir, sheets=None, output_format="csv", workers=None, force=False,
+                  build_index=False):
+    """
+    Convert every sheet (or the selected sheets) of many workbooks in parallel.
+
+    Each sheet is converted in its own worker process, so throughput scales with
+    the number of cores. Outputs are written as ``<output_dir>/<workbook>/<sheet>.csv``
+    (or ``.parquet``), with a hash suffix where names would clash (see
+    _unique_safe_names), and a ``manifest.json`` with per-sheet row counts and
+    timings is written to output_dir.
+
+    Runs are incremental: sheets whose fingerprint (see sheet_fingerprints)
+    matches the previous run and whose outputs still exist are skipped, and
+    only the converted sheets get their search indexes rebuilt.
+
+    Args:
+        source (str): Directory, glob pattern or single workbook
+        output_dir (str): Directory for the converted sheets and manifest
+        sheets (list, optional): Sheet names to convert. Default is every sheet
+        output_format (str): "csv", "parquet" or "both"
+        workers (int, optional): Number of worker processes. Default is the CPU count
+        force (bool): Convert every sheet even if it is unchanged
+        build_index (bool): Write search index snapshots next to the CSV outputs
+
+    Returns:
+        dict: The manifest that was written
+    """
+    workbooks = expand_batch_source(source)
+    if not workbooks:
+        print(f"Error: No Excel workbooks found for {source}")
+        return None
+
+    output_root = Path(output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+    state = {} if force else load_state(output_root)
+
+    workbook_names = _unique_safe_names(workbooks, label=lambda workbook: Path(workbook).stem)
+    jobs = []
+    descriptions = {}
+    unchanged = []
+    skipped = []
+    for workbook in workbooks:
+        previous_entries = [entry for entry in state.values() if entry.get("source") == workbook]
+        try:
+            description = describe_source(workbook, previous_entries)
+        except Exception as e:
+            skipped.append({"source": workbook, "status": "error", "error": str(e)})
+            continue
+        descriptions[workbook] = description
+        available = list(description["sheets"])
+        selected = [name for name in available if sheets is None or name in sheets]
+        for name in sheets or []:
+            if name not in available:
+                skipped.append({"source": workbook, "sheet": name, "status": "missing"})
+        workbook_dir = output_root / workbook_names[workbook]
+        workbook_dir.mkdir(exist_ok=True)
+        # Named from every sheet, not just the selected ones, so --sheets does not change them
+        sheet_names = _unique_safe_names(available)
+        for name in selected:
+            output_base = str(workbook_dir / sheet_names[name])
+            outputs = output_paths(output_base, output_format)
+            previous = state.get(outputs[0])
+            if is_up_to_date(previous, description["sheets"][name], outputs):
+                # Keep the stat info current so the next run takes the fast path
+                state[outputs[0]] = dict(previous, size=description["size"], mtime_ns=description["mtime_ns"])
+                unchanged.append({
+                    "source": workbook,
+                    "sheet": name,
+                    "outputs": previous["outputs"],
+                    "rows": previous.get("rows", 0),
+                    "seconds": 0.0,
+                    "status": "unchanged",
+                })
+            else:
+                jobs.append((workbook, name, output_base, output_format, build_index))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Converting {len(jobs)} sheet(s) from {len(workbooks)} workbook(s) with {workers} worker(s), "
+          f"{len(unchanged)} unchanged sheet(s) skipped")
+
+    start_time = time.time()
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(convert_sheet_job, *job) for job in jobs]
+        # Unchanged sheets only need an index if it was deleted since the last run
+        index_futures = [pool.submit(index_job, entry["outputs"]) for entry in unchanged if build_index]
+        for done, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            entries.append(entry)
+            if entry["status"] == "ok":
+                state[entry["outputs"][0]] = state_entry(entry["source"], entry["sheet"], output_format,
+                                                 entry["outputs"], descriptions[entry["source"]], entry["rows"])
+                status = f"{entry['rows']:,} rows"
+            else:
+                status = f"FAILED: {entry['error']}"
+            print(f"  [{done}/{len(jobs)}] {Path(entry['source']).name} / {entry['sheet']}: "
+                  f"{status} ({entry['seconds']:.1f}s)")
+        for future in index_futures:
+            future.result()
+
+    save_state(output_root, state)
+
+    entries.extend(unchanged)
+    entries.sort(key=lambda e: (e["source"], e["sheet"]))
+    manifest = {
+        "created": datetime.now().isoformat(),
+        "source": source,
+        "format": output_format,
+        "workers": workers,
+        "total_seconds": round(time.time() - start_time, 3),
+        "total_rows": sum(e["rows"] for e in entries),
+        "converted": len(jobs),
+        "unchanged": len(unchanged),
+        "sheets": entries,
+        "skipped": skipped,
+    }
+    manifest_path = output_root / MANIFEST_NAME
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    failed = sum(1 for e in entries if e["status"] == "error")
+    print(f"Converted {sum(e['rows'] for e in entries if e['status'] == 'ok'):,} rows in "
+          f"{manifest['total_seconds']:.1f}s ({failed} failed). Manifest: {manifest_path}")
+    return manifest
+
+def convert_single(excel_file, output, sheet_name, output_format="csv", force=False, build_index=False):
+    """
+    Convert one sheet from the command line, skipping it if it is unchanged.
+
+    The state is kept in the output's directory, like the batch state, and
+    with build_index the converted CSV outputs get fresh search indexes.
+
+    Returns:
+        list: Paths of the outputs, or None if the conversion failed
+    """
+    csv_output = output or str(Path(excel_file).with_suffix('.csv'))
+    if output_format == "parquet":
+        parquet_output = output or str(Path(excel_file).with_suffix('.parquet'))
+    else:
+        parquet_output = str(Path(csv_output).with_suffix('.parquet'))
+    outputs = [path for path, fmt in ((csv_output, "csv"), (parquet_output, "parquet"))
+               if output_format in (fmt, "both")]
+    state_dir = Path(outputs[0]).parent
+    state = load_state(state_dir)
+    previous = state.get(outputs[0])
+    description = None
+
+    if os.path.exists(excel_file):
+        try:
+            same_source = [previous] if previous and previous.get("source") == excel_file else []
+            description = describe_source(excel_file, same_source)
+        except (zipfile.BadZipFile, KeyError, OSError):
+            description = None
+        if (not force and description and sheet_name in description["sheets"]
+                and is_up_to_date(previous, description["sheets"][sheet_name], outputs)):
+            print(f"{excel_file} (Sheet: {sheet_name}) is unchanged since the last conversion, skipping.")
+            print("Use --force to convert it anyway.")
+            if build_index:
+                refresh_search_indexes(outputs, only_missing=True)
+            return outputs
+
+    written = []
+    if output_format in ("csv", "both"):
+        written.append(excel_to_csv(excel_file, outputs[0], sheet_name, build_index))
+    if output_format in ("parquet", "both"):
+        written.append(excel_to_parquet(excel_file, outputs[-1], sheet_name))
+    if None in written:
+        return None
+
+    if description:
+        state[outputs[0]] = state_entry(excel_file, sheet_name, output_format, written, description, None)
+        save_state(state_dir, state)
+    return written
+
 def main():
-    # Check command line arguments
-    if len(sys.argv) < 2:
-        print("Usage: python excel_to_csv.py <excel_file> [output_csv_file] [sheet_name]")
+    parser = argparse.ArgumentParser(
+        description="Convert Excel sheets to CSV and/or partitioned Parquet datasets."
+    )
+    parser.add_argument("excel_file", nargs="?", help="Path to the .xlsx file")
+    parser.add_argument("output", nargs="?", default=None,
+                        help="Output CSV file (or Parquet directory with --format parquet)")
+    parser.add_argument("sheet_name", nargs="?", default="Sheet1", help="Sheet to convert (default: Sheet1)")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv",
+                        help="Output format (default: csv)")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="Convert every workbook in a directory or matching a glob pattern")
+    parser.add_argument("--output-dir", default="converted",
+                        help="Output directory for --batch (default: converted)")
+    parser.add_argument("--sheets", help="Comma-separated sheet names to convert in --batch (default: all)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="Convert sheets even if they are unchanged since the last run")
+    parser.add_argument("--index", dest="build_index", action="store_true",
+                        help="Also write search index snapshots for CSV outputs (holds every record in memory)")
+    parser.add_argument("--no-index", dest="build_index", action="store_false", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.batch:
+        sheets = [name.strip() for name in args.sheets.split(",")] if args.sheets else None
+        convert_batch(args.batch, args.output_dir, sheets, args.format, args.workers, args.force,
+                      args.build_index)
         return
-    
-    excel_file = sys.argv[1]
-    output_csv = sys.argv[2] if len(sys.argv) > 2 else None
-    sheet_name = sys.argv[3] if len(sys.argv) > 3 else "Sheet1"
-    
-    excel_to_csv(excel_file, output_csv, sheet_name)
+
+    if not args.excel_file:
+        parser.print_usage()
+        return
+
+    convert_single(args.excel_file, args.output, args.sheet_name, args.format, args.force,
+                   args.build_index)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The modules are imported as the app imports them (assets.search,
+# misc.transfer), from the project root
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
@@ -0,0 +1,122 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from assets import call_policy
+from assets.call_policy import DeadlineExceeded, LatencyTracker, call_with_policy, is_transient
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(call_policy, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(call_policy, "BACKOFF_MAX", 0.001)
+
+_kinds = itertools.count()
+
+def kind():
+    # A fresh latency tracker per test
+    return f"test-{next(_kinds)}"
+
+def failing(errors, result="ok"):
+    """A request raising each of errors in turn, then returning result."""
+    errors = list(errors)
+    calls = []
+
+    def request(timeout):
+        calls.append(timeout)
+        if errors:
+            raise errors.pop(0)
+        return result
+    return request, calls
+
+def test_is_transient():
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionError())
+    assert is_transient(StatusError(429))
+    assert is_transient(StatusError(503))
+    assert not is_transient(StatusError(400))
+    assert not is_transient(ValueError("bad request"))
+
+def test_success_needs_one_attempt_within_the_attempt_timeout():
+    request, calls = failing([])
+    assert call_with_policy(request, kind=kind(), hedge=False) == "ok"
+    assert len(calls) == 1
+    assert calls[0] <= call_policy.ATTEMPT_TIMEOUT
+
+def test_transient_errors_are_retried():
+    request, calls = failing([TimeoutError(), StatusError(503)])
+    assert call_with_policy(request, kind=kind(), retries=2, hedge=False) == "ok"
+    assert len(calls) == 3
+
+def test_other_errors_are_raised_at_once():
+    request, calls = failing([StatusError(400)])
+    with pytest.raises(StatusError):
+        call_with_policy(request, kind=kind(), retries=2, hedge=False)
+    assert len(calls) == 1
+
+def test_last_error_is_raised_when_retries_run_out():
+    request, calls = failing([TimeoutError("first"), TimeoutError("second")])
+    with pytest.raises(TimeoutError, match="second"):
+        call_with_policy(request, kind=kind(), retries=1, hedge=False)
+    assert len(calls) == 2
+
+def test_can_retry_stops_retries():
+    request, calls = failing([TimeoutError()])
+    with pytest.raises(TimeoutError):
+        call_with_policy(request, kind=kind(), retries=2, hedge=False, can_retry=lambda: False)
+    assert len(calls) == 1
+
+def test_deadline_bounds_attempts_and_retries():
+    def slow_failure(timeout):
+        time.sleep(0.05)
+        raise TimeoutError()
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        call_with_policy(slow_failure, kind=kind(), deadline=0.12, retries=100, hedge=False)
+    assert time.perf_counter() - started < 1.0
+
+def test_attempt_timeout_is_capped_by_the_remaining_deadline():
+    request, calls = failing([])
+    call_with_policy(request, kind=kind(), deadline=0.5, hedge=False)
+    assert calls[0] <= 0.5
+
+def test_deadline_exceeded_from_the_request_is_not_retried():
+    request, calls = failing([DeadlineExceeded("stream ran too long")])
+    with pytest.raises(DeadlineExceeded):
+        call_with_policy(request, kind=kind(), retries=3, hedge=False)
+    assert len(calls) == 1
+
+def test_slow_request_is_hedged(monkeypatch):
+    monkeypatch.setattr(call_policy, "HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setattr(call_policy, "HEDGE_MIN_DELAY", 0.01)
+    release = threading.Event()
+    calls = []
+
+    def request(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(2)  # The first request hangs
+            return "slow"
+        return "fast"
+
+    try:
+        assert call_with_policy(request, kind=kind(), deadline=2, hedge=True) == "fast"
+        assert len(calls) == 2
+    finally:
+        release.set()
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=5)
+    assert tracker.percentile(0.95) is None
+    for seconds in [5, 1, 2, 3, 4, 100]:
+        tracker.record(seconds)
+    assert len(tracker) == 5  # The oldest sample fell out of the window
+    assert tracker.percentile(0.0) == 1
+    assert tracker.percentile(1.0) == 100
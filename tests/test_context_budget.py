@@ -0,0 +1,88 @@
+import json
+
+from assets.context_budget import (
+    SUMMARY_PREFIX, compact_json, count_message_tokens, drop_stale_context, fit_to_budget, fit_tool_results,
+    shrink_context
+)
+
+CONTEXT_HEADER = "Current search context (AI use only):"
+
+def context_message(results, term="budi"):
+    body = compact_json({"search_term": term, "total_results": len(results), "results": results})
+    return {"role": "system", "content": f"{CONTEXT_HEADER}\n{body}"}
+
+def records(count):
+    return [{"name": f"Person {i}", "address": f"Jalan Merdeka No. {i}, Banjarbaru"} for i in range(count)]
+
+def conversation(turns):
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"question {turn} " + "about someone " * 10})
+        messages.append(context_message(records(3), term=f"term {turn}"))
+        messages.append({"role": "assistant", "content": f"answer {turn} " + "with details " * 20})
+    messages.append({"role": "user", "content": "the last question"})
+    return messages
+
+def test_compact_json_leaves_out_empty_values():
+    assert compact_json({"a": 1, "b": None, "c": "", "d": [], "e": {"f": {}}}) == '{"a":1}'
+
+def test_drop_stale_context_keeps_only_the_latest_context():
+    messages = conversation(3)
+    kept = drop_stale_context(messages)
+    contexts = [m for m in kept[1:] if m["role"] == "system"]
+    assert len(contexts) == 1
+    assert "term 2" in contexts[0]["content"]
+    assert kept[0] == messages[0]
+
+def test_messages_within_budget_are_unchanged():
+    messages = conversation(1)
+    assert fit_to_budget(messages, budget=10_000) == messages
+
+def test_old_turns_are_summarized_to_fit():
+    messages = conversation(12)
+    budget = count_message_tokens(messages) // 3
+    fitted = fit_to_budget(messages, budget=budget)
+    assert count_message_tokens(fitted) <= budget
+    assert fitted[0] == messages[0]
+    assert fitted[-1] == messages[-1]
+    assert fitted[1]["content"].startswith(SUMMARY_PREFIX)
+
+def test_search_context_loses_whole_records_last():
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "who lives in banjarbaru"},
+        context_message(records(200)),
+    ]
+    budget = count_message_tokens(messages) // 4
+    fitted = fit_to_budget(messages, budget=budget)
+    assert count_message_tokens(fitted) <= budget
+    header, _, body = fitted[-1]["content"].partition("\n")
+    assert header == CONTEXT_HEADER
+    context = json.loads(body)
+    assert 0 < len(context["results"]) < 200
+    assert context["results_omitted"] == 200 - len(context["results"])
+    assert context["results"][0] == records(1)[0]
+
+def test_shrink_context_drops_plain_text_lines_before_the_total():
+    content = "\n".join(["Results:"] + [f"- record {i} " + "x" * 40 for i in range(50)] + ["Total: 50"])
+    shrunk = shrink_context(content, 60)
+    lines = shrunk.splitlines()
+    assert lines[0] == "Results:" and lines[-1] == "Total: 50"
+    assert len(lines) < 52
+
+def test_fit_tool_results_shrinks_but_keeps_tool_messages():
+    tool_content = compact_json({"term": "budi", "total_matches": 200, "results": records(200)})
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "find budi"},
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "1"}, {"id": "2"}]},
+        {"role": "tool", "tool_call_id": "1", "content": tool_content},
+        {"role": "tool", "tool_call_id": "2", "content": tool_content},
+    ]
+    budget = count_message_tokens(messages) // 5
+    fitted = fit_tool_results(messages, budget=budget)
+    assert count_message_tokens(fitted) <= budget
+    assert [m.get("tool_call_id") for m in fitted] == [None, None, None, "1", "2"]
+    for message in fitted[3:]:
+        assert json.loads(message["content"])["results_omitted"] > 0
+    assert messages[3]["content"] == tool_content  # The input is not modified
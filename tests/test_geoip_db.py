@@ -0,0 +1,78 @@
+import ipaddress
+
+import pytest
+
+from assets.geoip_db import GeoIPDatabase, get_database
+
+def write(tmp_path, text, name="ranges.csv"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def db(tmp_path):
+    # Deliberately out of order, with a gap between 1.0.1.255 and 8.8.8.0
+    return GeoIPDatabase(write(tmp_path, (
+        "start_ip,end_ip,country,region,city\n"
+        "8.8.8.0,8.8.8.255,US,California,Mountain View\n"
+        "1.0.0.0,1.0.0.255,AU,Queensland,Brisbane\n"
+        "# a comment line\n"
+        "1.0.1.0,1.0.1.255,CN,-,\n"
+        "not-an-ip,1.2.3.4,XX,,\n"
+        "2001:db8::,2001:db8::ffff,NL,North Holland,Amsterdam\n"
+    )))
+
+def test_lookup_finds_the_containing_range(db):
+    assert db.lookup("8.8.8.8") == {"country": "US", "region": "California", "city": "Mountain View"}
+    assert db.lookup("1.0.0.7")["city"] == "Brisbane"
+
+def test_range_bounds_are_inclusive(db):
+    assert db.lookup("1.0.0.0")["country"] == "AU"
+    assert db.lookup("1.0.0.255")["country"] == "AU"
+    assert db.lookup("1.0.1.0")["country"] == "CN"
+
+def test_addresses_outside_every_range(db):
+    assert db.lookup("0.255.255.255") is None
+    assert db.lookup("5.5.5.5") is None  # In the gap
+    assert db.lookup("9.0.0.0") is None
+
+def test_empty_and_dash_fields_are_left_out(db):
+    assert db.lookup("1.0.1.1") == {"country": "CN"}
+
+def test_malformed_rows_are_skipped(db):
+    assert len(db) == 4
+
+def test_ipv6_ranges(db):
+    assert db.lookup("2001:db8::1")["city"] == "Amsterdam"
+    assert db.lookup("2001:db9::1") is None
+
+def test_invalid_address_raises_value_error(db):
+    with pytest.raises(ValueError):
+        db.lookup("not an ip")
+
+def test_cidr_networks(tmp_path):
+    db = GeoIPDatabase(write(tmp_path, "network,country_code,latitude,longitude\n10.0.0.0/8,ID,-6.2,106.8\n"))
+    assert db.lookup("10.200.0.1") == {"country": "ID", "lat": "-6.2", "lon": "106.8"}
+    assert db.lookup("11.0.0.0") is None
+
+def test_headerless_integer_layout(tmp_path):
+    start, end = int(ipaddress.IPv4Address("1.0.0.0")), int(ipaddress.IPv4Address("1.0.0.255"))
+    db = GeoIPDatabase(write(tmp_path, f'"{start}","{end}","AU","Australia","Queensland","Brisbane"\n'))
+    assert db.lookup("1.0.0.1") == {"country": "AU", "country_name": "Australia", "region": "Queensland",
+                                    "city": "Brisbane"}
+
+def test_shared_values_are_stored_once(tmp_path):
+    rows = "".join(f"10.0.{i}.0,10.0.{i}.255,ID,Jakarta\n" for i in range(50))
+    db = GeoIPDatabase(write(tmp_path, "start_ip,end_ip,country,city\n" + rows))
+    assert len(db) == 50
+    assert db._strings.count("Jakarta") == 1
+    assert db.lookup("10.0.49.1") == {"country": "ID", "city": "Jakarta"}
+
+def test_empty_file(tmp_path):
+    db = GeoIPDatabase(write(tmp_path, ""))
+    assert len(db) == 0
+    assert db.lookup("8.8.8.8") is None
+
+def test_get_database_loads_once(tmp_path):
+    path = write(tmp_path, "start_ip,end_ip,country\n8.8.8.0,8.8.8.255,US\n")
+    assert get_database(path) is get_database(path)
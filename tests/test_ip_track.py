@@ -0,0 +1,79 @@
+import pytest
+
+from assets import ip_track
+
+@pytest.fixture
+def ip_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(ip_track.CONFIG, "cache_file", str(tmp_path / "ip_cache.sqlite3"))
+    monkeypatch.setitem(ip_track.CONFIG, "cache_ttl", 3600)
+    monkeypatch.setattr(ip_track, "_ip_cache", None)
+    yield
+    if ip_track._ip_cache is not None:
+        ip_track._ip_cache.close()
+
+def counting_requests(monkeypatch, result):
+    calls = []
+
+    def request_ip_info(ip, service, session=None):
+        calls.append((ip, service))
+        return dict(result)
+    monkeypatch.setattr(ip_track, "request_ip_info", request_ip_info)
+    return calls
+
+def test_cache_ttl_for():
+    assert ip_track.cache_ttl_for({"success": True}) == ip_track.CONFIG["cache_ttl"]
+    assert ip_track.cache_ttl_for({"success": False, "error": "HTTP Error: 404"}) == ip_track.CONFIG["negative_cache_ttl"]
+    assert ip_track.cache_ttl_for({"success": False, "error": "HTTP Error: 429"}) == 0
+    assert ip_track.cache_ttl_for({"success": False, "error": "Request timed out"}) == 0
+
+def test_successful_lookup_is_answered_from_the_cache(ip_cache, monkeypatch):
+    calls = counting_requests(monkeypatch, {"success": True, "service": "ipinfo", "data": {"ip": "8.8.8.8"}})
+    first = ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    second = ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    assert len(calls) == 1
+    assert "cached" not in first and second["cached"] is True
+    assert second["data"] == first["data"]
+
+def test_cache_is_keyed_by_service(ip_cache, monkeypatch):
+    calls = counting_requests(monkeypatch, {"success": True, "data": {}})
+    ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    ip_track.fetch_ip_info("8.8.8.8", "ip-api")
+    assert len(calls) == 2
+
+def test_transient_failures_are_not_cached(ip_cache, monkeypatch):
+    calls = counting_requests(monkeypatch, {"success": False, "error": "Request timed out"})
+    ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    assert len(calls) == 2
+
+def test_use_cache_false_bypasses_the_cache(ip_cache, monkeypatch):
+    calls = counting_requests(monkeypatch, {"success": True, "data": {}})
+    ip_track.fetch_ip_info("8.8.8.8", "ipinfo")
+    ip_track.fetch_ip_info("8.8.8.8", "ipinfo", use_cache=False)
+    assert len(calls) == 2
+
+@pytest.fixture
+def local_database(tmp_path, monkeypatch):
+    path = tmp_path / "ranges.csv"
+    path.write_text("start_ip,end_ip,country,city,lat,lon\n8.8.8.0,8.8.8.255,US,Mountain View,37.4,-122.1\n")
+    monkeypatch.setitem(ip_track.CONFIG, "geoip_database", str(path))
+    return path
+
+def test_lookup_local_shapes_the_result(local_database):
+    result = ip_track.lookup_local("8.8.8.8")
+    assert result["success"] and result["service"] == ip_track.LOCAL_SERVICE
+    assert result["data"] == {"ip": "8.8.8.8", "country": "US", "city": "Mountain View", "loc": "37.4,-122.1"}
+    assert ip_track.lookup_local("9.9.9.9")["error"] == "IP address not found in the range database"
+
+def test_lookup_local_tells_bad_addresses_from_bad_databases(tmp_path, monkeypatch, local_database):
+    assert ip_track.lookup_local("not an ip")["error"] == "Invalid IP address: not an ip"
+    broken = tmp_path / "broken.csv"
+    broken.write_bytes(b"start_ip,end_ip,country\n8.8.8.0,8.8.8.255,\xff\xfe\n")
+    monkeypatch.setitem(ip_track.CONFIG, "geoip_database", str(broken))
+    assert ip_track.lookup_local("8.8.8.8")["error"].startswith("IP range database unavailable")
+
+def test_fetch_ip_info_defaults_to_the_configured_service(local_database, monkeypatch):
+    monkeypatch.setitem(ip_track.CONFIG, "default_service", ip_track.LOCAL_SERVICE)
+    counting_requests(monkeypatch, {"success": True})
+    assert ip_track.fetch_ip_info("8.8.8.8")["service"] == ip_track.LOCAL_SERVICE
+    assert ip_track.fetch_ip_info("8.8.8.8", "no-such-service")["service"] == ip_track.LOCAL_SERVICE
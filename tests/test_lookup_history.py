@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from assets.lookup_history import LookupHistory
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history.sqlite3")
+
+def days_ago(days):
+    return (datetime.now() - timedelta(days=days)).isoformat()
+
+def test_recent_and_for_ip_are_newest_first(path):
+    history = LookupHistory(path)
+    history.add("8.8.8.8", {"success": True, "n": 1}, timestamp=days_ago(2))
+    history.add("1.1.1.1", {"success": True, "n": 2}, timestamp=days_ago(1))
+    history.add("8.8.8.8", {"success": False, "n": 3})
+    assert [entry["result"]["n"] for entry in history.recent()] == [3, 2, 1]
+    assert [entry["result"]["n"] for entry in history.for_ip("8.8.8.8")] == [3, 1]
+    assert [entry["result"]["n"] for entry in history.for_ip("8.8.8.8", limit=1)] == [3]
+    history.close()
+
+def test_inserts_prune_every_prune_every(path, monkeypatch):
+    monkeypatch.setattr(LookupHistory, "PRUNE_EVERY", 5)
+    history = LookupHistory(path, max_entries=3)
+    for i in range(4):
+        history.add(f"10.0.0.{i}", {"success": True})
+    assert history.count() == 4  # Not pruned yet
+    history.add("10.0.0.4", {"success": True})
+    assert history.count() == 3
+    assert [entry["ip"] for entry in history.recent()] == ["10.0.0.4", "10.0.0.3", "10.0.0.2"]
+    history.close()
+
+def test_opening_the_file_enforces_retention(path):
+    history = LookupHistory(path, max_entries=100)
+    for i in range(10):
+        history.add(f"10.0.0.{i}", {"success": True})
+    history.close()
+
+    reopened = LookupHistory(path, max_entries=4)
+    assert reopened.count() == 4
+    reopened.close()
+
+def test_old_entries_are_dropped_by_age(path):
+    history = LookupHistory(path)
+    history.add("10.0.0.1", {"success": True}, timestamp=days_ago(10))
+    history.add("10.0.0.2", {"success": True}, timestamp=days_ago(1))
+    history.close()
+
+    reopened = LookupHistory(path, max_age_days=5)
+    assert [entry["ip"] for entry in reopened.recent()] == ["10.0.0.2"]
+    reopened.close()
+
+def test_import_json_converts_and_prunes(tmp_path, path):
+    old_file = tmp_path / "history.json"
+    entries = [{"ip": f"10.0.0.{i}", "timestamp": days_ago(i), "result": {"success": True, "service": "ipinfo"}}
+               for i in range(6)]  # Newest first, as the old format kept them
+    old_file.write_text(json.dumps(entries + [{"no_ip": True}]))
+
+    history = LookupHistory(path, max_entries=4)
+    assert history.import_json(str(old_file)) == 6
+    assert not old_file.exists()
+    assert (tmp_path / "history.json.imported").exists()
+    assert [entry["ip"] for entry in history.recent()] == ["10.0.0.0", "10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    assert history.import_json(str(old_file)) == 0
+    history.close()
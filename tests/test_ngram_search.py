@@ -0,0 +1,80 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from assets import ngram_search
+from assets.ngram_search import NgramSearchEngine
+
+NAMES = [
+    "Unjani Winarno", "Budi Handayani", "Siti Rahmawati", "Agus Setiawan", "Dewi Lestari",
+    "Rudi Hartono", "Rina Marlina", "Joko Susilo", "Wahyu Pratama", "Putri Ayu",
+]
+
+def make_records(names):
+    return [{"Name": name, "NIK": str(3173000000000000 + i), "Phone Number": f"0812{i:07d}",
+             "Address": f"Jalan {name.split()[0]} No. {i}, Banjarbaru"} for i, name in enumerate(names)]
+
+@pytest.fixture
+def engine():
+    return NgramSearchEngine().fit(make_records(NAMES), fingerprint="v1")
+
+def test_search_ranks_a_misspelled_name_first(engine):
+    results = engine.search("unjanni winarmo", k=3)
+    assert results[0]["Name"] == "Unjani Winarno"
+    assert results[0]["_matched_field"] == "Name"
+    assert [r["_score"] for r in results] == sorted((r["_score"] for r in results), reverse=True)
+
+def test_search_respects_min_score(engine):
+    assert engine.search("zzzzqqqq", min_score=0.5) == []
+    assert engine.search("   ") == []
+
+def test_score_rates_records_outside_the_dataset(engine):
+    scores = engine.score("budi", [{"Name": "Budi Santoso"}, {"Name": "Xavier Quinn"}])
+    assert scores[0] > scores[1]
+
+def test_fit_without_text_finds_nothing():
+    for records in ([], [{"Name": "", "Address": ""}]):
+        empty = NgramSearchEngine().fit(records)
+        assert empty.search("budi") == []
+        assert empty.score("budi", [{"Name": "Budi"}]) == [0.0]
+
+def test_refit_returns_a_new_engine_and_leaves_the_old_one(engine):
+    records = make_records(NAMES + ["Bambang Sutrisno"])
+    refitted = engine.refit(records, fingerprint="v2")
+    assert refitted is not engine
+    assert len(engine) == len(NAMES) and engine.fingerprint == "v1"
+    assert len(refitted) == len(NAMES) + 1 and refitted.fingerprint == "v2"
+    assert engine.search("bambang", min_score=0.3) == []
+    assert refitted.search("bambang", k=1)[0]["Name"] == "Bambang Sutrisno"
+
+def test_small_change_keeps_the_vocabulary(engine):
+    refitted = engine.refit(make_records(NAMES[:-1]), fingerprint="v2")
+    assert refitted.vectorizer is engine.vectorizer
+    assert len(refitted) == len(NAMES) - 1
+
+def test_large_change_fits_a_new_vocabulary(engine):
+    refitted = engine.refit(make_records(["Completely Different", "Other People"]), fingerprint="v2")
+    assert refitted.vectorizer is not engine.vectorizer
+    assert refitted.search("completely", k=1)[0]["Name"] == "Completely Different"
+
+def test_get_engine_swaps_in_a_refitted_engine(tmp_path):
+    data_file = tmp_path / "data.csv"
+
+    def write(names, mtime):
+        with open(data_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["Name", "NIK", "Phone Number", "Address"])
+            writer.writeheader()
+            writer.writerows(make_records(names))
+        os.utime(data_file, ns=(mtime, mtime))
+
+    write(NAMES, 1_000_000_000)
+    first = ngram_search.get_engine(str(data_file))
+    assert ngram_search.get_engine(str(data_file)) is first
+    write(NAMES + ["Bambang Sutrisno"], 2_000_000_000)
+    second = ngram_search.get_engine(str(data_file))
+    assert second is not first
+    assert len(first) == len(NAMES)
+    assert len(second) == len(NAMES) + 1
@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+pytest.importorskip("openpyxl")
+
+from openpyxl import Workbook
+
+from misc import transfer
+
+HEADER = ["Name", "NIK", "Phone Number", "Address"]
+
+def make_workbook(path, sheets):
+    """Write a workbook of {sheet name: rows} with the HR header on every sheet."""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        sheet.append(HEADER)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+def people(count, phone_prefix=812):
+    return [["Budi", 3173000000000000 + i, f"0{phone_prefix}{i:07d}", "Jalan Merdeka"] for i in range(count)]
+
+@pytest.fixture
+def workbook(tmp_path):
+    return make_workbook(tmp_path / "staff.xlsx", {"Jakarta": people(3), "Bandung": people(2)})
+
+def test_sheet_fingerprints_only_change_for_the_edited_sheet(tmp_path, workbook):
+    before = transfer.sheet_fingerprints(workbook)
+    assert set(before) == {"Jakarta", "Bandung"}
+    assert transfer.sheet_fingerprints(workbook) == before
+
+    # Same text as before, so the shared strings do not change
+    edited = make_workbook(tmp_path / "edited.xlsx", {"Jakarta": people(3), "Bandung": people(3)})
+    after = transfer.sheet_fingerprints(edited)
+    assert after["Jakarta"] == before["Jakarta"]
+    assert after["Bandung"] != before["Bandung"]
+
+def test_describe_source_reuses_an_entry_with_the_same_stat(workbook):
+    stat = os.stat(workbook)
+    previous = {"sha256": "recorded", "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "sheet_fingerprints": {"Jakarta": "recorded"}}
+    description = transfer.describe_source(workbook, [previous])
+    assert description["sha256"] == "recorded"  # The file was not even read
+    assert description["sheets"] == {"Jakarta": "recorded"}
+
+def test_describe_source_reuses_fingerprints_for_the_same_hash(workbook):
+    previous = {"sha256": transfer.file_sha256(workbook), "size": -1, "mtime_ns": -1,
+                "sheet_fingerprints": {"Jakarta": "recorded"}}
+    description = transfer.describe_source(workbook, [previous])
+    assert description["sheets"] == {"Jakarta": "recorded"}
+    assert description["size"] == os.stat(workbook).st_size
+
+def test_describe_source_fingerprints_a_changed_file(workbook):
+    previous = {"sha256": "other", "size": -1, "mtime_ns": -1, "sheet_fingerprints": {}}
+    description = transfer.describe_source(workbook, [previous])
+    assert description["sheets"] == transfer.sheet_fingerprints(workbook)
+
+def test_is_up_to_date(tmp_path):
+    output = tmp_path / "out.csv"
+    output.write_text("Name\n")
+    previous = {"fingerprint": "abc", "outputs": [str(output)]}
+    assert transfer.is_up_to_date(previous, "abc", [str(output)])
+    assert not transfer.is_up_to_date(None, "abc", [str(output)])
+    assert not transfer.is_up_to_date(previous, "changed", [str(output)])
+    assert not transfer.is_up_to_date(previous, "abc", [str(output), str(tmp_path / "out.parquet")])
+    output.unlink()
+    assert not transfer.is_up_to_date(previous, "abc", [str(output)])
+
+def test_output_paths():
+    assert transfer.output_paths("out/sheet", "csv") == ["out/sheet.csv"]
+    assert transfer.output_paths("out/sheet", "parquet") == ["out/sheet.parquet"]
+    assert transfer.output_paths("out/sheet", "both") == ["out/sheet.csv", "out/sheet.parquet"]
+
+def test_state_round_trips(tmp_path):
+    assert transfer.load_state(tmp_path) == {}
+    transfer.save_state(tmp_path, {"out.csv": {"fingerprint": "abc"}})
+    assert transfer.load_state(tmp_path) == {"out.csv": {"fingerprint": "abc"}}
+    (tmp_path / transfer.STATE_NAME).write_text("not json")
+    assert transfer.load_state(tmp_path) == {}
+
+def test_batch_reconverts_only_changed_sheets(tmp_path, capsys):
+    source = tmp_path / "drop"
+    source.mkdir()
+    path = make_workbook(source / "staff.xlsx", {"Jakarta": people(3), "Bandung": people(2)})
+    output_dir = tmp_path / "converted"
+
+    first = transfer.convert_batch(str(source), str(output_dir), workers=1)
+    assert (first["converted"], first["unchanged"]) == (2, 0)
+
+    second = transfer.convert_batch(str(source), str(output_dir), workers=1)
+    assert (second["converted"], second["unchanged"]) == (0, 2)
+
+    make_workbook(path, {"Jakarta": people(3), "Bandung": people(3)})
+    third = transfer.convert_batch(str(source), str(output_dir), workers=1)
+    assert (third["converted"], third["unchanged"]) == (1, 1)
+    converted = [entry["sheet"] for entry in third["sheets"] if entry["status"] == "ok"]
+    assert converted == ["Bandung"]
+
+    forced = transfer.convert_batch(str(source), str(output_dir), workers=1, force=True)
+    assert forced["converted"] == 2
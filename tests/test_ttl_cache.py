@@ -0,0 +1,97 @@
+import pytest
+
+from assets import ttl_cache
+from assets.ttl_cache import TTLCache, make_key
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TTLCache(tmp_path / "cache.sqlite3", ttl=60)
+    yield cache
+    cache.close()
+
+def test_get_returns_stored_value(cache):
+    cache.set("key", {"answer": [1, 2]})
+    assert cache.get("key") == {"answer": [1, 2]}
+    assert cache.get("missing") is None
+
+def test_expired_entry_is_a_miss(cache):
+    cache.set("key", "value", ttl=-1)
+    assert cache.get("key") is None
+    assert cache.misses == 1 and cache.hits == 0
+
+def test_hits_record_saved_time(cache):
+    cache.set("key", "value", cost_ms=250.0)
+    cache.get("key")
+    cache.get("key")
+    assert cache.hits == 2
+    assert cache.saved_ms == 500.0
+
+def test_totals_survive_reopening(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = TTLCache(path)
+    first.set("key", "value", cost_ms=10.0)
+    first.get("key")
+    first.get("missing")
+    first.close()
+
+    second = TTLCache(path)
+    stats = second.stats()
+    second.close()
+    assert stats["total_hits"] == 1
+    assert stats["total_misses"] == 1
+    assert stats["total_saved_ms"] == 10.0
+    assert stats["hits"] == 0  # Per-process counters start over
+
+def test_get_does_not_write(cache):
+    cache.set("key", "value")
+    conn = cache._connect()
+    changes = conn.total_changes
+    cache.get("key")
+    cache.get("missing")
+    assert conn.total_changes == changes
+
+def test_clear_resets_entries_and_totals(cache):
+    cache.set("key", "value")
+    cache.get("key")
+    cache.clear()
+    assert cache.get("key") is None
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["total_hits"] == 0
+
+def test_make_key_depends_on_every_part():
+    assert make_key("a", {"x": 1}) == make_key("a", {"x": 1})
+    assert make_key("a", {"x": 1}) != make_key("b", {"x": 1})
+    assert make_key("a", "b") != make_key("b", "a")
+
+def test_store_evicts_expired_and_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(ttl_cache, "EVICT_EVERY", 4)
+    cache = TTLCache(tmp_path / "cache.sqlite3", ttl=60, max_entries=3)
+    try:
+        cache.set("expired", 0, ttl=-1)  # The first store evicts (nothing yet)
+        for key in ["a", "b", "c"]:
+            cache.set(key, key)
+        cache.get("a")  # Now more recently used than b and c
+        cache.set("d", "d")  # Four stores since the first: evicts
+        keys = {row[0] for row in cache._connect().execute("SELECT key FROM entries")}
+    finally:
+        cache.close()
+    assert "expired" not in keys
+    assert keys == {"a", "c", "d"}
+
+def test_eviction_runs_every_evict_every_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(ttl_cache, "EVICT_EVERY", 10)
+    cache = TTLCache(tmp_path / "cache.sqlite3", ttl=60, max_entries=5)
+    try:
+        for i in range(10):
+            cache.set(str(i), i)
+        assert cache.stats()["entries"] == 10  # Over max_entries between evictions
+        cache.set("10", 10)
+        assert cache.stats()["entries"] == 5
+    finally:
+        cache.close()
+
+def test_expiry_is_indexed(cache):
+    cache.set("key", "value")
+    plan = cache._connect().execute("EXPLAIN QUERY PLAN DELETE FROM entries WHERE expires_at <= 0").fetchall()
+    assert any("entries_expires" in str(row) for row in plan)